@@ -0,0 +1,126 @@
+"""
+Recall / latency benchmark of the IVF approximate index against exact Spacy similarity.
+
+Run from the faq_chatbot_project folder:
+    python -m benchmarks.ann_recall --size 100000 --queries 500 --n-probe 4 8 16 32
+
+For every n_probe value it reports, over the same query set:
+- recall@1:  share of queries whose ANN top-1 is an exact top-1 (ties count as hits)
+- recall@10: share of the exact top-10 found in the ANN top-10
+- hybrid agreement: share of queries where `FAQModel.find_best_matches` returns the
+  same question with the ANN index as without it
+- mean latency per query of the dense search
+"""
+import argparse
+import json
+import random
+import time
+
+import numpy as np
+
+from benchmarks.corpus import perturb
+from modules.ann_index import IVFIndex
+from modules.data_loader import load_faq_data
+from modules.model import FAQModel
+
+
+def synthetic_questions(seed_questions, size, vocabulary, rng):
+    """
+    Grows a question list to `size` entries by mixing seed questions with random words.
+    """
+    questions = list(dict.fromkeys(seed_questions))
+    seen = set(questions)
+    while len(questions) < size:
+        words = rng.choice(seed_questions).rstrip("?").split()
+        for _ in range(rng.randint(1, 3)):
+            words.insert(rng.randrange(len(words) + 1), rng.choice(vocabulary))
+        question = " ".join(words) + "?"
+        if question not in seen:
+            seen.add(question)
+            questions.append(question)
+    return questions
+
+
+def exact_top_k(model, queries, k, batch_size=64):
+    """
+    Exact top-k rows by Spacy similarity, best first, with their scores.
+    """
+    top, top_scores = [], []
+    for start in range(0, len(queries), batch_size):
+        scores = model.spacy_scores(queries[start:start + batch_size])
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        part_scores = np.take_along_axis(scores, part, axis=1)
+        order = np.argsort(-part_scores, axis=1, kind="stable")
+        top.append(np.take_along_axis(part, order, axis=1))
+        top_scores.append(np.take_along_axis(part_scores, order, axis=1))
+    return np.vstack(top), np.vstack(top_scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000, help="Number of FAQ questions (synthetic beyond the data file)")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--n-lists", type=int, default=None, help="IVF lists (default: sqrt(size))")
+    parser.add_argument("--n-probe", type=int, nargs="+", default=[4, 8, 16, 32])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    seed_questions = [entry["question"] for entry in load_faq_data()]
+    vocabulary = sorted({word.strip("?,.").lower() for q in seed_questions for word in q.split()})
+
+    questions = synthetic_questions(seed_questions, args.size, vocabulary, rng)
+    model = FAQModel(questions, auto_compact_ratio=None)
+    queries = [perturb(rng.choice(model.questions), vocabulary, rng) for _ in range(args.queries)]
+
+    print(f"Corpus: {len(model.questions)} questions, {len(queries)} queries")
+    exact_top10, exact_scores = exact_top_k(model, queries, min(10, len(model.questions)))
+    exact_matches = model.find_best_matches(queries)
+
+    start = time.perf_counter()
+    query_embeddings, _ = model._embed_texts(queries)
+    embed_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    ann = IVFIndex(n_lists=args.n_lists, seed=args.seed).fit(model.index.embeddings)
+    print(f"IVF build: {len(ann.lists)} lists in {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    exact_top_k(model, queries, 1)
+    exact_ms = (time.perf_counter() - start - embed_seconds) / len(queries) * 1000
+
+    results = []
+    for n_probe in args.n_probe:
+        ann.n_probe = n_probe
+        start = time.perf_counter()
+        ann_ids, ann_scores = ann.search(query_embeddings, k=exact_top10.shape[1])
+        latency_ms = (time.perf_counter() - start) / len(queries) * 1000
+
+        # ✅ Duplicate questions tie exactly, any of them is a correct top-1
+        recall_1 = float(np.mean(ann_scores[:, 0] >= exact_scores[:, 0] - 1e-6))
+        recall_10 = float(np.mean([len(set(a) & set(e)) / len(e) for a, e in zip(ann_ids, exact_top10)]))
+
+        model.index.ann = ann
+        try:
+            ann_matches = model.find_best_matches(queries)
+        finally:
+            model.index.ann = None
+        agreement = float(np.mean([a[0] == e[0] for a, e in zip(ann_matches, exact_matches)]))
+
+        results.append({"n_lists": len(ann.lists), "n_probe": n_probe, "recall@1": recall_1,
+                        "recall@10": recall_10, "hybrid_agreement": agreement, "latency_ms": latency_ms})
+
+    print(f"Exact dense search: {exact_ms:.3f} ms/query")
+    print(f"{'n_probe':>8} {'recall@1':>9} {'recall@10':>10} {'hybrid':>8} {'ms/query':>9}")
+    for r in results:
+        print(f"{r['n_probe']:>8} {r['recall@1']:>9.3f} {r['recall@10']:>10.3f} {r['hybrid_agreement']:>8.3f} {r['latency_ms']:>9.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"size": len(model.questions), "queries": len(queries), "exact_ms": exact_ms,
+                       "results": results}, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
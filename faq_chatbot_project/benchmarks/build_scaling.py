@@ -0,0 +1,90 @@
+"""
+Index build time against the number of worker processes.
+
+Run from the faq_chatbot_project folder:
+    python -m benchmarks.build_scaling --size 1000000 --workers 1 2 4 8 --json build_scaling.json
+
+The corpus is indexed once with the fitted TF-IDF vocabulary (serial, the reference),
+then with the hashed n-gram space (`--hashing-features`) for every worker count. For
+each build it reports:
+- seconds to preprocess the questions (`TextProcessor.preprocess_many`) and to build the
+  `FAQModel` index, and the speedup of the total against the serial hashed build
+- hybrid agreement: share of queries where `find_best_matches` returns the same FAQ as
+  the vocabulary index
+Parallel builds need fork (Linux / macOS); elsewhere every build is serial.
+"""
+import argparse
+import json
+import time
+
+from benchmarks.corpus import generate_corpus, generate_queries
+from modules.model import FAQModel
+from modules.parallel_build import preprocess_parallel
+from modules.text_processor import TextProcessor
+
+
+def timed_build(questions, text_processor, workers, hashing_features):
+    """
+    Preprocesses and indexes `questions` with `workers` processes.
+
+    Returns:
+    - model (FAQModel): The built model.
+    - preprocess_seconds (float): Time spent preprocessing.
+    - build_seconds (float): Time spent building the index.
+    """
+    start = time.perf_counter()
+    if workers > 1:
+        preprocess_parallel(text_processor, questions, workers)
+    else:
+        text_processor.preprocess_many(questions)
+    preprocess_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    model = FAQModel(questions, auto_compact_ratio=None, hashing_features=hashing_features, build_workers=workers)
+    return model, preprocess_seconds, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000, help="Number of synthetic FAQ questions")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--hashing-features", type=int, default=2 ** 28)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    questions = [entry["question"] for entry in generate_corpus(args.size, seed=args.seed)]
+    queries = generate_queries(questions, args.queries, seed=args.seed)
+    text_processor = TextProcessor()
+    print(f"Corpus: {len(questions)} questions, {len(queries)} queries")
+
+    reference, preprocess_seconds, build_seconds = timed_build(questions, text_processor, 1, None)
+    reference_matches = reference.find_best_matches(queries)
+    del reference
+    results = [{"mode": "vocabulary", "workers": 1, "preprocess_s": preprocess_seconds, "build_s": build_seconds,
+                "hybrid_agreement": 1.0}]
+
+    for workers in args.workers:
+        model, preprocess_seconds, build_seconds = timed_build(questions, text_processor, workers,
+                                                               args.hashing_features)
+        agreement = sum(a[0] == e[0] for a, e in zip(model.find_best_matches(queries), reference_matches))
+        del model
+        results.append({"mode": "hashed", "workers": workers, "preprocess_s": preprocess_seconds,
+                        "build_s": build_seconds, "hybrid_agreement": agreement / len(queries)})
+
+    serial = next((r for r in results if r["mode"] == "hashed" and r["workers"] == 1), results[1])
+    serial_total = serial["preprocess_s"] + serial["build_s"]
+    print(f"{'mode':>10} {'workers':>7} {'preprocess s':>12} {'build s':>8} {'speedup':>8} {'hybrid':>7}")
+    for r in results:
+        r["speedup"] = serial_total / (r["preprocess_s"] + r["build_s"])
+        print(f"{r['mode']:>10} {r['workers']:>7} {r['preprocess_s']:>12.2f} {r['build_s']:>8.2f} "
+              f"{r['speedup']:>7.2f}x {r['hybrid_agreement']:>7.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"size": len(questions), "queries": len(queries), "results": results}, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+"""
+Compares two result files of `benchmarks.suite`.
+
+    python -m benchmarks.compare baseline.json candidate.json
+
+Prints, per corpus size and stage, the baseline and candidate p50 / p99 latency
+and throughput with the relative change, followed by cold start and peak RSS.
+"""
+import argparse
+import json
+
+
+def change(old, new):
+    return f"{(new - old) / old * 100:+.1f}%" if old else "n/a"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    args = parser.parse_args()
+
+    with open(args.baseline, "r", encoding="utf-8") as file:
+        baseline = json.load(file)
+    with open(args.candidate, "r", encoding="utf-8") as file:
+        candidate = json.load(file)
+
+    print(f"baseline:  {baseline['meta']['timestamp']} ({baseline['meta'].get('git_commit')})")
+    print(f"candidate: {candidate['meta']['timestamp']} ({candidate['meta'].get('git_commit')})")
+
+    old_by_size = {result["size"]: result for result in baseline["results"]}
+    for new in candidate["results"]:
+        old = old_by_size.get(new["size"])
+        if old is None:
+            print(f"\n== size {new['size']}: not in baseline ==")
+            continue
+
+        print(f"\n== size {new['size']} ==")
+        print(f"  {'stage':<24}{'metric':<16}{'baseline':>12}{'candidate':>12}{'change':>10}")
+        for stage, new_stats in new["stages"].items():
+            old_stats = old["stages"].get(stage)
+            if old_stats is None:
+                continue
+            for metric in ("p50_ms", "p99_ms", "throughput_qps"):
+                print(f"  {stage:<24}{metric:<16}{old_stats[metric]:>12.3f}{new_stats[metric]:>12.3f}"
+                      f"{change(old_stats[metric], new_stats[metric]):>10}")
+
+        old_cold, new_cold = old["cold_start"]["total_seconds"], new["cold_start"]["total_seconds"]
+        print(f"  {'cold start':<40}{old_cold:>12.2f}{new_cold:>12.2f}{change(old_cold, new_cold):>10}")
+        old_rss, new_rss = old["peak_rss_bytes"] / 2**20, new["peak_rss_bytes"] / 2**20
+        print(f"  {'peak RSS MiB':<40}{old_rss:>12.1f}{new_rss:>12.1f}{change(old_rss, new_rss):>10}")
+
+
+if __name__ == "__main__":
+    main()
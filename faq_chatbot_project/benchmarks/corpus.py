@@ -0,0 +1,164 @@
+"""
+Synthetic FAQ corpora and query sets of any size, for benchmarks.
+
+Questions are built from help-desk templates (opening × action × object ×
+qualifier), which gives millions of distinct, realistic-looking questions with
+a vocabulary that grows with the corpus like a real export would.
+
+    python -m benchmarks.corpus --size 100000 --out /tmp/faq_100k.json
+"""
+import argparse
+import json
+import random
+
+OPENINGS = [
+    "How do I", "How can I", "Can I", "Is it possible to", "Where can I", "What is the fastest way to",
+    "Why can't I", "When can I", "Do I need an account to", "Who do I contact to", "Is there a fee to",
+    "What happens if I", "How long does it take to", "Am I allowed to", "What do I need to",
+]
+ACTIONS = [
+    "return", "track", "cancel", "update", "change", "reset", "pay for", "ship", "exchange", "download",
+    "find", "get a refund for", "reorder", "report a problem with", "register", "activate", "renew",
+    "transfer", "upgrade", "delete", "review", "split the payment for", "gift", "insure", "pick up",
+]
+DETERMINERS = ["my", "a", "the"]
+ADJECTIVES = [
+    "", "damaged", "missing", "international", "digital", "discounted", "preordered", "express", "large",
+    "refurbished", "personalized", "bundled", "wholesale", "student", "recurring", "partial", "duplicate",
+    "late", "gifted", "unopened", "backordered", "clearance", "custom", "business", "family", "trial",
+    "seasonal", "local", "old", "new",
+]
+NOUNS = [
+    "order", "item", "password", "account", "gift card", "invoice", "subscription", "shipment", "package",
+    "payment", "coupon", "address", "delivery", "refund", "warranty", "membership", "receipt", "product",
+    "email address", "phone number", "profile", "return label", "loyalty points", "wishlist", "cart",
+    "device", "license", "download link", "store credit", "reservation", "booking", "ticket", "voucher",
+    "bank card", "billing plan", "appointment", "parcel", "purchase", "rental", "trade-in",
+]
+QUALIFIERS = [
+    "", "online", "after 30 days", "from abroad", "on mobile", "with PayPal", "without a receipt",
+    "over the phone", "in store", "before it ships", "on the weekend", "for someone else",
+    "using the app", "with a gift card", "during a sale", "after the trial ends", "to another country",
+    "without logging in", "more than once", "with a promo code", "after delivery", "before the due date",
+    "by email", "from my laptop", "at checkout", "in bulk", "for free", "with express shipping",
+    "in another currency", "after moving", "with two-factor authentication", "for a business account",
+    "as a guest", "on a holiday", "without the original packaging", "with a student discount",
+    "with store credit", "from the order history", "after the warranty expired", "with a new card",
+]
+PAGES = ["Account Settings", "Order History", "Returns Portal", "Help Center", "Billing page", "Support chat"]
+FOLLOW_UPS = [
+    "You will receive a confirmation email within 24 hours.",
+    "Our support team is available 24/7 if you need more help.",
+    "Processing usually takes 3-5 business days.",
+    "No additional fees apply.",
+    "Please keep your order number at hand.",
+    "Changes take effect immediately.",
+]
+OFF_TOPIC = [
+    "weather", "football", "recipe", "movie", "guitar", "planet", "poem", "volcano", "chess", "dinosaur",
+    "tomorrow", "banana", "painting", "ocean", "symphony", "marathon", "galaxy", "garden", "puzzle", "jazz",
+]
+
+
+def _question(rng):
+    thing = " ".join(word for word in (rng.choice(ADJECTIVES), rng.choice(NOUNS)) if word)
+    determiner = rng.choice(DETERMINERS)
+    if determiner == "a" and thing[0] in "aeiou":
+        determiner = "an"
+    task = " ".join(word for word in (rng.choice(ACTIONS), determiner, thing, rng.choice(QUALIFIERS)) if word)
+    return f"{rng.choice(OPENINGS)} {task}?", task
+
+
+def _answer(task, rng):
+    return f"To {task}, go to {rng.choice(PAGES)} and follow the instructions. {rng.choice(FOLLOW_UPS)}"
+
+
+def generate_corpus(size, seed=0):
+    """
+    Generates `size` FAQ entries with distinct questions.
+
+    Parameters:
+    - size (int): Number of entries (up to tens of millions of distinct questions).
+    - seed (int): Random seed (the same seed always yields the same corpus).
+
+    Returns:
+    - entries (list): {"question": ..., "answer": ...} dicts, like faq_data.json.
+    """
+    rng = random.Random(seed)
+    seen = set()
+    entries = []
+    while len(entries) < size:
+        question, task = _question(rng)
+        if question not in seen:
+            seen.add(question)
+            entries.append({"question": question, "answer": _answer(task, rng)})
+    return entries
+
+
+def vocabulary(questions):
+    """
+    Returns the sorted lowercase words of a question list (used to perturb queries).
+    """
+    return sorted({word.strip("?,.").lower() for question in questions for word in question.split()})
+
+
+def perturb(question, words, rng):
+    """
+    Turns a corpus question into a query: drops one word and adds a random one.
+    """
+    tokens = question.rstrip("?").split()
+    if len(tokens) > 2:
+        tokens.pop(rng.randrange(len(tokens)))
+    tokens.insert(rng.randrange(len(tokens) + 1), rng.choice(words))
+    return " ".join(tokens)
+
+
+def generate_queries(questions, count, seed=0, exact_share=0.2, off_topic_share=0.1):
+    """
+    Generates a query set for a corpus.
+
+    Parameters:
+    - questions (list): Corpus questions.
+    - count (int): Number of queries.
+    - seed (int): Random seed.
+    - exact_share (float): Share of queries that repeat a corpus question verbatim.
+    - off_topic_share (float): Share of unrelated queries (exercise the low-confidence path).
+      The rest are corpus questions with one word dropped and one random word added.
+
+    Returns:
+    - queries (list): Query strings.
+    """
+    rng = random.Random(seed)
+    words = vocabulary(rng.sample(questions, min(len(questions), 1000)))
+    queries = []
+    for _ in range(count):
+        draw = rng.random()
+        if draw < off_topic_share:
+            queries.append(" ".join(rng.sample(OFF_TOPIC, rng.randint(2, 4))))
+        elif draw < off_topic_share + exact_share:
+            queries.append(rng.choice(questions))
+        else:
+            queries.append(perturb(rng.choice(questions), words, rng))
+    return queries
+
+
+def write_corpus(entries, path):
+    """
+    Writes FAQ entries as a JSON array (same format as data/faq_data.json).
+    """
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(entries, file)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, required=True)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", required=True, help="Output JSON file")
+    args = parser.parse_args()
+    write_corpus(generate_corpus(args.size, args.seed), args.out)
+    print(f"Wrote {args.size} FAQ entries to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
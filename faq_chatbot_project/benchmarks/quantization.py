@@ -0,0 +1,99 @@
+"""
+Memory / accuracy / latency report of quantized question embeddings (float16, int8).
+
+Run from the faq_chatbot_project folder:
+    python -m benchmarks.quantization --size 100000 --queries 500 --json quantization.json
+
+The float32 index is built once; every storage type then scores the same queries over
+the same vectors. For each type it reports:
+- embedding memory, and the share saved against float32
+- spacy top-1 agreement: share of queries whose `find_best_match_spacy` result is
+  (one of) the float32 best match(es) (duplicate questions tie, any of them counts)
+- hybrid agreement: share of queries where `find_best_matches` (TF-IDF + Spacy fusion)
+  returns the same FAQ as with float32 embeddings
+- mean / max absolute error of the Spacy scores
+- latency of the Spacy scoring per query, alone and in batches of `--batch-size`
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from benchmarks.corpus import generate_corpus, generate_queries
+from modules.embedding_matrix import EMBEDDING_DTYPES, EmbeddingMatrix
+from modules.model import FAQModel
+
+
+def time_scoring(model, queries, batch_size):
+    """
+    Returns the mean milliseconds per query of `FAQModel.spacy_scores` in batches of `batch_size`.
+    """
+    start = time.perf_counter()
+    for offset in range(0, len(queries), batch_size):
+        model.spacy_scores(queries[offset:offset + batch_size])
+    return (time.perf_counter() - start) / len(queries) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=100000, help="Number of synthetic FAQ questions")
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this JSON file")
+    args = parser.parse_args()
+
+    questions = [entry["question"] for entry in generate_corpus(args.size, seed=args.seed)]
+    model = FAQModel(questions, auto_compact_ratio=None)
+    queries = generate_queries(questions, args.queries, seed=args.seed)
+    vectors = model.question_embeddings
+    print(f"Corpus: {len(questions)} questions, {len(queries)} queries")
+
+    exact_scores = model.spacy_scores(queries)
+    exact_best = exact_scores.max(axis=1)
+    exact_matches = model.find_best_matches(queries)
+    rows_by_id = model.index.rows_by_id.view()
+    baseline_bytes = None
+
+    results = []
+    for dtype in EMBEDDING_DTYPES:
+        model.index.embeddings = EmbeddingMatrix.from_vectors(vectors, dtype)
+        model.version += 1
+        embedding_bytes = model.index.embeddings.nbytes
+        baseline_bytes = baseline_bytes or embedding_bytes
+
+        scores = model.spacy_scores(queries)
+        spacy_rows = [rows_by_id[model.find_best_match_spacy(query)[0]] for query in queries]
+        spacy_agreement = float(np.mean([exact_scores[i, row] >= exact_best[i] - 1e-6
+                                         for i, row in enumerate(spacy_rows)]))
+        hybrid_agreement = float(np.mean([a[0] == e[0] for a, e in zip(model.find_best_matches(queries),
+                                                                        exact_matches)]))
+        errors = np.abs(scores - exact_scores)
+
+        results.append({
+            "dtype": dtype,
+            "embedding_mb": embedding_bytes / 2**20,
+            "memory_saved": 1 - embedding_bytes / baseline_bytes,
+            "spacy_top1_agreement": spacy_agreement,
+            "hybrid_agreement": hybrid_agreement,
+            "mean_abs_error": float(errors.mean()),
+            "max_abs_error": float(errors.max()),
+            "ms_per_query": time_scoring(model, queries, 1),
+            "ms_per_query_batched": time_scoring(model, queries, args.batch_size),
+        })
+
+    print(f"{'dtype':>8} {'MB':>9} {'saved':>7} {'spacy@1':>8} {'hybrid':>8} {'mean err':>9} {'max err':>8} "
+          f"{'ms/q':>7} {'ms/q b' + str(args.batch_size):>9}")
+    for r in results:
+        print(f"{r['dtype']:>8} {r['embedding_mb']:>9.1f} {r['memory_saved']:>7.1%} {r['spacy_top1_agreement']:>8.3f} "
+              f"{r['hybrid_agreement']:>8.3f} {r['mean_abs_error']:>9.5f} {r['max_abs_error']:>8.5f} "
+              f"{r['ms_per_query']:>7.3f} {r['ms_per_query_batched']:>9.3f}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as file:
+            json.dump({"size": len(questions), "queries": len(queries), "results": results}, file, indent=4)
+
+
+if __name__ == "__main__":
+    main()
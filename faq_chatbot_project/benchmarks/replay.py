@@ -0,0 +1,170 @@
+"""
+Replays captured production queries (see `modules.query_capture`) against a chatbot.
+
+Run from the faq_chatbot_project folder:
+    python -m benchmarks.replay capture.jsonl.1 capture.jsonl --faq-file data/faq_data.json --speed 4
+    python -m benchmarks.replay capture.jsonl --url http://127.0.0.1:8000 --speed 0 --concurrency 64
+
+Queries are sent at their recorded arrival times, compressed by `--speed` (2 = twice the
+recorded rate, 0 = as fast as `--concurrency` allows), either to a `FAQChatbot` built in
+this process or to a running server's POST /ask. It reports:
+- service latency: from sending a query to its answer
+- latency from schedule: from the time the query was due, so a server that falls
+  behind is not hidden by the replay waiting for it (coordinated omission)
+- target and achieved throughput, errors (e.g. HTTP 503 when overloaded)
+- the latencies recorded at capture time, and the share of queries answered with the
+  same FAQ as then (a quick check of ranking changes)
+"""
+import argparse
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.suite import latency_stats
+from modules.query_capture import read_capture
+
+
+def http_target(url, timeout=30.0):
+    """
+    Returns a function answering one query through a server's POST /ask.
+    """
+    endpoint = url.rstrip("/") + "/ask"
+
+    def ask(query):
+        request = urllib.request.Request(endpoint, data=json.dumps({"question": query}).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"})
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            return json.loads(response.read())
+
+    return ask
+
+
+def chatbot_target(faq_file, snapshot_dir=None, fast_preprocessing=False):
+    """
+    Returns a function answering one query with a `FAQChatbot` built in this process.
+    """
+    from modules.chatbot import FAQChatbot
+
+    chatbot = FAQChatbot(faq_file, snapshot_dir=snapshot_dir, fast_preprocessing=fast_preprocessing)
+    return chatbot.generate_response
+
+
+def replay(entries, ask, speed=1.0, concurrency=16):
+    """
+    Sends captured queries on their recorded schedule and times the answers.
+
+    Parameters:
+    - entries (list): Captured entries sorted by "ts" (see `read_capture`).
+    - ask (callable): Answers one query string with a response dictionary.
+    - speed (float): Replay rate relative to the recording (0 = no pacing).
+    - concurrency (int): Queries in flight at most.
+
+    Returns:
+    - report (dict): Latency statistics, throughput, errors and answer agreement.
+    """
+    if not entries:
+        raise ValueError("No captured queries to replay")
+    first_ts = entries[0]["ts"]
+    service, from_schedule = [], []
+    errors = {}
+    same_answer = 0
+    lock = threading.Lock()
+
+    def send(entry, due):
+        nonlocal same_answer
+        sent = time.perf_counter()
+        try:
+            response = ask(entry["query"])
+        except Exception as e:
+            name = f"HTTP {e.code}" if isinstance(e, urllib.error.HTTPError) else type(e).__name__
+            with lock:
+                errors[name] = errors.get(name, 0) + 1
+            return
+        done = time.perf_counter()
+        with lock:
+            service.append(done - sent)
+            from_schedule.append(done - due)
+            same_answer += response.get("faq_id") == entry.get("faq_id")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for entry in entries:
+            due = start + ((entry["ts"] - first_ts) / speed if speed > 0 else 0.0)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            pool.submit(send, entry, due)
+    total = time.perf_counter() - start
+
+    recorded_span = entries[-1]["ts"] - first_ts
+    report = {
+        "queries": len(entries),
+        "answered": len(service),
+        "errors": errors,
+        "speed": speed,
+        "concurrency": concurrency,
+        "target_qps": len(entries) / recorded_span * speed if speed > 0 and recorded_span > 0 else None,
+        "achieved_qps": len(service) / total if total else 0.0,
+        "recorded": latency_stats([entry["latency_ms"] / 1000 for entry in entries], recorded_span),
+        "same_answer_rate": same_answer / len(service) if service else 0.0,
+    }
+    if service:
+        report["service"] = latency_stats(service, total)
+        report["from_schedule"] = latency_stats(from_schedule, total)
+    return report
+
+
+def format_report(report):
+    """
+    Formats a replay report as a table (milliseconds).
+    """
+    target = f"target {report['target_qps']:.1f} q/s" if report["target_qps"] else "unpaced"
+    lines = [f"Replayed {report['queries']} queries at speed {report['speed']} "
+             f"({target}, achieved {report['achieved_qps']:.1f} q/s, "
+             f"concurrency {report['concurrency']})",
+             f"{'latency':<15} {'p50':>9} {'p95':>9} {'p99':>9} {'mean':>9}"]
+    for name in ("recorded", "service", "from_schedule"):
+        stats = report.get(name)
+        if stats:
+            lines.append(f"{name:<15} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+                         f"{stats['p99_ms']:>9.2f} {stats['mean_ms']:>9.2f}")
+    lines.append(f"Same answer as recorded: {report['same_answer_rate']:.1%}")
+    if report["errors"]:
+        lines.append("Errors: " + ", ".join(f"{name} x{count}" for name, count in report["errors"].items()))
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("captures", nargs="+", help="Capture files (rotated ones included, any order)")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--faq-file", help="Replay against a FAQChatbot built in this process")
+    target.add_argument("--url", help="Replay against a running server, e.g. http://127.0.0.1:8000")
+    parser.add_argument("--snapshot-dir", default=None, help="Index snapshot directory (in-process target)")
+    parser.add_argument("--fast-preprocessing", action="store_true", help="In-process target: regex tokenizer")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Rate relative to the recording (2 = twice as fast, 0 = as fast as possible)")
+    parser.add_argument("--concurrency", type=int, default=16, help="Queries in flight at most")
+    parser.add_argument("--limit", type=int, default=None, help="Replay only the first N queries")
+    parser.add_argument("--out", default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    entries = read_capture(args.captures)[:args.limit]
+    if args.url:
+        ask = http_target(args.url)
+    else:
+        ask = chatbot_target(args.faq_file, snapshot_dir=args.snapshot_dir,
+                             fast_preprocessing=args.fast_preprocessing)
+
+    report = replay(entries, ask, speed=args.speed, concurrency=args.concurrency)
+    print(format_report(report))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
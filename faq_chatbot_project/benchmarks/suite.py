@@ -0,0 +1,198 @@
+"""
+Latency / throughput / memory benchmark of the query path on synthetic corpora.
+
+Run from the faq_chatbot_project folder:
+    python -m benchmarks.suite --sizes 1000 10000 100000 --queries 1000 --out results.json
+
+Every corpus size runs in a fresh process (so cold start and peak RSS are not
+polluted by the previous size) and measures:
+- cold start: imports + FAQChatbot initialization, with its per-stage breakdown
+- peak RSS after initialization and at the end of the run
+- p50 / p95 / p99 / mean latency and throughput of
+  TextProcessor.preprocess_text, FAQModel.find_best_match_tfidf,
+  FAQModel.find_best_match_spacy, FAQModel.find_top_k and FAQChatbot.generate_response
+  (the model methods get preprocessed queries, as in the chatbot)
+
+Results are written as JSON; compare two runs with `python -m benchmarks.compare`.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import generate_corpus, generate_queries, write_corpus
+
+
+def peak_rss_bytes():
+    """
+    Returns the peak resident set size of the current process so far.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # ✅ kB on Linux, bytes on macOS
+
+
+def latency_stats(latencies, total_seconds):
+    """
+    Summarizes per-call latencies.
+
+    Parameters:
+    - latencies (list): Seconds per call.
+    - total_seconds (float): Wall time of all calls.
+
+    Returns:
+    - stats (dict): count, p50/p95/p99/mean in milliseconds and throughput in calls/s.
+    """
+    ordered = sorted(latencies)
+
+    def percentile(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))] * 1000
+
+    return {
+        "count": len(ordered),
+        "p50_ms": percentile(50),
+        "p95_ms": percentile(95),
+        "p99_ms": percentile(99),
+        "mean_ms": sum(ordered) / len(ordered) * 1000,
+        "throughput_qps": len(ordered) / total_seconds if total_seconds else 0.0,
+    }
+
+
+def measure(function, inputs, warmup=10):
+    """
+    Calls `function` on every input and times each call.
+
+    Parameters:
+    - function (callable): Function of one argument.
+    - inputs (list): Arguments.
+    - warmup (int): Untimed calls first (on the first inputs).
+
+    Returns:
+    - stats (dict): See `latency_stats`.
+    """
+    for item in inputs[:warmup]:
+        function(item)
+
+    latencies = []
+    clock = time.perf_counter
+    start = clock()
+    for item in inputs:
+        call_start = clock()
+        function(item)
+        latencies.append(clock() - call_start)
+    return latency_stats(latencies, clock() - start)
+
+
+def run_size(size, n_queries, seed, corpus_dir, cache_size, warmup):
+    """
+    Benchmarks one corpus size (meant to run in a fresh process).
+
+    Returns:
+    - result (dict): Cold start, memory and per-stage latency results.
+    """
+    entries = generate_corpus(size, seed)
+    corpus_path = os.path.join(corpus_dir, f"faq_{size}.json")
+    write_corpus(entries, corpus_path)
+    queries = generate_queries([entry["question"] for entry in entries], n_queries, seed)
+    del entries
+
+    start = time.perf_counter()
+    from modules.chatbot import FAQChatbot
+    import_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chatbot = FAQChatbot(corpus_path, cache_size=cache_size)
+    init_seconds = time.perf_counter() - start
+    peak_after_init = peak_rss_bytes()
+
+    processed = [chatbot.text_processor.preprocess_text(query) for query in queries]
+    stages = {
+        "preprocess_text": measure(chatbot.text_processor.preprocess_text, queries, warmup),
+        "find_best_match_tfidf": measure(chatbot.model.find_best_match_tfidf, processed, warmup),
+        "find_best_match_spacy": measure(chatbot.model.find_best_match_spacy, processed, warmup),
+        "find_top_k": measure(chatbot.model.find_top_k, processed, warmup),
+        "generate_response": measure(chatbot.generate_response, queries, warmup),
+    }
+
+    return {
+        "size": size,
+        "corpus_size": len(chatbot.questions),  # ✅ What was actually loaded
+        "queries": n_queries,
+        "cold_start": {
+            "import_seconds": import_seconds,
+            "init_seconds": init_seconds,
+            "total_seconds": import_seconds + init_seconds,
+            "stages": dict(chatbot.startup_timings),
+        },
+        "peak_rss_after_init_bytes": peak_after_init,
+        "peak_rss_bytes": peak_rss_bytes(),
+        "stages": stages,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_result(result):
+    cold = result["cold_start"]
+    print(f"\n== {result['corpus_size']} FAQs, {result['queries']} queries ==")
+    print(f"cold start {cold['total_seconds']:.2f} s (imports {cold['import_seconds']:.2f} s, "
+          f"init {cold['init_seconds']:.2f} s), peak RSS {result['peak_rss_bytes'] / 2**20:.0f} MiB")
+    print(f"  {'stage':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'qps':>11}")
+    for name, stats in result["stages"].items():
+        print(f"  {name:<24}{stats['p50_ms']:>9.3f}{stats['p95_ms']:>9.3f}{stats['p99_ms']:>9.3f}"
+              f"{stats['throughput_qps']:>11,.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--warmup", type=int, default=10, help="Untimed calls before each measured stage")
+    parser.add_argument("--cache-size", type=int, default=0,
+                        help="Response cache size of the chatbot (0 measures uncached scoring)")
+    parser.add_argument("--corpus-dir", default=None, help="Keep the generated corpora here (default: temp dir)")
+    parser.add_argument("--out", default="benchmark_results.json", help="JSON results file")
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    results = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        corpus_dir = args.corpus_dir or tmp_dir
+        os.makedirs(corpus_dir, exist_ok=True)
+        for size in args.sizes:
+            with context.Pool(1) as pool:
+                result = pool.apply(run_size, (size, args.queries, args.seed, corpus_dir, args.cache_size,
+                                               args.warmup))
+            print_result(result)
+            results.append(result)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "git_commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    with open(args.out, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=4)
+    print(f"\nResults written to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Conformance + throughput check of the TextProcessor fast path.
+
+Run from the faq_chatbot_project folder:
+    python -m benchmarks.text_processor_bench --repeat 20
+
+1. Conformance: every FAQ question and answer plus a set of sample queries is
+   preprocessed by the default (word_tokenize) path and by the fast path; any
+   difference is printed and the script exits with status 1.
+2. Throughput: texts/second of `preprocess_text` (default path), `preprocess_text`
+   (fast path) and `preprocess_many` (fast path) over the same texts.
+"""
+import argparse
+import sys
+import time
+
+from modules.data_loader import load_faq_data
+from modules.text_processor import TextProcessor
+
+SAMPLE_QUERIES = [
+    "Hello, how are you?",
+    "I'm fine, thanks!",
+    "We're sure you'll like what they've built, it'd help",
+    "Processing natural language is challenging!",
+    "Lemmatization helps in text standardization.",
+    "I can't log in to my account, what should I do?",
+    "Why won't the app let me reset my password?",
+    "I cannot find the e-mail you sent me",
+    "Is there a 30-day refund policy?",
+    "How much does shipping cost for orders over $1,000.50?",
+    "Is there a £5 fee for returns over €10,000?",
+    "It costs 5€ or ¥1000 per month (£5/month)",
+    "Do you ship to the U.K. or only within the country?",
+    "What's the status of order #12345?",
+    "my payment didn't go through... help!!",
+    "Where's the \"contact us\" page?",
+    "wanna talk to a human, gimme a phone number",
+    "Can I pay with PayPal/credit card?",
+    "It's 10:30 and the store isn't open yet",
+    "Are y'all open on weekends?",
+    "How do I update my profile (name, address, phone)?",
+    "   multiple   spaces\tand\ttabs   ",
+    "",
+]
+
+
+def conformance(texts, standard, fast):
+    """
+    Returns the (text, standard output, fast output) triples that differ.
+    """
+    expected = [standard.preprocess_text(text) for text in texts]
+    single = [fast.preprocess_text(text) for text in texts]
+    batch = fast.preprocess_many(texts)
+    return [(text, e, s if s != e else b) for text, e, s, b in zip(texts, expected, single, batch) if not e == s == b]
+
+
+def throughput(function, texts, repeat):
+    """
+    Texts per second of `function(texts)` over `repeat` runs.
+    """
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(texts)
+    return len(texts) * repeat / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the texts per throughput run")
+    args = parser.parse_args()
+
+    faq_data = load_faq_data()
+    texts = [entry["question"] for entry in faq_data] + [entry["answer"] for entry in faq_data] + SAMPLE_QUERIES
+
+    standard = TextProcessor()
+    fast = TextProcessor(fast=True)
+
+    mismatches = conformance(texts, standard, fast)
+    print(f"Conformance: {len(texts) - len(mismatches)}/{len(texts)} texts identical")
+    for text, expected, actual in mismatches:
+        print(f"  {text!r}\n    default: {expected!r}\n    fast:    {actual!r}")
+
+    print(f"Throughput over {len(texts)} texts x {args.repeat}:")
+    results = {
+        "preprocess_text (default)": throughput(lambda ts: [standard.preprocess_text(t) for t in ts], texts, args.repeat),
+        "preprocess_text (fast)": throughput(lambda ts: [fast.preprocess_text(t) for t in ts], texts, args.repeat),
+        "preprocess_many (fast)": throughput(fast.preprocess_many, texts, args.repeat),
+    }
+    baseline = results["preprocess_text (default)"]
+    for name, rate in results.items():
+        print(f"  {name:<28}{rate:>12,.0f} texts/s  ({rate / baseline:.1f}x)")
+
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
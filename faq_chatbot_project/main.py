@@ -1,33 +1,151 @@
-# Runs the chatbot interactively
+# Runs the chatbot interactively, or scores a query file in bulk (`main.py score`)
+import time
+_import_start = time.perf_counter()
+
+import argparse
+import io
 import logging
+import os
+import sys
+from modules.bulk_scoring import INPUT_FORMATS, ResultWriter, detect_format, iter_queries, score_stream
 from modules.chatbot import FAQChatbot
 from modules.loggerfile import setup_logging
 
+IMPORT_SECONDS = time.perf_counter() - _import_start
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="FAQ chatbot")
+    parser.add_argument("--faq-file", default="data/faq_data.json", help="Path to the FAQ file (JSON document or .jsonl)")
+    parser.add_argument("--snapshot-dir", default=None, help="Directory for persisted index snapshots")
+    parser.add_argument("--download-nltk-data", action="store_true",
+                        help="Download missing NLTK resources (needs network access)")
+    parser.add_argument("--hashing-features", type=int, default=None,
+                        help="Hashed TF-IDF n-gram space of this many buckets (e.g. 268435456) instead of a fitted vocabulary")
+    parser.add_argument("--build-workers", type=int, default=1,
+                        help="Processes building the index (shards the corpus; pair with --hashing-features)")
+    parser.add_argument("--vector-table", default=None,
+                        help="Compact word-vector table (python -m modules.vector_table) instead of the full Spacy model")
+    parser.add_argument("--startup-report", action="store_true",
+                        help="Print the measured import + initialization time breakdown")
+
+    subparsers = parser.add_subparsers(dest="command")
+    score = subparsers.add_parser("score", help="Score a CSV / JSONL file of queries in bulk",
+                                  description="Streams queries from a CSV / JSONL file (or stdin) and writes "
+                                              "the matched FAQ id, answer and confidence of each one")
+    score.add_argument("input", nargs="?", default="-", help="Query file (default: stdin)")
+    score.add_argument("--format", choices=INPUT_FORMATS, default=None,
+                       help="Input format (default: from the file extension, else jsonl)")
+    score.add_argument("--text-column", default="query", help="CSV column / JSON key holding the query")
+    score.add_argument("--id-column", default=None,
+                       help="CSV column / JSON key copied to the results as id (default: record number)")
+    score.add_argument("-o", "--output", default="-", help="Result file (default: stdout)")
+    score.add_argument("--output-format", choices=INPUT_FORMATS, default=None,
+                       help="Result format (default: from the file extension, else jsonl)")
+    score.add_argument("--batch-size", type=int, default=256, help="Queries per vectorized chunk")
+    score.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                       help="Scoring processes (default: CPU count; 1 = no worker processes)")
+    score.add_argument("--progress-interval", type=float, default=5.0,
+                       help="Seconds between progress lines on stderr")
+    return parser.parse_args()
+
+
+def print_startup_report(chatbot, init_seconds, file=None):
+    """
+    Prints how long imports and each initialization stage took.
+    """
+    print("Startup time breakdown:", file=file)
+    print(f"  {'imports':<20}{IMPORT_SECONDS * 1000:>10.1f} ms", file=file)
+    for stage, seconds in chatbot.startup_timings.items():
+        print(f"  {stage:<20}{seconds * 1000:>10.1f} ms", file=file)
+    print(f"  {'total':<20}{(IMPORT_SECONDS + init_seconds) * 1000:>10.1f} ms", file=file)
+
+
+def print_progress(stats):
+    """
+    Prints a progress line of `score_stream` to stderr.
+    """
+    print(f"{stats['queries']} queries scored ({stats['skipped']} skipped), {stats['answered']} answered, "
+          f"{stats['queries_per_second']:.0f} queries/s", file=sys.stderr, flush=True)
+
+
+def run_scoring(chatbot, args):
+    """
+    Scores the query file of the `score` subcommand, streaming results to the output file.
+    """
+    if args.input == "-":
+        input_file = io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    else:
+        input_file = open(args.input, "r", encoding="utf-8", newline="")
+    output_file = sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8", newline="")
+    try:
+        records = iter_queries(input_file, detect_format(args.input, args.format),
+                               text_column=args.text_column, id_column=args.id_column)
+        writer = ResultWriter(output_file, detect_format(args.output, args.output_format))
+        stats = score_stream(chatbot, records, writer, batch_size=args.batch_size, workers=args.workers,
+                             progress=print_progress, progress_interval=args.progress_interval)
+    finally:
+        if args.input != "-":
+            input_file.close()
+        if args.output != "-":
+            output_file.close()
+    print_progress(stats)
+    print(f"Done in {stats['seconds']:.1f} s", file=sys.stderr)
+
+
 def main():
+    args = parse_args()
     setup_logging()
-    chatbot = FAQChatbot('data/faq_data.json')
+
+    init_start = time.perf_counter()
+    # ✅ Bulk scoring skips NER: entity hints only reword the low-confidence answer
+    chatbot = FAQChatbot(args.faq_file, snapshot_dir=args.snapshot_dir,
+                         download_nltk_data=args.download_nltk_data, vector_table=args.vector_table,
+                         hashing_features=args.hashing_features, build_workers=args.build_workers,
+                         entity_hints=args.command != "score")
+    init_seconds = time.perf_counter() - init_start
     logging.info("Chatbot initialized.")
+
+    if args.command == "score":
+        if args.startup_report:
+            print_startup_report(chatbot, init_seconds, file=sys.stderr)  # ✅ stdout may hold the results
+        run_scoring(chatbot, args)
+        return
+
+    if args.startup_report:
+        print_startup_report(chatbot, init_seconds)
+
     print("FAQ chatbot initialized. Type 'quit' to exit.")
     print("=" * 50)
-    
+
     while True:
         user_input = input("You: ")
         if user_input.lower() in ["quit", "exit", "bye"]:
             print("Chatbot: Goodbye!")
             break
-            
+
         response_data = chatbot.generate_response(user_input)
         response = response_data["answer"]
         confidence = response_data["confidence"]
-        
+
         print(f"Chatbot: {response}")
-        
-        # ✅ Handle low confidence responses without keyword search
+
+        # ✅ Handle low confidence responses with the model's runner-up FAQs
+        #    (keyword overlap as a fallback when nothing scored above zero)
         if confidence < chatbot.confidence_threshold:
-            print("I'm not sure. Could you clarify?")
+            suggestions = [suggestion["faq_id"] for suggestion in response_data["suggestions"]]
+            if not suggestions:
+                suggestions = [faq_id for faq_id, score in chatbot.keyword_search(user_input)]
+            if suggestions:
+                print("Did you mean one of these?")
+                for i, faq_id in enumerate(suggestions, 1):
+                    print(f"{i}. {chatbot.questions[faq_id]}")
+            else:
+                print("I'm not sure. Could you clarify?")
 
-if __name__ == '__main__':
-    main()
     logging.info("Chatbot exited.")
     print("Chatbot exited.")
     print("=" * 50)
+
+if __name__ == '__main__':
+    main()
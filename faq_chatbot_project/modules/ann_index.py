@@ -0,0 +1,167 @@
+import math
+
+import numpy as np
+
+from modules.embedding_matrix import EmbeddingMatrix
+from modules.index_buffers import GrowableArray
+
+
+class IVFIndex:
+    """
+    Approximate nearest-neighbour search over L2-normalized vectors (inverted file index).
+
+    The vectors are clustered with spherical k-means into `n_lists` lists. A query is
+    compared with the centroids first and then only with the vectors of its `n_probe`
+    closest lists, so the cost per query is about (n_lists + n_probe * N / n_lists) dot
+    products instead of N.
+
+    Knobs:
+    - n_lists: more lists → smaller lists (faster probes) but worse recall per probe.
+    - n_probe: more probed lists → higher recall, higher latency (n_probe = n_lists is exact).
+    """
+
+    def __init__(self, n_lists=None, n_probe=8, n_iter=10, sample_size=50000, seed=0):
+        """
+        Parameters:
+        - n_lists (int, optional): Number of clusters (default: about sqrt(N)).
+        - n_probe (int): Lists searched per query.
+        - n_iter (int): k-means iterations.
+        - sample_size (int): Vectors used to train the centroids (all of them if fewer).
+        - seed (int): Random seed for the centroid initialization.
+        """
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.n_iter = n_iter
+        self.sample_size = sample_size
+        self.seed = seed
+        self.centroids = None
+        self.lists = []
+        self.vectors = None
+
+    @property
+    def nbytes(self):
+        """Bytes held by the centroids and inverted lists (the vectors belong to the caller)."""
+        centroids = self.centroids.nbytes if self.centroids is not None else 0
+        return centroids + sum(inverted_list.nbytes for inverted_list in self.lists)
+
+    def config(self):
+        """
+        Returns:
+        - config (dict): Constructor arguments, used to build an unfitted copy.
+        """
+        return {"n_lists": self.n_lists, "n_probe": self.n_probe, "n_iter": self.n_iter,
+                "sample_size": self.sample_size, "seed": self.seed}
+
+    def fit(self, vectors):
+        """
+        Trains the centroids and assigns every vector to its list.
+
+        Parameters:
+        - vectors (np.ndarray, GrowableArray or EmbeddingMatrix): L2-normalized vectors, one
+          per row. A GrowableArray or EmbeddingMatrix is kept by reference, so rows appended
+          to it later can be registered with `add`. Quantized rows are converted on the fly.
+
+        Returns:
+        - self
+        """
+        if isinstance(vectors, GrowableArray):
+            vectors = EmbeddingMatrix(vectors)
+        elif not isinstance(vectors, EmbeddingMatrix):
+            vectors = EmbeddingMatrix.from_vectors(vectors)
+        self.vectors = vectors
+        n_rows = len(vectors)
+        n_lists = max(1, min(self.n_lists or int(math.sqrt(n_rows)), n_rows))
+
+        # ✅ Spherical k-means on a sample: assign by max dot product, re-normalize the means
+        rng = np.random.default_rng(self.seed)
+        sample = vectors.rows(rng.choice(n_rows, min(n_rows, max(self.sample_size, 1)), replace=False)) if n_rows \
+            else vectors.rows()
+        n_lists = max(1, min(n_lists, len(sample)))  # ✅ A centroid per sampled vector at most
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].astype(np.float32) if n_rows else \
+            np.zeros((1, vectors.dim), dtype=np.float32)
+
+        for _ in range(self.n_iter if n_rows else 0):
+            assignment = self._nearest_centroid(sample, centroids)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            empty = norms[:, 0] == 0
+            sums[empty] = centroids[empty]  # ✅ Keep the old centroid of an empty cluster
+            norms[empty] = 1.0
+            centroids = sums / norms
+
+        self.centroids = centroids
+        assignment = self._nearest_centroid(vectors, centroids)
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(len(centroids) + 1))
+        self.lists = [GrowableArray(order[bounds[i]:bounds[i + 1]].astype(np.int64)) for i in range(len(centroids))]
+        return self
+
+    def add(self, rows):
+        """
+        Registers rows that were appended to the indexed vectors after `fit`.
+
+        Parameters:
+        - rows (iterable): Row numbers of the new vectors.
+        """
+        rows = np.asarray(list(rows), dtype=np.int64)
+        if not len(rows):
+            return
+        assignment = self._nearest_centroid(self.vectors.rows(rows), self.centroids)
+        for row, list_id in zip(rows, assignment):
+            self.lists[list_id].append(np.array([row]))
+
+    def search(self, queries, k=1, active=None):
+        """
+        Finds approximately the k vectors with the highest dot product per query.
+
+        Parameters:
+        - queries (np.ndarray): L2-normalized query vectors, one per row.
+        - k (int): Number of results per query.
+        - active (np.ndarray, optional): Boolean mask of rows allowed in the results.
+
+        Returns:
+        - ids (np.ndarray): int64 matrix (len(queries), k), best first; -1 where fewer
+          than k candidates were found.
+        - scores (np.ndarray): Matching float32 scores (-inf for missing results).
+        """
+        queries = np.asarray(queries, dtype=np.float32)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        n_rows = len(self.vectors)
+
+        n_probe = min(self.n_probe, len(self.centroids))
+        centroid_scores = queries @ self.centroids.T
+        probes = np.argpartition(-centroid_scores, n_probe - 1, axis=1)[:, :n_probe]
+
+        for i, query in enumerate(queries):
+            candidates = np.concatenate([self.lists[list_id].view() for list_id in probes[i]])
+            candidates = candidates[candidates < n_rows]
+            if active is not None:
+                # ✅ `add` runs before the row is published in `active`
+                candidates = candidates[candidates < len(active)]
+                candidates = candidates[active[candidates]]
+            if not len(candidates):
+                continue
+
+            candidate_scores = self.vectors.rows(candidates) @ query
+            top = min(k, len(candidates))
+            best = np.argpartition(-candidate_scores, top - 1)[:top]
+            best = best[np.argsort(-candidate_scores[best], kind="stable")]
+            ids[i, :top] = candidates[best]
+            scores[i, :top] = candidate_scores[best]
+
+        return ids, scores
+
+    @staticmethod
+    def _nearest_centroid(vectors, centroids, chunk_size=8192):
+        """
+        Returns the index of the highest-scoring centroid per vector (chunked to bound memory).
+        `vectors` is an array or an EmbeddingMatrix (converted one chunk at a time).
+        """
+        rows = vectors.rows if isinstance(vectors, EmbeddingMatrix) else vectors.__getitem__
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            chunk = rows(slice(start, start + chunk_size))
+            assignment[start:start + chunk_size] = np.argmax(chunk @ centroids.T, axis=1)
+        return assignment
@@ -0,0 +1,251 @@
+import csv
+import json
+import logging
+import multiprocessing
+import queue
+import time
+
+from modules.exception import FAQException
+from modules.parallel_build import can_fork
+from modules.worker_pool import PreforkPool
+
+INPUT_FORMATS = ("csv", "jsonl")
+RESULT_FIELDS = ("id", "faq_id", "best_faq_id", "confidence", "answer", "error")
+
+
+def detect_format(path, fmt=None):
+    """
+    Returns the format of a query or result file: `fmt` if given, else from the file
+    extension (".csv" → "csv"), "jsonl" otherwise (also for stdin / stdout, "-").
+    """
+    if fmt:
+        return fmt
+    return "csv" if path and path != "-" and path.lower().endswith(".csv") else "jsonl"
+
+
+def iter_queries(file, fmt, text_column="query", id_column=None):
+    """
+    Streams the queries of a CSV or JSONL file, one record at a time.
+
+    Parameters:
+    - file (file object): Text stream (a file or stdin).
+    - fmt (str): "csv" (with a header row) or "jsonl" (one JSON object, or string, per line).
+    - text_column (str): Column / key holding the query text.
+    - id_column (str, optional): Column / key identifying the record in the results
+      (default: the record number, from 1).
+
+    Yields:
+    - record (tuple): (record id, query text, error). Records without a readable query
+      (malformed JSON, missing key) have a None text and say why in `error`; they are not
+      scored but still get a result row.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(file)
+        if reader.fieldnames is None:
+            return
+        missing = [column for column in (text_column, id_column) if column and column not in reader.fieldnames]
+        if missing:
+            raise FAQException(f"CSV input has no column {', '.join(missing)} (columns: {reader.fieldnames})")
+        for number, row in enumerate(reader, 1):
+            text = row[text_column]  # ✅ None in a row with too few fields
+            yield (row[id_column] if id_column else number), text, None if text is not None else f"no '{text_column}' value"
+        return
+
+    number = 0
+    for line_number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        number += 1
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            logging.warning(f"Skipping malformed JSON on line {line_number}: {e}")
+            yield number, None, f"malformed JSON: {e}"
+            continue
+        if isinstance(record, str):
+            yield number, record, None
+        elif isinstance(record, dict) and isinstance(record.get(text_column), str):
+            yield (record.get(id_column, number) if id_column else number), record[text_column], None
+        else:
+            logging.warning(f"Skipping line {line_number}: no '{text_column}' text")
+            yield (record.get(id_column, number) if id_column and isinstance(record, dict) else number), None, \
+                f"no '{text_column}' text"
+
+
+class ResultWriter:
+    """
+    Writes scoring results as JSONL or CSV (`RESULT_FIELDS` columns), flushed after every chunk.
+    """
+
+    def __init__(self, file, fmt):
+        """
+        Parameters:
+        - file (file object): Output text stream (a file or stdout).
+        - fmt (str): "jsonl" or "csv".
+        """
+        self.file = file
+        self.csv_writer = None
+        if fmt == "csv":
+            self.csv_writer = csv.DictWriter(file, fieldnames=RESULT_FIELDS)
+            self.csv_writer.writeheader()
+
+    def write(self, rows):
+        """
+        Writes the result rows of one chunk.
+        """
+        if self.csv_writer is not None:
+            self.csv_writer.writerows(rows)
+        else:
+            self.file.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+        self.file.flush()
+
+
+def _score_chunk(chatbot, queries):
+    """
+    Scores a chunk of queries in one vectorized `generate_responses` call.
+
+    Returns:
+    - results (list): (faq_id, best_faq_id, confidence, answer) per query. `faq_id` is None
+      below the confidence threshold, where `best_faq_id` is still the closest FAQ (if any).
+    """
+    results = []
+    for response in chatbot.generate_responses(queries):
+        faq_id = response["faq_id"]
+        if faq_id is None and response["suggestions"]:
+            best_faq_id = response["suggestions"][0]["faq_id"]
+        else:
+            best_faq_id = faq_id
+        results.append((None if faq_id is None else int(faq_id),
+                        None if best_faq_id is None else int(best_faq_id),
+                        float(response["confidence"]), response["answer"]))
+    return results
+
+
+def _scoring_worker(chatbot, worker_id, tasks, results):
+    """
+    Worker: scores chunks from `tasks` until it receives None, sending (sequence, results, error).
+    """
+    for sequence, queries in iter(tasks.get, None):
+        try:
+            results.put((sequence, _score_chunk(chatbot, queries), None))
+        except Exception as e:
+            results.put((sequence, None, str(e)))
+
+
+def _chunks(records, batch_size):
+    """
+    Groups (id, text, error) records into chunks of up to `batch_size` scorable queries.
+
+    Yields:
+    - chunk (tuple): (entries, queries): (record id, error) of every record of the chunk
+      in input order (error None for the scored ones), and the texts to score.
+    """
+    entries, queries = [], []
+    for record_id, text, error in records:
+        entries.append((record_id, error if text is None else None))
+        if text is not None:
+            queries.append(text)
+            if len(queries) >= batch_size:
+                yield entries, queries
+                entries, queries = [], []
+    if entries:
+        yield entries, queries
+
+
+def score_stream(chatbot, records, writer, batch_size=256, workers=1, progress=None, progress_interval=5.0):
+    """
+    Scores a stream of queries chunk by chunk and writes the results in input order,
+    one row per record: unreadable records get a row with their `error` only, so the
+    output can be joined with the input by position as well as by id.
+
+    With several workers, the chatbot is forked into a `PreforkPool` (model arrays in shared
+    memory) and chunks are scored in parallel. At most two chunks per worker are in flight,
+    so memory stays the same whatever the size of the input.
+
+    Parameters:
+    - chatbot (FAQChatbot): Initialized chatbot.
+    - records (iterable): (id, query text, error) records, e.g. from `iter_queries`.
+    - writer (ResultWriter): Destination of the result rows.
+    - batch_size (int): Queries per chunk (one `generate_responses` call).
+    - workers (int): Worker processes (1 = score in this process; also without fork support).
+    - progress (callable, optional): Called with the running stats every `progress_interval` seconds.
+    - progress_interval (float): Seconds between two progress calls.
+
+    Returns:
+    - stats (dict): "queries" scored, "answered" (above the confidence threshold), "skipped"
+      records (written with an error), "seconds" and "queries_per_second".
+    """
+    stats = {"queries": 0, "answered": 0, "skipped": 0, "seconds": 0.0, "queries_per_second": 0.0}
+    start = last_report = time.perf_counter()
+
+    def emit(entries, results):
+        nonlocal last_report
+        scored = iter(results)
+        rows = []
+        for record_id, error in entries:
+            if error is None:
+                rows.append(dict(zip(RESULT_FIELDS, (record_id,) + next(scored) + (None,))))
+            else:
+                rows.append(dict(zip(RESULT_FIELDS, (record_id, None, None, None, None, error))))
+        writer.write(rows)
+        stats["queries"] += len(results)
+        stats["skipped"] += len(entries) - len(results)
+        stats["answered"] += sum(1 for result in results if result[0] is not None)
+        now = time.perf_counter()
+        stats["seconds"] = now - start
+        stats["queries_per_second"] = stats["queries"] / stats["seconds"] if stats["seconds"] else 0.0
+        if progress is not None and now - last_report >= progress_interval:
+            last_report = now
+            progress(dict(stats))
+
+    if workers > 1 and not can_fork():
+        logging.warning("Worker processes need fork: scoring in this process")
+        workers = 1
+
+    if workers <= 1:
+        for entries, queries in _chunks(records, batch_size):
+            emit(entries, _score_chunk(chatbot, queries) if queries else [])
+    else:
+        context = multiprocessing.get_context("fork")
+        tasks, results = context.Queue(), context.Queue()
+        pool = PreforkPool(chatbot, n_workers=workers)
+        pool.start(_scoring_worker, tasks, results)
+        pending = {}  # ✅ Sequence → record entries of the chunks in flight
+        done = {}  # ✅ Sequence → results received ahead of an earlier chunk
+        next_write = 0
+
+        def collect():
+            nonlocal next_write
+            while True:
+                try:
+                    sequence, chunk_results, error = results.get(timeout=1.0)
+                    break
+                except queue.Empty:
+                    if not all(process.is_alive() for process in pool.workers):
+                        raise FAQException("A scoring worker exited unexpectedly")
+            if error is not None:
+                raise FAQException(f"Failed to score chunk {sequence}: {error}")
+            done[sequence] = chunk_results
+            while next_write in done:
+                emit(pending.pop(next_write), done.pop(next_write))
+                next_write += 1
+
+        try:
+            for sequence, (entries, queries) in enumerate(_chunks(records, batch_size)):
+                while len(pending) >= 2 * workers:
+                    collect()
+                pending[sequence] = entries
+                tasks.put((sequence, queries))
+            while pending:
+                collect()
+        finally:
+            for _ in pool.workers:
+                tasks.put(None)
+            pool.stop()
+
+    stats["seconds"] = time.perf_counter() - start
+    stats["queries_per_second"] = stats["queries"] / stats["seconds"] if stats["seconds"] else 0.0
+    logging.info(f"Scored {stats['queries']} queries in {stats['seconds']:.1f} s "
+                 f"({stats['queries_per_second']:.0f} queries/s, {workers} workers)")
+    return stats
+
@@ -1,6 +1,8 @@
 import logging
 import os
 import sys
+import threading
+import time
 
 # ✅ Setup logging
 log_directory = os.path.dirname(os.path.abspath(__file__))  # Log file in modules folder
@@ -18,10 +20,38 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(project_root)
 
 # ✅ Import required modules
-from modules.data_loader import load_faq_data, save_faq_data
+from modules.data_loader import iter_faq_data, resolve_faq_path, save_faq_data
 from modules.text_processor import TextProcessor
 from modules.model import FAQModel
+from modules.parallel_build import can_fork, preprocess_parallel
 from modules.exception import FAQException
+from modules.faq_store import FAQStore
+from modules.index_snapshot import file_hash, load_snapshot, save_snapshot
+from modules.keyword_index import KeywordIndex
+from modules.metrics import Metrics, NULL_METRICS
+from modules.query_analysis import QueryAnalysis
+from modules.response_cache import ResponseCache
+from modules.suggestion_index import SuggestionIndex
+
+
+class _FAQBundle:
+    """
+    Everything built from one version of the FAQ file: the store, the indexes and the model.
+
+    The chatbot holds exactly one bundle and replaces it as a whole on reload. A query
+    reads `chatbot._bundle` once and uses that bundle throughout, so queries in flight
+    during a swap finish on the version they started with.
+    """
+
+    __slots__ = ("version", "data_hash", "faqs", "keyword_index", "suggestion_index", "model")
+
+    def __init__(self, version, data_hash, faqs, keyword_index, suggestion_index, model):
+        self.version = version
+        self.data_hash = data_hash
+        self.faqs = faqs
+        self.keyword_index = keyword_index
+        self.suggestion_index = suggestion_index
+        self.model = model
 
 
 class FAQChatbot:
@@ -29,46 +59,281 @@ class FAQChatbot:
     Main chatbot class for handling FAQ-based queries using machine learning.
     """
 
-    def __init__(self, faq_file=None, confidence_threshold=0.4):
+    def __init__(self, faq_file=None, confidence_threshold=0.4, snapshot_dir=None, download_nltk_data=False,
+                 ann_index=None, cache_size=1024, cache_ttl=None, fast_preprocessing=False,
+                 metrics=None, max_suggestions=3, tfidf_weight=0.4, spacy_weight=0.6, watch_interval=None,
+                 text_processor=None, entity_hints=False, capture=None, embedding_dtype="float32",
+                 vector_table=None, hashing_features=None, build_workers=1):
         """
         Initializes the chatbot.
 
-        :param faq_file: Path to the FAQ JSON file (optional).
+        :param faq_file: Path to the FAQ file: a JSON document or JSON Lines (.jsonl), streamed
+                         entry by entry (see `data_loader.iter_faq_data`).
         :param confidence_threshold: Minimum confidence required to return a valid answer.
+        :param snapshot_dir: Directory for persisted index snapshots (optional). When set,
+                             a snapshot matching the FAQ file's hash and the preprocessing mode
+                             is memory-mapped instead of refitting the model, and a new one is
+                             written when the FAQ file or the mode has changed.
+        :param download_nltk_data: Download missing NLTK resources at startup. By default they
+                                   are only checked locally, so startup works offline.
+        :param ann_index: Unfitted `IVFIndex` for approximate Spacy similarity on very large
+                          FAQ sets (optional, exact search by default).
+        :param cache_size: Maximum number of cached responses, keyed by the preprocessed query
+                           (0 disables the cache).
+        :param cache_ttl: Seconds a cached response stays valid (optional, no expiry by default).
+        :param fast_preprocessing: Use TextProcessor's regex tokenizer and lemma memo
+                                   (high-throughput path) instead of NLTK's word_tokenize.
+        :param metrics: `Metrics` instance collecting per-stage latency histograms and
+                        counters of the query path (optional, disabled by default).
+        :param max_suggestions: Number of "did you mean" questions returned with low-confidence
+                                responses (taken from the same ranking as the best match).
+        :param tfidf_weight: Weight of the TF-IDF similarity in the fused match score.
+        :param spacy_weight: Weight of the Spacy vector similarity in the fused match score.
+        :param watch_interval: Seconds between checks of the FAQ file for changes (optional,
+                               off by default). A changed file is reloaded in the background
+                               and swapped in without interrupting queries (see `reload`).
+        :param text_processor: `TextProcessor` to use (optional), e.g. one shared by several
+                               chatbots. `download_nltk_data` and `fast_preprocessing` are then ignored.
+        :param entity_hints: Mention the named entities of the query in low-confidence answers
+                             (default: off). NER only runs for those queries, and needs the
+                             full Spacy model (not just a `vector_table`).
+        :param capture: `QueryCapture` recording every answered query with its per-stage timings
+                        to rotating JSONL in the background (optional). The stages are timed
+                        through `metrics`; a `Metrics` instance is created if none was given.
+        :param embedding_dtype: Storage of the question embeddings: "float32", "float16" or "int8"
+                                (per-row scaled). Quantized embeddings take a half or a quarter of
+                                the memory for slightly different Spacy scores (see `FAQModel`).
+        :param vector_table: Directory of a compact word-vector table (`modules.vector_table`) used
+                             instead of loading the full Spacy model (optional).
+        :param hashing_features: Buckets of a hashed TF-IDF n-gram space (e.g. 2**28) replacing the
+                                 fitted vocabulary (optional). Lets the index be built in shards.
+        :param build_workers: Processes building the index and preprocessing the questions
+                              (1 = in this process). See `FAQModel`.
         """
         try:
             logging.info("Initializing chatbot...")
+            self.startup_timings = {}
+            self.metrics = metrics if metrics is not None else NULL_METRICS
+            self.capture = capture
+            if capture is not None:
+                if self.metrics is NULL_METRICS:
+                    self.metrics = Metrics()
+                self.metrics.add_hook(capture.observe_stage)  # ✅ Stage timings of each captured query
 
             # ✅ Ensure the FAQ file is provided
             if not faq_file:
                 raise FAQException("No FAQ file provided. Please check the path.")
+            self.faq_file = resolve_faq_path(faq_file)
+            self.snapshot_dir = snapshot_dir
+            self._ann_index = ann_index
+            self._fusion_weights = (tfidf_weight, spacy_weight)
+            self._embedding_dtype = embedding_dtype
+            self._vector_table = vector_table
+            self._hashing_features = hashing_features
+            self._build_workers = build_workers
 
-            # ✅ Load FAQ data correctly
-            self.faq_data = load_faq_data()  # ✅ Fix: Pass the file path
+            # ✅ Initialize text processor (NLTK resources are checked locally, not downloaded)
+            start = time.perf_counter()
+            if text_processor is None:
+                text_processor = TextProcessor(download_missing=download_nltk_data, fast=fast_preprocessing)
+            self.text_processor = text_processor
+            self.startup_timings["text_processor"] = time.perf_counter() - start
 
-            if not self.faq_data:
-                raise FAQException("FAQ data is empty. Please check the data file.")
+            # ✅ Everything built from the FAQ file lives in one bundle, swapped as a whole on reload
+            self._file_state = self._stat_faq_file()
+            data_hash = file_hash(self.faq_file) if snapshot_dir or watch_interval else None
+            self._bundle = self._build_bundle(1, data_hash, self.startup_timings)
+            self.last_reload = None
+            self._reload_lock = threading.Lock()  # ✅ One reload at a time
 
-            # ✅ Extract questions & answers
-            self.questions = [entry["question"] for entry in self.faq_data]
-            self.answers = [entry["answer"] for entry in self.faq_data]
+            self._faq_lock = threading.Lock()
+            self._faq_version = 0  # ✅ Bumped on every FAQ change (cache invalidation)
 
-            # ✅ Initialize text processor & preprocess questions
-            self.text_processor = TextProcessor()
-            processed_questions = [self.text_processor.preprocess_text(q) for q in self.questions]
+            self.max_suggestions = max_suggestions
+            self.entity_hints = entity_hints
 
-            # ✅ Initialize ML model for matching using ORIGINAL questions
-            self.model = FAQModel(self.questions)  # ✅ Fix: Pass only original questions
+            # ✅ LRU cache of responses for repeated (normalized) queries
+            self.response_cache = ResponseCache(maxsize=cache_size, ttl=cache_ttl)
 
             # ✅ Set confidence threshold
             self.confidence_threshold = confidence_threshold
 
+            self._watch_stop = threading.Event()
+            self._watcher = None
+            if watch_interval:
+                self.start_watching(watch_interval)
+
             logging.info("Chatbot successfully initialized.")
 
         except Exception as e:
             logging.error(f"Error initializing chatbot: {e}")
             raise FAQException("Failed to initialize chatbot", cause=e)
 
+    def _build_bundle(self, version, data_hash, timings, previous=None):
+        """
+        Loads the FAQ file and builds the FAQ store, the indexes and the model for it.
+
+        :param version: Index version number of the new bundle.
+        :param data_hash: Hash of the FAQ file (used for snapshots and to skip unchanged reloads).
+        :param timings: Dictionary receiving the duration of each stage.
+        :param previous: Bundle being replaced (optional); its typeahead popularity is carried over.
+        :return: The new `_FAQBundle`.
+        """
+        # ✅ Reuse a persisted index built from the same FAQ file, if available
+        start = time.perf_counter()
+        snapshot = None
+        if self.snapshot_dir:
+            snapshot = load_snapshot(self.snapshot_dir, data_hash, preprocessing=self.text_processor.mode)
+
+        if snapshot is not None:
+            faqs = snapshot["faqs"]  # ✅ Memory-mapped, copied only when FAQs change
+        else:
+            # ✅ Stream the entries of the configured file straight into the compact FAQ store
+            #    (the file is never held in memory as a whole)
+            faqs = FAQStore.from_entries(iter_faq_data(self.faq_file))
+
+            if not len(faqs):
+                raise FAQException("FAQ data is empty. Please check the data file.")
+        timings["faq_load"] = time.perf_counter() - start
+
+        # ✅ Keyword fallback: inverted index over the preprocessed questions
+        start = time.perf_counter()
+        processed_questions = snapshot.get("processed_questions") if snapshot is not None else None
+        if processed_questions is None and self._build_workers > 1 and len(faqs) > 1 and can_fork():
+            processed_questions = preprocess_parallel(self.text_processor, faqs.questions, self._build_workers)
+        elif processed_questions is None:
+            processed_questions = self.text_processor.preprocess_many(faqs.questions)
+        keyword_index = KeywordIndex(enumerate(processed_questions))
+        timings["keyword_index"] = time.perf_counter() - start
+
+        # ✅ Typeahead: prefix index over the question words, ranked by answers served
+        start = time.perf_counter()
+        popularity = self._carried_popularity(previous, faqs) if previous is not None else None
+        suggestion_index = SuggestionIndex(faqs, popularity=popularity)
+        timings["suggestion_index"] = time.perf_counter() - start
+
+        # ✅ Initialize ML model for matching using ORIGINAL questions
+        #    (the Spacy pipeline is loaded once per process, reloads only refit the index)
+        tfidf_weight, spacy_weight = self._fusion_weights
+        model = FAQModel(faqs.questions, snapshot=snapshot, ann_index=self._ann_index,
+                         metrics=self.metrics, tfidf_weight=tfidf_weight, spacy_weight=spacy_weight,
+                         embedding_dtype=self._embedding_dtype, vector_table=self._vector_table,
+                         hashing_features=self._hashing_features, build_workers=self._build_workers)  # ✅ Fix: Pass only original questions
+        timings.update(model.startup_timings)
+
+        # ✅ Persist the freshly fitted index for the next start
+        if self.snapshot_dir and not model.from_snapshot:
+            start = time.perf_counter()
+            save_snapshot(self.snapshot_dir, data_hash, model, faqs, processed_questions=processed_questions,
+                          preprocessing=self.text_processor.mode)
+            timings["snapshot_save"] = time.perf_counter() - start
+
+        return _FAQBundle(version, data_hash, faqs, keyword_index, suggestion_index, model)
+
+    @staticmethod
+    def _carried_popularity(previous, faqs):
+        """
+        Typeahead popularity of a previous bundle, matched to the new FAQ ids by question text.
+        """
+        counts = previous.suggestion_index.counts()
+        by_question = {previous.faqs.question(faq_id): count for faq_id, count in counts.items()
+                       if previous.faqs.is_live(faq_id)}
+        if not by_question:
+            return None
+        return {faq_id: by_question[question] for faq_id, question in enumerate(faqs.questions)
+                if question in by_question}
+
+    def reload(self):
+        """
+        Rebuilds the FAQ store, indexes and model from the FAQ file and swaps them in atomically.
+
+        The new version is built in the calling thread while queries keep being answered by
+        the current one; queries in flight during the swap finish on the old version. The
+        file is the source of truth: runtime changes (`add_faq`, ...) not written to it are
+        dropped. If loading fails, the current version keeps serving.
+
+        :return: True if a new index version was swapped in, False if the file content is unchanged.
+        """
+        with self._reload_lock:
+            start = time.perf_counter()
+            previous = self._bundle
+            try:
+                self._file_state = self._stat_faq_file()
+                data_hash = file_hash(self.faq_file)
+                if data_hash == previous.data_hash:
+                    logging.info("FAQ file content unchanged, reload skipped.")
+                    return False
+
+                timings = {}
+                bundle = self._build_bundle(previous.version + 1, data_hash, timings, previous=previous)
+            except Exception as e:
+                duration = time.perf_counter() - start
+                self.last_reload = {"index_version": previous.version, "duration_seconds": duration,
+                                    "finished_at": time.time(), "error": str(e)}
+                self.metrics.record_reload(duration, previous.version, failed=True)
+                logging.error(f"Error reloading FAQ data (still serving version {previous.version}): {e}")
+                raise FAQException("Failed to reload FAQ data", cause=e)
+
+            # ✅ Atomic swap: one reference assignment, serialized with runtime FAQ changes
+            with self._faq_lock:
+                self._bundle = bundle
+                self._faq_version += 1
+                self.response_cache.clear()
+
+            duration = time.perf_counter() - start
+            self.last_reload = {"index_version": bundle.version, "duration_seconds": duration,
+                                "finished_at": time.time(), "faqs": bundle.faqs.n_live, "timings": timings,
+                                "error": None}
+            self.metrics.record_reload(duration, bundle.version)
+            logging.info(f"Reloaded {bundle.faqs.n_live} FAQs as index version {bundle.version} "
+                         f"in {duration:.2f} s")
+            return True
+
+    def start_watching(self, interval=2.0):
+        """
+        Starts a background thread that reloads the FAQ file when it changes.
+
+        :param interval: Seconds between two checks of the file's modification time and size.
+        """
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._watch_stop.clear()
+        self._watcher = threading.Thread(target=self._watch, args=(interval,), name="faq-file-watcher",
+                                         daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self):
+        """
+        Stops the file watcher thread (a reload in progress is completed first).
+        """
+        self._watch_stop.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval):
+        while not self._watch_stop.wait(interval):
+            state = self._stat_faq_file()
+            if state is None or state == self._file_state:
+                continue
+            # ✅ Wait until the file stops changing (it may still be being written)
+            if self._watch_stop.wait(interval) or self._stat_faq_file() != state:
+                continue
+            try:
+                self.reload()
+            except FAQException:
+                pass  # ✅ Logged by reload, the current version keeps serving
+
+    def _stat_faq_file(self):
+        """
+        Returns the (modification time, size, inode) of the FAQ file, or None if it is missing.
+        """
+        try:
+            stat = os.stat(self.faq_file)
+        except OSError:
+            return None  # ✅ E.g. while being replaced
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
     def generate_response(self, query):
         """
         Generates a response to a user query.
@@ -77,42 +342,396 @@ class FAQChatbot:
         :return: A dictionary containing:
             - "answer": The chatbot's response.
             - "matched_question": The best-matching FAQ question (if any).
+            - "faq_id": Its id (if any).
             - "confidence": The confidence score.
+            - "suggestions": For low-confidence responses, the closest FAQs as
+              {"faq_id", "question", "confidence"} dictionaries, best first (else empty).
+            - "entities": For low-confidence responses, the named entities of the query
+              {EntityType: EntityText} (else empty).
         """
+        start = time.perf_counter()
+        metrics = self.metrics
+        bundle = self._bundle  # ✅ One index version for the whole query
+        capture = self.capture
+        if capture is not None:
+            arrived = time.time()
+            stages = capture.begin()
         try:
             if not query.strip():
+                metrics.empty_queries.inc()
                 return {
                     "answer": "Please enter a valid question.",
                     "matched_question": None,
-                    "confidence": 0.0
+                    "faq_id": None,
+                    "confidence": 0.0,
+                    "suggestions": [],
+                    "entities": {}
                 }
 
-            # ✅ Preprocess the user query
-            processed_query = self.text_processor.preprocess_text(query)
+            # ✅ Analyze the query once: preprocessing, the vector lookup and NER share it
+            analysis = QueryAnalysis(query, self.text_processor, bundle.model)
+            with metrics.stage("preprocess"):
+                processed_query = analysis.processed
 
-            # ✅ Find the best match using the ML model
-            best_match, confidence = self.model.find_best_match(processed_query)
+            # ✅ Repeated queries are answered from the cache
+            with metrics.stage("cache_lookup"):
+                version = self._cache_version(bundle)
+                cached = self.response_cache.get(processed_query, version)
+            if cached is not None:
+                self._record_popularity(cached, bundle)
+                response = self._add_entity_hints(dict(cached), analysis)
+                latency = time.perf_counter() - start
+                metrics.record_response(latency, cached["confidence"], cached["matched_question"] is None, cached=True)
+                if capture is not None:
+                    capture.record(arrived, query, response, latency, stages, cached=True,
+                                   index_version=bundle.version)
+                return response
 
-            # ✅ Return the answer if confidence is high enough
-            if confidence >= self.confidence_threshold:
-                answer = self.answers[self.questions.index(best_match)]  # ✅ Fix: Correct way to get the answer
-                return {
-                    "answer": answer,
-                    "matched_question": best_match,
-                    "confidence": confidence
-                }
+            # ✅ Rank the FAQs once: the best match and the suggestions come from the same pass
+            with metrics.stage("match"):
+                matches = bundle.model.find_top_k(analysis, k=1 + self.max_suggestions)
 
-            # ✅ Handle low-confidence cases
-            return {
-                "answer": "I'm not sure I understand your question fully. Could you rephrase it?",
-                "matched_question": None,
-                "confidence": confidence
-            }
+            with metrics.stage("answer_lookup"):
+                response = self._build_response(matches, bundle)
+            self.response_cache.put(processed_query, response, version)
+            self._record_popularity(response, bundle)
+            result = self._add_entity_hints(dict(response), analysis)
+            latency = time.perf_counter() - start
+            metrics.record_response(latency, response["confidence"], response["matched_question"] is None)
+            if capture is not None:
+                capture.record(arrived, query, result, latency, stages, index_version=bundle.version)
+            return result
 
         except Exception as e:
+            metrics.errors.inc()
             logging.error(f"Error generating response: {e}")
             raise FAQException("Failed to generate response", cause=e)
 
+    def generate_responses(self, queries):
+        """
+        Generates responses for many user queries in one vectorized pass.
+
+        :param queries: List of user input questions.
+        :return: A list with one response dictionary per query, in input order,
+                 identical to what `generate_response` returns for each query.
+        """
+        start = time.perf_counter()
+        metrics = self.metrics
+        bundle = self._bundle  # ✅ One index version for the whole batch
+        capture = self.capture
+        if capture is not None:
+            arrived = time.time()
+            stages = capture.begin()
+        try:
+            cached_positions = set()
+            responses = [None] * len(queries)
+            pending = {}  # ✅ Preprocessed query → positions (repeats in a batch are scored once)
+            version = self._cache_version(bundle)
+
+            positions = []
+            for i, query in enumerate(queries):
+                if query.strip():
+                    positions.append(i)
+                else:
+                    metrics.empty_queries.inc()
+                    responses[i] = {
+                        "answer": "Please enter a valid question.",
+                        "matched_question": None,
+                        "faq_id": None,
+                        "confidence": 0.0,
+                        "suggestions": [],
+                        "entities": {}
+                    }
+
+            # ✅ Preprocess the whole batch in one call (fast path when enabled)
+            with metrics.stage("preprocess"):
+                processed = self.text_processor.preprocess_many([queries[i] for i in positions])
+            analyses = {i: QueryAnalysis(queries[i], self.text_processor, bundle.model, processed=processed_query)
+                        for i, processed_query in zip(positions, processed)}
+
+            with metrics.stage("cache_lookup"):
+                for i, processed_query in zip(positions, processed):
+                    if processed_query in pending:
+                        pending[processed_query].append(i)
+                        continue
+                    cached = self.response_cache.get(processed_query, version)
+                    if cached is not None:
+                        responses[i] = self._add_entity_hints(dict(cached), analyses[i])
+                        cached_positions.add(i)
+                        self._record_popularity(cached, bundle)
+                        metrics.record_response(None, cached["confidence"], cached["matched_question"] is None,
+                                                cached=True)
+                    else:
+                        pending[processed_query] = [i]
+
+            # ✅ Score all remaining queries against the FAQ set at once
+            processed_queries = list(pending)
+            with metrics.stage("match"):
+                matches = bundle.model.find_top_k_many([analyses[pending[processed_query][0]]
+                                                        for processed_query in processed_queries],
+                                                       k=1 + self.max_suggestions)
+
+            with metrics.stage("answer_lookup"):
+                for processed_query, query_matches in zip(processed_queries, matches):
+                    response = self._build_response(query_matches, bundle)
+                    self.response_cache.put(processed_query, response, version)
+                    for i in pending[processed_query]:
+                        responses[i] = self._add_entity_hints(dict(response), analyses[i])
+                        self._record_popularity(response, bundle)
+                        metrics.record_response(None, response["confidence"], response["matched_question"] is None)
+
+            if capture is not None:
+                latency = time.perf_counter() - start
+                for i in positions:
+                    capture.record(arrived, queries[i], responses[i], latency, stages, cached=i in cached_positions,
+                                   batch_size=len(queries), index_version=bundle.version)
+            return responses
+
+        except Exception as e:
+            metrics.errors.inc()
+            logging.error(f"Error generating responses: {e}")
+            raise FAQException("Failed to generate responses", cause=e)
+
+    @property
+    def faqs(self):
+        """The `FAQStore` of the current index version."""
+        return self._bundle.faqs
+
+    @property
+    def model(self):
+        """The `FAQModel` of the current index version."""
+        return self._bundle.model
+
+    @property
+    def keyword_index(self):
+        return self._bundle.keyword_index
+
+    @property
+    def suggestion_index(self):
+        return self._bundle.suggestion_index
+
+    @property
+    def index_version(self):
+        """Number of the index version serving queries: 1 at startup, +1 per reload."""
+        return self._bundle.version
+
+    @property
+    def questions(self):
+        """FAQ question per id (a `StringTable`; removed FAQs keep their id, see `faqs.is_live`)."""
+        return self.faqs.questions
+
+    @property
+    def answers(self):
+        """FAQ answer per id (a `StringTable`)."""
+        return self.faqs.answers
+
+    @property
+    def confidence_threshold(self):
+        """Minimum confidence required to return a FAQ answer."""
+        return self._confidence_threshold
+
+    @confidence_threshold.setter
+    def confidence_threshold(self, value):
+        self._confidence_threshold = value
+        self.response_cache.clear()  # ✅ Cached responses were built with the old threshold
+
+    def _cache_version(self, bundle):
+        """
+        Everything a cached response depends on besides the query: a cached entry
+        stored under another version is treated as a miss.
+        """
+        return (bundle.version, bundle.model.version, self._faq_version, self._confidence_threshold)
+
+    def memory_usage(self):
+        """
+        Estimates the memory held by this chatbot's FAQ data and indexes. The Spacy pipeline
+        and word vectors are shared by all chatbots of the process and not counted.
+
+        :return: Dictionary of bytes per component ("faqs", "model", "keyword_index",
+                 "suggestion_index") and their "total".
+        """
+        bundle = self._bundle
+        usage = {
+            "faqs": bundle.faqs.nbytes,
+            "model": bundle.model.nbytes,
+            "keyword_index": bundle.keyword_index.nbytes,
+            "suggestion_index": bundle.suggestion_index.nbytes,
+        }
+        usage["total"] = sum(usage.values())
+        return usage
+
+    def cache_stats(self):
+        """
+        Returns the response cache counters.
+
+        :return: Dictionary with hits, misses, hit_rate, size and maxsize.
+        """
+        return self.response_cache.stats()
+
+    def keyword_search(self, query, k=3):
+        """
+        Keyword fallback for low-confidence queries ("Did you mean ...?").
+
+        :param query: The user's input question.
+        :param k: Maximum number of suggestions.
+        :return: Up to k (faq_id, overlap score) tuples, best first. Use the id with
+                 `questions` / `answers`.
+        """
+        return self.keyword_index.search(self.text_processor.preprocess_text(query), k)
+
+    def suggest(self, text, n=5):
+        """
+        Typeahead: completes a partially typed question to existing FAQ questions.
+
+        :param text: What the user typed so far (the last word may be incomplete).
+        :param n: Maximum number of completions.
+        :return: Up to n {"faq_id", "question"} dictionaries, most asked first.
+        """
+        bundle = self._bundle
+        return [{"faq_id": faq_id, "question": bundle.faqs.question(faq_id)}
+                for faq_id in bundle.suggestion_index.suggest(text, n)]
+
+    @staticmethod
+    def _record_popularity(response, bundle):
+        """
+        Counts an answered FAQ towards its typeahead ranking.
+        """
+        if response["faq_id"] is not None:
+            bundle.suggestion_index.record(response["faq_id"])
+
+    def add_faq(self, question, answer):
+        """
+        Adds a FAQ at runtime. It is searchable immediately, without re-fitting the model.
+
+        :param question: The FAQ question.
+        :param answer: The FAQ answer.
+        :return: The id of the new FAQ (its position in `questions` / `answers`).
+        """
+        if not question.strip() or not answer.strip():
+            raise FAQException("Question and answer must not be empty.")
+
+        with self._faq_lock:
+            faq_id = self.faqs.add(question, answer)
+            self.model.add_question(question, faq_id)
+            self.keyword_index.add(faq_id, self.text_processor.preprocess_text(question))
+            self.suggestion_index.questions_changed()
+            self._faq_version += 1
+            self.response_cache.clear()
+
+        logging.info(f"Added FAQ {faq_id}: {question}")
+        return faq_id
+
+    def update_faq(self, faq_id, question=None, answer=None):
+        """
+        Changes the question and/or answer of an existing FAQ at runtime.
+
+        :param faq_id: Id returned by `add_faq` (or position in the FAQ file).
+        :param question: New question text (optional).
+        :param answer: New answer text (optional).
+        """
+        with self._faq_lock:
+            old_question = self._get_live_question(faq_id)
+
+            if answer is not None:
+                self.faqs.update(faq_id, answer=answer)
+
+            if question is not None and question != old_question:
+                self.faqs.update(faq_id, question=question)
+                self.model.update_question(faq_id, question)
+                self.keyword_index.add(faq_id, self.text_processor.preprocess_text(question))
+                self.suggestion_index.questions_changed()
+            self._faq_version += 1
+            self.response_cache.clear()
+
+        logging.info(f"Updated FAQ {faq_id}")
+
+    def remove_faq(self, faq_id):
+        """
+        Removes a FAQ at runtime. Its id is not reused.
+
+        :param faq_id: Id returned by `add_faq` (or position in the FAQ file).
+        """
+        with self._faq_lock:
+            question = self._get_live_question(faq_id)
+            self.model.remove_question(faq_id)
+            self.keyword_index.remove(faq_id)
+            self.faqs.remove(faq_id)
+            self._faq_version += 1
+            self.response_cache.clear()
+
+        logging.info(f"Removed FAQ {faq_id}: {question}")
+
+    def compact_index(self):
+        """
+        Re-fits the model's TF-IDF weights over the current FAQs and drops removed rows.
+        Runs automatically in the background after enough changes; call it to force one.
+        """
+        self.model.compact()
+
+    def _get_live_question(self, faq_id):
+        """
+        Returns the question of a FAQ that has not been removed.
+        """
+        if not self.faqs.is_live(faq_id):
+            raise FAQException(f"Unknown FAQ id: {faq_id}")
+        return self.faqs.question(faq_id)
+
+    def _build_response(self, matches, bundle):
+        """
+        Turns the model's ranking into the response dictionary returned to callers.
+
+        :param matches: `Match` tuples from `FAQModel.find_top_k`, best first (empty if there are no FAQs).
+        :param bundle: The `_FAQBundle` the matches were found in.
+        :return: The response dictionary.
+        """
+        confidence = matches[0].score if matches else 0.0
+
+        # ✅ Return the answer if confidence is high enough
+        if matches and confidence >= self.confidence_threshold:
+            faq_id = matches[0].faq_id
+            return {
+                "answer": bundle.faqs.answer(faq_id),  # ✅ O(1) lookup by id
+                "matched_question": bundle.faqs.question(faq_id),
+                "faq_id": faq_id,
+                "confidence": confidence,
+                "suggestions": [],
+                "entities": {}
+            }
+
+        # ✅ Handle low-confidence cases: offer the closest FAQs of the same ranking
+        suggestions = [
+            {"faq_id": match.faq_id, "question": bundle.faqs.question(match.faq_id), "confidence": match.score}
+            for match in matches[:self.max_suggestions] if match.score > 0
+        ]
+        return {
+            "answer": "I'm not sure I understand your question fully. Could you rephrase it?",
+            "matched_question": None,
+            "faq_id": None,
+            "confidence": confidence,
+            "suggestions": suggestions,
+            "entities": {}
+        }
+
+    def _add_entity_hints(self, response, analysis):
+        """
+        Adds the named entities of the query to a low-confidence response (NER runs only here).
+        Entities depend on the raw query, so they are never part of the cached response.
+
+        :param response: Response dictionary (a copy owned by the caller, updated in place).
+        :param analysis: `QueryAnalysis` of the query.
+        :return: The response.
+        """
+        if response["matched_question"] is not None or not self.entity_hints:
+            return response
+        with self.metrics.stage("entities"):
+            entities = analysis.entities
+        if entities:
+            entity_info = ", ".join(f"{label}: {text}" for label, text in entities.items())
+            response["entities"] = entities
+            response["answer"] = (f"I'm not sure I understand your question fully. I noticed you mentioned "
+                                  f"{entity_info}. Could you rephrase it?")
+        return response
+
 
 if __name__ == "__main__":
     """
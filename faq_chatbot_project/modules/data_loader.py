@@ -5,58 +5,267 @@ import logging
 # Configure logging to record any errors that occur during data loading or saving
 logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
 
-def load_faq_data():
+# Project root (one level above the modules folder) and the bundled FAQ file
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+DEFAULT_FAQ_FILE = os.path.join(PROJECT_DIR, "data", "faq_data.json")
+
+JSONL_EXTENSIONS = (".jsonl", ".ndjson")
+READ_CHUNK_SIZE = 1 << 20  # Characters read per step when streaming a JSON document
+MAP_DECISION_ENTRIES = 1000  # String values seen before an object is taken for a question → answer map
+
+
+def resolve_faq_path(file_path=None):
     """
-    Load FAQ data from a JSON file dynamically, ensuring it works regardless of execution location.
+    Resolves the FAQ file path.
+
+    Parameters:
+        file_path (str, optional): Absolute path, or a path relative to the working
+            directory or to the project folder (so 'data/faq_data.json' works from
+            anywhere). Defaults to the bundled data/faq_data.json.
 
     Returns:
-        dict: A dictionary containing the loaded FAQ data.
-              Returns an empty dictionary if an error occurs.
+        str: The path to read.
+    """
+    if not file_path:
+        return DEFAULT_FAQ_FILE
+    if os.path.isabs(file_path) or os.path.exists(file_path):
+        return file_path
+    project_path = os.path.join(PROJECT_DIR, file_path)
+    return project_path if os.path.exists(project_path) else file_path
+
+
+class _JSONStream:
+    """
+    Reads JSON values one at a time from a text file, keeping only a bounded buffer.
+    """
+
+    def __init__(self, file, chunk_size=READ_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _read_more(self):
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk  # ✅ Drop what was already consumed
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Skips whitespace and returns the next character ('' at the end of the file)."""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._read_more():
+                return ""
+
+    def expect(self, characters):
+        """Consumes the next character, which must be one of `characters`."""
+        char = self.peek()
+        if not char or char not in characters:
+            raise json.JSONDecodeError(f"Expected one of {characters!r}", self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decodes the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # ✅ A number (or literal) ending at the buffer end may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read_more()
+
+    def array_items(self):
+        """Yields the items of the array starting at the current position."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(",]") == "]":
+                return
+
+
+def _stream_json(file, chunk_size, question_key="question", answer_key="answer"):
+    """
+    Yields FAQ records from a JSON document without parsing it in one piece.
+
+    Supported layouts:
+    - an array of records: [{"question": ..., "answer": ...}, ...]
+    - an object holding such arrays, e.g. {"faqs": [...], "exported_at": ...}
+      (the records of every array value are yielded, other values are metadata)
+    - an object mapping questions to answers: {"What is ...?": "It is ...", ...}
+      (only if every value is a string)
+
+    The layout of an object is decided once: string values are held back until an array
+    value makes it a wrapper (they are dropped), another value makes it neither layout,
+    or `MAP_DECISION_ENTRIES` of them make it a question → answer map (then streamed).
+    """
+    stream = _JSONStream(file, chunk_size)
+    first = stream.peek()
+    if first == "[":
+        yield from stream.array_items()
+        return
+
+    stream.expect("{")
+    if stream.peek() == "}":
+        return
+    layout = None  # ✅ "wrapper", "map" or "other" once decided
+    pending = []  # ✅ String pairs read before the layout is decided
+    while True:
+        key = stream.value()
+        stream.expect(":")
+        if stream.peek() == "[":
+            if layout == "map":
+                raise json.JSONDecodeError("Array value in a question → answer object", stream.buffer, stream.pos)
+            if layout is None and pending:
+                logging.info(f"Ignoring {len(pending)} metadata fields of the FAQ wrapper object")
+            layout, pending = "wrapper", []
+            yield from stream.array_items()
+        else:
+            value = stream.value()
+            if layout == "map":
+                if not isinstance(value, str):
+                    raise json.JSONDecodeError("Non-string value in a question → answer object",
+                                               stream.buffer, stream.pos)
+                yield {question_key: key, answer_key: value}
+            elif layout is None:
+                if isinstance(value, str):
+                    pending.append({question_key: key, answer_key: value})
+                    if len(pending) >= MAP_DECISION_ENTRIES:
+                        layout = "map"
+                        yield from pending
+                        pending = []
+                else:
+                    layout, pending = "other", []
+        if stream.expect(",}") == "}":
+            break
+
+    if layout is None:
+        yield from pending  # ✅ Every value was a string: a question → answer map
+    elif layout == "other":
+        logging.error("FAQ object holds neither record arrays nor only question → answer strings")
+
+
+def _stream_jsonl(file, file_path):
+    """
+    Yields FAQ records from a JSON Lines file (one record per line); bad lines are skipped.
+    """
+    for line_number, line in enumerate(file, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError as e:
+            logging.error(f"Skipping invalid JSON on line {line_number} of {file_path}: {e}")
+
+
+def iter_faq_data(file_path=None, question_key="question", answer_key="answer", chunk_size=READ_CHUNK_SIZE):
     """
-    # Get the directory of the current script
-    base_dir = os.path.dirname(os.path.abspath(__file__))
+    Streams FAQ entries from a JSON or JSON Lines file, one at a time.
+
+    Memory use stays bounded by one read chunk plus one record, whatever the file size,
+    so entries can be fed straight into index construction.
+
+    Parameters:
+        file_path (str, optional): FAQ file (see `resolve_faq_path`). Files ending in
+            .jsonl / .ndjson are read line by line; other files are parsed as one JSON
+            document (see `_stream_json` for the accepted layouts).
+        question_key (str): Record field holding the question.
+        answer_key (str): Record field holding the answer.
+        chunk_size (int): Characters read per step from JSON documents.
+
+    Yields:
+        dict: {"question": str, "answer": str} per valid record (others are skipped
+              and counted in the log).
 
-    # Construct the correct path to faq_data.json (going up one level to the 'data' directory)
-    file_path = os.path.join(base_dir, "..", "data", "faq_data.json")
+    Raises:
+        FileNotFoundError, json.JSONDecodeError: If the file is missing or malformed.
+    """
+    file_path = resolve_faq_path(file_path)
+    logging.info(f"Loading data from: {file_path}")
 
-    # Print the file path for debugging
-    print(f"Loading data from: {file_path}")
+    skipped = 0
+    with open(file_path, "r", encoding="utf-8") as file:
+        if file_path.lower().endswith(JSONL_EXTENSIONS):
+            records = _stream_jsonl(file, file_path)
+        else:
+            records = _stream_json(file, chunk_size, question_key, answer_key)
 
+        for record in records:
+            question = record.get(question_key) if isinstance(record, dict) else None
+            answer = record.get(answer_key) if isinstance(record, dict) else None
+            if not isinstance(question, str) or not isinstance(answer, str) or not question.strip():
+                skipped += 1
+                continue
+            yield {"question": question, "answer": answer}
+
+    if skipped:
+        logging.warning(f"Skipped {skipped} records without a question and answer in {file_path}")
+
+
+def load_faq_data(file_path=None):
+    """
+    Load FAQ data from a JSON or JSON Lines file.
+
+    Parameters:
+        file_path (str, optional): FAQ file (see `resolve_faq_path`); defaults to the
+            bundled data/faq_data.json.
+
+    Returns:
+        list: The FAQ entries ({"question": ..., "answer": ...} dicts).
+              Returns an empty list if an error occurs.
+    """
     try:
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return json.load(file)  # Load JSON data from file and return as a dictionary
+        return list(iter_faq_data(file_path))
     except FileNotFoundError:
-        logging.error(f"File not found: {file_path}")
-        return {}
+        logging.error(f"File not found: {resolve_faq_path(file_path)}")
+        return []
     except json.JSONDecodeError:
-        logging.error(f"Invalid JSON format in file: {file_path}")
-        return {}
+        logging.error(f"Invalid JSON format in file: {resolve_faq_path(file_path)}")
+        return []
     except Exception as e:
         logging.error(f"Error loading FAQ data: {e}")
-        return {}
+        return []
 
-def save_faq_data(faq_dict):
+def save_faq_data(faq_dict, file_path=None):
     """
-    Save updated FAQ data to a JSON file dynamically.
+    Save updated FAQ data to a JSON (or JSON Lines) file.
 
     Parameters:
-        faq_dict (dict): Dictionary containing FAQ data to be saved.
+        faq_dict (list): FAQ entries to be saved.
+        file_path (str, optional): Target file; defaults to the bundled data/faq_data.json.
+            Files ending in .jsonl / .ndjson are written one entry per line.
 
     Returns:
         None
     """
-    # Get the directory of the current script
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-
-    # Construct the correct path to faq_data.json (going up one level to the 'data' directory)
-    file_path = os.path.join(base_dir, "..", "data", "faq_data.json")
-
-    # Print the file path for debugging
-    print(f"Saving data to: {file_path}")
+    file_path = resolve_faq_path(file_path)
+    logging.info(f"Saving data to: {file_path}")
 
     try:
         with open(file_path, 'w', encoding='utf-8') as file:
-            json.dump(faq_dict, file, indent=4)  # Save dictionary as formatted JSON
+            if file_path.lower().endswith(JSONL_EXTENSIONS):
+                for entry in faq_dict:
+                    file.write(json.dumps(entry) + "\n")
+            else:
+                json.dump(faq_dict, file, indent=4)  # Save dictionary as formatted JSON
     except Exception as e:
         logging.error(f"Error saving FAQ data: {e}")
 
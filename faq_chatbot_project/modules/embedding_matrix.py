@@ -0,0 +1,172 @@
+import numpy as np
+
+from modules.index_buffers import GrowableArray
+
+# Storage types of the question embeddings (see `EmbeddingMatrix`)
+EMBEDDING_DTYPES = ("float32", "float16", "int8")
+
+
+def quantize(vectors, dtype):
+    """
+    Converts float vectors to the storage type of an `EmbeddingMatrix`.
+
+    Parameters:
+    - vectors (np.ndarray): Float vectors, one per row.
+    - dtype (str): "float32", "float16" or "int8".
+
+    Returns:
+    - codes (np.ndarray): The stored rows.
+    - scales (np.ndarray): float32 scale per row for "int8" (a row is `codes * scale`), else None.
+      It restores the norm of the original row, so rounding does not lengthen unit vectors
+      and cosine scores stay within [-1, 1].
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if dtype == "float32":
+        return vectors, None
+    if dtype == "float16":
+        return vectors.astype(np.float16), None
+    if dtype == "int8":
+        # ✅ Per-row symmetric step: the largest component of each row maps to ±127
+        steps = np.abs(vectors).max(axis=1, initial=0.0) / 127
+        codes = np.rint(vectors / np.where(steps > 0, steps, 1.0)[:, np.newaxis]).astype(np.int8)
+        # ✅ Scale the rounded row back to the norm of the original one (not just by the step)
+        code_norms = np.linalg.norm(codes.astype(np.float64), axis=1)
+        norms = np.linalg.norm(vectors.astype(np.float64), axis=1)
+        scales = np.where(code_norms > 0, norms / np.where(code_norms > 0, code_norms, 1.0), 0.0)
+        return codes, scales.astype(np.float32)
+    raise ValueError(f"Unknown embedding dtype: {dtype} (expected one of {', '.join(EMBEDDING_DTYPES)})")
+
+
+class EmbeddingMatrix:
+    """
+    Question embeddings of the Spacy similarity path, optionally quantized.
+
+    - float32: the vectors as computed (exact).
+    - float16: half the memory; about 3 significant digits per component.
+    - int8: a quarter of the memory plus one float32 scale per row (`codes * scale`).
+
+    Scoring reads the stored rows block by block and converts only the current block,
+    so a quantized matrix is never expanded to float32 as a whole. Rows can be appended
+    in amortized O(1) (see `GrowableArray`).
+    """
+
+    def __init__(self, codes, scales=None):
+        """
+        Parameters:
+        - codes (np.ndarray or GrowableArray): Stored rows (float32, float16 or int8).
+          A GrowableArray is kept by reference.
+        - scales (np.ndarray or GrowableArray, optional): float32 scale per row, required for int8 codes.
+        """
+        self.codes = codes if isinstance(codes, GrowableArray) else GrowableArray(codes)
+        self.dtype = self.codes.view().dtype.name
+        if self.dtype not in EMBEDDING_DTYPES:
+            raise ValueError(f"Unsupported embedding storage type: {self.dtype}")
+        if (scales is None) != (self.dtype != "int8"):
+            raise ValueError("Per-row scales are required for int8 embeddings (and only for them)")
+        self.scales = scales if scales is None or isinstance(scales, GrowableArray) else GrowableArray(scales)
+
+    @classmethod
+    def from_vectors(cls, vectors, dtype="float32"):
+        """
+        Builds a matrix from float vectors.
+
+        Parameters:
+        - vectors (np.ndarray): L2-normalized vectors, one per row.
+        - dtype (str): Storage type (see `EMBEDDING_DTYPES`).
+
+        Returns:
+        - matrix (EmbeddingMatrix): The matrix.
+        """
+        return cls(*quantize(vectors, dtype))
+
+    def __len__(self):
+        return self.codes.size
+
+    @property
+    def dim(self):
+        """Vector width."""
+        return self.codes.view().shape[1]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the codes and scales, spare capacity included."""
+        return self.codes.nbytes + (self.scales.nbytes if self.scales is not None else 0)
+
+    def buffers(self):
+        """
+        Returns:
+        - buffers (tuple): The GrowableArrays holding the matrix (codes, then scales if any).
+        """
+        return (self.codes,) if self.scales is None else (self.codes, self.scales)
+
+    def append(self, vectors):
+        """
+        Appends float vectors (quantized to the storage type).
+
+        Parameters:
+        - vectors (np.ndarray): L2-normalized vectors, one per row.
+        """
+        codes, scales = quantize(vectors, self.dtype)
+        if self.scales is not None:
+            self.scales.append(scales)  # ✅ Before the codes, whose size publishes the rows
+        self.codes.append(codes)
+
+    def rows(self, rows=slice(None)):
+        """
+        Returns rows as float32 vectors (a view for float32 storage, else a converted copy).
+
+        Parameters:
+        - rows (slice or np.ndarray): Rows to return (default: all).
+
+        Returns:
+        - vectors (np.ndarray): float32 matrix.
+        """
+        codes = self.codes.view()
+        vectors = codes[rows].astype(np.float32, copy=False)
+        if self.scales is not None:
+            vectors *= self.scales.view()[:len(codes)][rows, np.newaxis]
+        return vectors
+
+    def take(self, rows):
+        """
+        Returns a new matrix holding copies of some rows, without re-quantizing them.
+
+        Parameters:
+        - rows (np.ndarray): Rows to keep.
+
+        Returns:
+        - matrix (EmbeddingMatrix): The new matrix.
+        """
+        codes = self.codes.view()
+        scales = self.scales.view()[:len(codes)][rows] if self.scales is not None else None
+        return EmbeddingMatrix(codes[rows], scales)
+
+    def scores(self, queries, block_size=2048):
+        """
+        Dot products of query vectors with every row, computed block by block.
+
+        Products are accumulated in float64 and rounded to float32, so a query's scores do
+        not depend on the other queries of the batch. Rows and queries are unit vectors, so
+        scores are clipped to [-1, 1]: rounding of the stored rows (float16, int8) must not
+        push a cosine, and the confidence built from it, above 1.
+
+        Parameters:
+        - queries (np.ndarray): float32 query vectors, one per row.
+        - block_size (int): Rows converted and multiplied at a time.
+
+        Returns:
+        - scores (np.ndarray): float32 matrix of shape (len(queries), len(self)).
+        """
+        codes = self.codes.view()
+        scales = self.scales.view()[:len(codes)] if self.scales is not None else None
+        queries = np.asarray(queries, dtype=np.float64)
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+
+        for start in range(0, len(codes), block_size):
+            end = start + block_size
+            block_scores = queries @ codes[start:end].astype(np.float64).T
+            if scales is not None:
+                block_scores *= scales[start:end]
+            np.clip(block_scores, -1.0, 1.0, out=block_scores)
+            scores[:, start:end] = block_scores
+        return scores
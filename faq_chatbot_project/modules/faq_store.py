@@ -0,0 +1,353 @@
+import bisect
+import os
+from array import array
+from collections.abc import Mapping
+
+import numpy as np
+
+from modules.index_buffers import GrowableArray
+
+
+class StringTable:
+    """
+    Strings packed into one contiguous UTF-8 buffer, addressed by integer id.
+
+    Each entry is a (start, end) byte range into the buffer, which costs 16 bytes plus
+    the UTF-8 text, instead of a full Python `str` object (about 50 bytes of header each)
+    plus a list slot. The arrays can be memory-mapped from disk. Appends are amortized
+    O(1); replacing an entry appends the new text and repoints the entry, leaving the old
+    bytes unused.
+    """
+
+    def __init__(self, data=None, starts=None, ends=None):
+        """
+        Parameters:
+        - data (np.ndarray, optional): uint8 UTF-8 buffer.
+        - starts (np.ndarray, optional): int64 start offset per entry.
+        - ends (np.ndarray, optional): int64 end offset per entry.
+        """
+        self._data = GrowableArray(data if data is not None else np.empty(0, dtype=np.uint8))
+        self._starts = GrowableArray(starts if starts is not None else np.empty(0, dtype=np.int64))
+        self._ends = GrowableArray(ends if ends is not None else np.empty(0, dtype=np.int64))
+
+    @classmethod
+    def from_strings(cls, strings):
+        """
+        Builds a table from any iterable of strings, in one pass.
+
+        Parameters:
+        - strings (iterable): The entries (a generator is consumed lazily).
+
+        Returns:
+        - table (StringTable): The table.
+        """
+        builder = StringTableBuilder()
+        for text in strings:
+            builder.append(text)
+        return builder.finish()
+
+    def __len__(self):
+        return self._ends.size
+
+    def __getitem__(self, entry_id):
+        if not -len(self) <= entry_id < len(self):
+            raise IndexError(f"StringTable index out of range: {entry_id}")
+        start, end = int(self._starts.view()[entry_id]), int(self._ends.view()[entry_id])
+        return self._data.view()[start:end].tobytes().decode("utf-8")
+
+    def __iter__(self):
+        data, starts, ends = self._data.view(), self._starts.view(), self._ends.view()
+        for i in range(len(ends)):
+            yield data[starts[i]:ends[i]].tobytes().decode("utf-8")
+
+    def append(self, text):
+        """
+        Appends an entry.
+
+        Parameters:
+        - text (str): Entry text.
+
+        Returns:
+        - entry_id (int): Id of the new entry.
+        """
+        start = self._data.size
+        self._data.append(np.frombuffer(text.encode("utf-8"), dtype=np.uint8))
+        self._starts.append(np.array([start], dtype=np.int64))
+        self._ends.append(np.array([self._data.size], dtype=np.int64))  # ✅ Published last
+        return len(self) - 1
+
+    def replace(self, entry_id, text):
+        """
+        Replaces the text of an entry (its id stays the same).
+
+        Parameters:
+        - entry_id (int): Entry id.
+        - text (str): New text.
+        """
+        start = self._data.size
+        self._data.append(np.frombuffer(text.encode("utf-8"), dtype=np.uint8))
+        self._starts[entry_id] = start
+        self._ends[entry_id] = self._data.size
+
+    def share(self):
+        """
+        Returns a second table over the same buffers (copy-on-write, see `GrowableArray.share`).
+        """
+        table = StringTable.__new__(StringTable)
+        table._data, table._starts, table._ends = self._data.share(), self._starts.share(), self._ends.share()
+        return table
+
+    def buffers(self):
+        """
+        Returns:
+        - buffers (tuple): The data, starts and ends GrowableArrays.
+        """
+        return self._data, self._starts, self._ends
+
+    def arrays(self):
+        """
+        Returns:
+        - arrays (dict): "data", "starts" and "ends" as numpy arrays (no copy).
+        """
+        return {"data": self._data.view(), "starts": self._starts.view(), "ends": self._ends.view()}
+
+    @property
+    def nbytes(self):
+        """Bytes used by the live part of the buffers."""
+        return sum(array.nbytes for array in self.arrays().values())
+
+
+class StringTableBuilder:
+    """
+    Packs strings appended one at a time into the buffers of a `StringTable`.
+
+    Only the UTF-8 bytes and two offsets per entry are kept, so several tables can be
+    filled side by side from one stream without holding its strings.
+    """
+
+    def __init__(self):
+        self._data = bytearray()
+        self._starts, self._ends = array("q"), array("q")
+
+    def append(self, text):
+        """
+        Appends an entry.
+
+        Parameters:
+        - text (str): Entry text.
+        """
+        self._starts.append(len(self._data))
+        self._data += text.encode("utf-8")
+        self._ends.append(len(self._data))
+
+    def finish(self):
+        """
+        Returns:
+        - table (StringTable): The table over the appended entries (no copy).
+        """
+        return StringTable(np.frombuffer(self._data, dtype=np.uint8),
+                           np.frombuffer(self._starts, dtype=np.int64), np.frombuffer(self._ends, dtype=np.int64))
+
+
+class SortedStringMap(Mapping):
+    """
+    Read-only str → int mapping over a `StringTable` of sorted keys and an array of
+    values, looked up by binary search (O(log n) decoded keys per lookup).
+
+    Unlike a dict, it needs no Python object per key, so it can be memory-mapped from
+    disk and used at once, e.g. as the vocabulary of a fitted TF-IDF vectorizer.
+    """
+
+    def __init__(self, keys, values):
+        """
+        Parameters:
+        - keys (StringTable): Distinct keys in ascending order.
+        - values (np.ndarray): int64 value per key.
+        """
+        self.keys_table = keys
+        self.values_array = values
+
+    @classmethod
+    def from_mapping(cls, mapping):
+        """
+        Builds the mapping from any str → int mapping.
+
+        Returns:
+        - mapping (SortedStringMap): The sorted copy.
+        """
+        keys = sorted(mapping)
+        return cls(StringTable.from_strings(keys), np.fromiter((mapping[key] for key in keys), dtype=np.int64,
+                                                             count=len(keys)))
+
+    def __getitem__(self, key):
+        i = bisect.bisect_left(self.keys_table, key)
+        if i < len(self.keys_table) and self.keys_table[i] == key:
+            return int(self.values_array[i])
+        raise KeyError(key)
+
+    def __iter__(self):
+        return iter(self.keys_table)
+
+    def __len__(self):
+        return len(self.keys_table)
+
+    def arrays(self):
+        """
+        Returns:
+        - arrays (dict): The key table arrays ("data", "starts", "ends") and "values" (no copy).
+        """
+        return {**self.keys_table.arrays(), "values": self.values_array}
+
+    @property
+    def nbytes(self):
+        """Bytes used by the keys and values."""
+        return self.keys_table.nbytes + self.values_array.nbytes
+
+
+class FAQStore:
+    """
+    FAQ questions and answers by integer id, in two `StringTable`s.
+
+    Ids are positions in the FAQ file followed by FAQs added at runtime; they are
+    never reused. Removed FAQs keep their id (and bytes) but are no longer live.
+    """
+
+    TABLES = ("questions", "answers")
+
+    def __init__(self, questions=None, answers=None, active=None):
+        """
+        Parameters:
+        - questions (StringTable, optional): Question per id.
+        - answers (StringTable, optional): Answer per id (same length as `questions`).
+        - active (np.ndarray, optional): Boolean live flag per id (default: all live).
+        """
+        self.questions = questions if questions is not None else StringTable()
+        self.answers = answers if answers is not None else StringTable()
+        if len(self.questions) != len(self.answers):
+            raise ValueError("questions and answers must have the same length")
+        self.active = GrowableArray(active if active is not None else np.ones(len(self.questions), dtype=bool))
+        self.n_live = int(np.count_nonzero(self.active.view()))
+
+    @classmethod
+    def from_entries(cls, entries):
+        """
+        Builds a store from an iterable of {"question": ..., "answer": ...} entries.
+
+        The iterable is consumed once, so a streaming reader (e.g.
+        `data_loader.iter_faq_data`) is never held in memory as a whole.
+
+        Parameters:
+        - entries (iterable): FAQ entries.
+
+        Returns:
+        - store (FAQStore): The store.
+        """
+        # ✅ Questions and answers are packed in the same pass, never kept as `str` objects
+        questions, answers = StringTableBuilder(), StringTableBuilder()
+        for entry in entries:
+            questions.append(entry["question"])
+            answers.append(entry["answer"])
+        return cls(questions.finish(), answers.finish())
+
+    def __len__(self):
+        """Number of ids handed out (removed FAQs included)."""
+        return len(self.questions)
+
+    def is_live(self, faq_id):
+        """
+        Returns:
+        - live (bool): True if `faq_id` exists and has not been removed.
+        """
+        return isinstance(faq_id, (int, np.integer)) and 0 <= faq_id < len(self) and bool(self.active.view()[faq_id])
+
+    def question(self, faq_id):
+        return self.questions[faq_id]
+
+    def answer(self, faq_id):
+        return self.answers[faq_id]
+
+    def live_ids(self):
+        """
+        Returns:
+        - ids (np.ndarray): Ids of the live FAQs, ascending.
+        """
+        return np.flatnonzero(self.active.view())
+
+    def add(self, question, answer):
+        """
+        Adds a FAQ.
+
+        Returns:
+        - faq_id (int): Its id.
+        """
+        self.answers.append(answer)
+        faq_id = self.questions.append(question)
+        self.active.append(np.ones(1, dtype=bool))
+        self.n_live += 1
+        return faq_id
+
+    def update(self, faq_id, question=None, answer=None):
+        """
+        Replaces the question and/or answer of a FAQ.
+        """
+        if question is not None:
+            self.questions.replace(faq_id, question)
+        if answer is not None:
+            self.answers.replace(faq_id, answer)
+
+    def remove(self, faq_id):
+        """
+        Marks a FAQ as removed (its id is not reused).
+        """
+        self.active[faq_id] = False
+        self.n_live -= 1
+
+    @property
+    def nbytes(self):
+        """Bytes used by the live part of all buffers."""
+        return sum(array.nbytes for array in self.arrays().values())
+
+    def arrays(self):
+        """
+        Returns:
+        - arrays (dict): All buffers by file name stem, e.g. "questions_data", "active".
+        """
+        arrays = {"active": self.active.view()}
+        for name in self.TABLES:
+            for part, values in getattr(self, name).arrays().items():
+                arrays[f"{name}_{part}"] = values
+        return arrays
+
+    def save(self, directory):
+        """
+        Writes the store as .npy files (one per buffer) into `directory`.
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name, values in self.arrays().items():
+            np.save(os.path.join(directory, f"{name}.npy"), values)
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        """
+        Builds a store over arrays as returned by `arrays` (used as-is, no copy).
+        """
+        tables = [StringTable(arrays[f"{name}_data"], arrays[f"{name}_starts"], arrays[f"{name}_ends"])
+                  for name in cls.TABLES]
+        return cls(*tables, active=arrays["active"])
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        """
+        Loads a store written by `save`.
+
+        Parameters:
+        - directory (str): Directory holding the .npy files.
+        - mmap (bool): Memory-map the buffers instead of reading them into memory;
+          they are copied only when the store is first modified.
+
+        Returns:
+        - store (FAQStore): The store.
+        """
+        names = ["active"] + [f"{name}_{part}" for name in cls.TABLES for part in ("data", "starts", "ends")]
+        return cls.from_arrays({name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r" if mmap else None)
+                                for name in names})
@@ -0,0 +1,99 @@
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+
+
+class HashedTfidfVectorizer:
+    """
+    TF-IDF over a hashed n-gram space: a drop-in for the fitted `TfidfVectorizer` of `FAQModel`.
+
+    N-grams are mapped to hash buckets instead of vocabulary entries, so the counts of
+    any part of the corpus can be computed independently (e.g. by parallel workers) and
+    merged. Fitting only collects the buckets that occur in the corpus (`columns_`, the
+    counterpart of a vocabulary) and their IDF weights, from the merged counts.
+
+    Same analyzer and weighting as `TfidfVectorizer(ngram_range=(1, 3), stop_words='english')`
+    (smoothed IDF, L2-normalized rows, n-grams unseen at fit time ignored). Results differ
+    only where two n-grams share a bucket, which a large `n_features` makes rare.
+    """
+
+    def __init__(self, n_features=2 ** 28, ngram_range=(1, 3), stop_words='english'):
+        """
+        Parameters:
+        - n_features (int): Number of hash buckets (only the occupied ones take memory).
+        - ngram_range (tuple): Smallest and largest n-gram length.
+        - stop_words (str or list): Stop words removed before building n-grams.
+        """
+        self.n_features = n_features
+        self.hashing = HashingVectorizer(n_features=n_features, ngram_range=ngram_range, stop_words=stop_words,
+                                         alternate_sign=False, norm=None, dtype=np.float64)
+        self.columns_ = None  # ✅ Sorted buckets occurring in the corpus: column i of the TF-IDF rows
+        self.idf_ = None
+
+    def counts(self, texts):
+        """
+        Returns the raw n-gram counts of texts per hash bucket (stateless, needs no fitting).
+
+        Parameters:
+        - texts (iterable): Texts.
+
+        Returns:
+        - counts (scipy.sparse.csr_matrix): Shape (len(texts), n_features).
+        """
+        return self.hashing.transform(texts)
+
+    @staticmethod
+    def merge(parts):
+        """
+        Stacks the count matrices of consecutive corpus parts.
+        """
+        return sp.vstack(parts, format="csr")
+
+    def fit_counts(self, counts):
+        """
+        Collects the occupied buckets and their IDF weights from the counts of the whole corpus.
+
+        Parameters:
+        - counts (scipy.sparse.csr_matrix): Output of `counts` (or of `merge`) for all documents.
+
+        Returns:
+        - self
+        """
+        counts = counts.tocsr()
+        # ✅ A bucket appears at most once per row, so its number of entries is its document frequency
+        self.columns_, document_frequency = np.unique(counts.indices, return_counts=True)
+        self.idf_ = np.log((1 + counts.shape[0]) / (1 + document_frequency)) + 1
+        return self
+
+    def weight(self, counts):
+        """
+        Turns raw counts into L2-normalized TF-IDF rows over the fitted columns.
+
+        Parameters:
+        - counts (scipy.sparse.csr_matrix): Output of `counts`.
+
+        Returns:
+        - vectors (scipy.sparse.csr_matrix): Shape (rows, len(columns_)).
+        """
+        counts = counts.tocsr()
+        columns = np.searchsorted(self.columns_, counts.indices)
+        known = columns < len(self.columns_)
+        known[known] = self.columns_[columns[known]] == counts.indices[known]
+        rows = np.repeat(np.arange(counts.shape[0]), np.diff(counts.indptr))
+        vectors = sp.csr_matrix((counts.data[known] * self.idf_[columns[known]], (rows[known], columns[known])),
+                                shape=(counts.shape[0], len(self.columns_)))
+        return normalize(vectors, norm="l2", copy=False)
+
+    def fit_transform(self, texts):
+        """
+        Counts, fits and weights the texts in one go (serial build).
+        """
+        counts = self.counts(texts)
+        return self.fit_counts(counts).weight(counts)
+
+    def transform(self, texts):
+        """
+        Returns the L2-normalized TF-IDF rows of texts (same as `TfidfVectorizer.transform`).
+        """
+        return self.weight(self.counts(texts))
@@ -0,0 +1,132 @@
+import numpy as np
+from scipy.sparse import csr_matrix
+
+
+class GrowableArray:
+    """
+    Array with amortized O(1) row appends (capacity doubles when full).
+
+    Rows are written before the size is published, so a reader calling `view()`
+    always sees fully written rows, even while another thread appends.
+    """
+
+    def __init__(self, initial):
+        """
+        Parameters:
+        - initial (np.ndarray): Starting rows. Used as-is (e.g. a read-only memory map)
+          until the first append copies them into a larger buffer.
+        """
+        self._data = initial
+        self.size = len(initial)
+
+    def append(self, rows):
+        """
+        Appends rows at the end.
+
+        Parameters:
+        - rows (np.ndarray): Rows with the same trailing shape and dtype as the array.
+        """
+        rows = np.asarray(rows, dtype=self._data.dtype)
+        end = self.size + len(rows)
+        if end > len(self._data) or not self._data.flags.writeable:  # ✅ Read-only rows are copied first
+            capacity = max(end, 2 * len(self._data), 16)
+            grown = np.empty((capacity,) + self._data.shape[1:], dtype=self._data.dtype)
+            grown[:self.size] = self._data[:self.size]
+            self._data = grown
+        self._data[self.size:end] = rows
+        self.size = end
+
+    def view(self):
+        """
+        Returns:
+        - rows (np.ndarray): The live rows (no copy).
+        """
+        return self._data[:self.size]
+
+    @property
+    def nbytes(self):
+        """Bytes held by the storage, spare capacity included."""
+        return self._data.nbytes
+
+    def rebind(self, storage):
+        """
+        Replaces the storage of the live rows with an equal array, e.g. one placed in
+        shared memory. A read-only `storage` is copied on the first write or append.
+
+        Parameters:
+        - storage (np.ndarray): Array equal to `view()`.
+        """
+        self._data = storage
+
+    def share(self):
+        """
+        Returns a second GrowableArray over the same rows without copying them.
+
+        Both arrays switch to a read-only view of the rows, so whichever is written or
+        appended to first takes a private copy (copy-on-write) and the other is unaffected.
+
+        Returns:
+        - shared (GrowableArray): The new array.
+        """
+        rows = self.view()
+        rows.flags.writeable = False
+        self._data = rows
+        return GrowableArray(rows)
+
+    def __setitem__(self, index, value):
+        if not self._data.flags.writeable:
+            self._data = np.array(self._data)
+        self._data[index] = value
+
+
+class GrowableCSR:
+    """
+    CSR matrix with amortized O(1) row appends, built on three GrowableArrays.
+    """
+
+    def __init__(self, matrix):
+        """
+        Parameters:
+        - matrix (scipy.sparse.csr_matrix): Starting rows.
+        """
+        self.n_cols = matrix.shape[1]
+        self._data = GrowableArray(matrix.data)
+        self._indices = GrowableArray(matrix.indices)
+        self._indptr = GrowableArray(matrix.indptr)
+
+    def append(self, rows):
+        """
+        Appends the rows of a CSR matrix with the same number of columns.
+
+        Parameters:
+        - rows (scipy.sparse.csr_matrix): Rows to append.
+        """
+        nnz = int(self._indptr.view()[-1])
+        self._data.append(rows.data)
+        self._indices.append(rows.indices)
+        self._indptr.append(rows.indptr[1:] + nnz)  # ✅ Published last: makes the rows visible
+
+    @property
+    def nbytes(self):
+        """Bytes held by the three buffers, spare capacity included."""
+        return sum(buffer.nbytes for buffer in self.buffers())
+
+    def buffers(self):
+        """
+        Returns:
+        - buffers (tuple): The data, indices and indptr GrowableArrays.
+        """
+        return self._data, self._indices, self._indptr
+
+    def matrix(self):
+        """
+        Returns:
+        - matrix (scipy.sparse.csr_matrix): The live rows (no copy of the buffers).
+        """
+        indptr = self._indptr.view()
+        nnz = int(indptr[-1])
+        return csr_matrix(
+            (self._data.view()[:nnz], self._indices.view()[:nnz], indptr),
+            shape=(len(indptr) - 1, self.n_cols),
+            copy=False,
+        )
@@ -0,0 +1,197 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from modules.faq_store import FAQStore, SortedStringMap, StringTable
+
+# Bump whenever the on-disk layout changes so old snapshots are rebuilt
+SNAPSHOT_FORMAT_VERSION = 6
+
+META_FILE = "meta.json"
+ARRAY_FILES = ("idf", "tfidf_columns", "tfidf_data", "tfidf_indices", "tfidf_indptr", "embeddings",
+               "embedding_scales", "exact_keys", "exact_offsets", "ids")
+FAQ_STORE_DIR = "faqs"
+PROCESSED_PREFIX = "processed"
+VOCABULARY_PREFIX = "vocabulary"
+VOCABULARY_PARTS = ("data", "starts", "ends", "values")
+
+
+def file_hash(file_path, chunk_size=1 << 20):
+    """
+    Computes the SHA-256 hash of a file without reading it into memory at once.
+
+    Parameters:
+    - file_path (str): Path of the file to hash.
+    - chunk_size (int): Bytes read per step.
+
+    Returns:
+    - digest (str): Hex digest of the file content.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def save_snapshot(snapshot_dir, data_hash, model, faqs, processed_questions=None, preprocessing=None):
+    """
+    Writes the fitted index of a FAQModel plus the FAQ store to disk.
+
+    Each snapshot lives in `<snapshot_dir>/<data_hash>/`. It is written to a temporary
+    directory first and renamed into place, so readers never see a partial snapshot.
+    Snapshots for other data hashes are removed afterwards.
+
+    Parameters:
+    - snapshot_dir (str): Directory holding the snapshots.
+    - data_hash (str): Hash of the FAQ data file the index was built from.
+    - model (FAQModel): The fitted model.
+    - faqs (FAQStore): The FAQs, by id.
+    - processed_questions (list or StringTable, optional): `TextProcessor` output per FAQ id.
+    - preprocessing (str, optional): `TextProcessor.mode` that produced `processed_questions`.
+
+    Returns:
+    - path (str): Directory of the written snapshot.
+    """
+    os.makedirs(snapshot_dir, exist_ok=True)
+    target = os.path.join(snapshot_dir, data_hash)
+    tmp_dir = f"{target}.tmp-{os.getpid()}"
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+
+    vocabulary = getattr(model.vectorizer, "vocabulary_", {})  # ✅ Empty in a hashed n-gram space
+    if not isinstance(vocabulary, SortedStringMap):
+        vocabulary = SortedStringMap.from_mapping(vocabulary)
+
+    # ✅ Flatten the exact-match token sequences into one key array + row offsets
+    keys = [()] * len(model.questions)
+    for key, rows in model.exact_match_rows.items():
+        for row in rows:
+            keys[row] = key
+    exact_offsets = np.zeros(len(keys) + 1, dtype=np.int64)
+    exact_offsets[1:] = np.cumsum([len(key) for key in keys])
+    exact_keys = np.fromiter((orth for key in keys for orth in key), dtype=np.uint64, count=int(exact_offsets[-1]))
+
+    question_vectors = model.question_vectors.tocsr()
+    embeddings = model.index.embeddings  # ✅ Saved in their storage type (quantized or not)
+    arrays = {
+        "idf": np.asarray(model.vectorizer.idf_, dtype=np.float64),
+        "tfidf_columns": np.asarray(getattr(model.vectorizer, "columns_", None)
+                                    if model.hashing_features else np.zeros(0), dtype=np.int64),
+        "tfidf_data": question_vectors.data,
+        "tfidf_indices": question_vectors.indices,
+        "tfidf_indptr": question_vectors.indptr,
+        "embeddings": np.ascontiguousarray(embeddings.codes.view()),
+        "embedding_scales": (np.ascontiguousarray(embeddings.scales.view()[:len(embeddings)])
+                             if embeddings.scales is not None else np.zeros(0, dtype=np.float32)),
+        "exact_keys": exact_keys,
+        "exact_offsets": exact_offsets,
+        "ids": np.ascontiguousarray(model.ids),
+    }
+    for part, array in vocabulary.arrays().items():
+        arrays[f"{VOCABULARY_PREFIX}_{part}"] = array
+    if processed_questions is not None:
+        if not isinstance(processed_questions, StringTable):
+            processed_questions = StringTable.from_strings(processed_questions)
+        for part, array in processed_questions.arrays().items():
+            arrays[f"{PROCESSED_PREFIX}_{part}"] = array
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+
+    meta = {
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "data_hash": data_hash,
+        "nlp": model.nlp_signature(),
+        "embedding_dtype": embeddings.dtype,
+        "hashing_features": model.hashing_features,
+        "tfidf_shape": list(question_vectors.shape),
+        "has_processed_questions": processed_questions is not None,
+        "preprocessing": preprocessing,
+    }
+    faqs.save(os.path.join(tmp_dir, FAQ_STORE_DIR))
+    with open(os.path.join(tmp_dir, META_FILE), "w", encoding="utf-8") as file:
+        json.dump(meta, file)
+
+    shutil.rmtree(target, ignore_errors=True)
+    os.replace(tmp_dir, target)
+
+    # ✅ Drop snapshots of older versions of the data file
+    for name in os.listdir(snapshot_dir):
+        if name != data_hash and os.path.isdir(os.path.join(snapshot_dir, name)) and ".tmp-" not in name:
+            shutil.rmtree(os.path.join(snapshot_dir, name), ignore_errors=True)
+
+    logging.info(f"Saved index snapshot to {target}")
+    return target
+
+
+def load_snapshot(snapshot_dir, data_hash, preprocessing=None):
+    """
+    Loads the snapshot built for `data_hash`, memory-mapping its arrays.
+
+    Parameters:
+    - snapshot_dir (str): Directory holding the snapshots.
+    - data_hash (str): Hash of the current FAQ data file.
+    - preprocessing (str, optional): Current `TextProcessor.mode`. Snapshots whose
+      processed questions come from another mode are not used.
+
+    Returns:
+    - snapshot (dict): Snapshot content (see `save_snapshot`), with the TF-IDF matrix
+      rebuilt as a CSR matrix over the mapped arrays, "vocabulary" as a memory-mapped
+      `SortedStringMap` (term → column), "faqs" as a memory-mapped FAQStore
+      and "processed_questions" as a memory-mapped StringTable (or None). None if no
+      usable snapshot exists.
+    """
+    path = os.path.join(snapshot_dir, data_hash)
+    meta_path = os.path.join(path, META_FILE)
+    if not os.path.exists(meta_path):
+        return None
+
+    try:
+        with open(meta_path, "r", encoding="utf-8") as file:
+            meta = json.load(file)
+
+        if meta.get("format_version") != SNAPSHOT_FORMAT_VERSION or meta.get("data_hash") != data_hash:
+            return None
+        if meta.get("preprocessing") != preprocessing:
+            logging.info(f"Ignoring index snapshot {path}: built with {meta.get('preprocessing')} preprocessing, "
+                         f"not {preprocessing}")
+            return None
+
+        names = list(ARRAY_FILES) + [f"{VOCABULARY_PREFIX}_{part}" for part in VOCABULARY_PARTS]
+        if meta.get("has_processed_questions"):
+            names += [f"{PROCESSED_PREFIX}_{part}" for part in ("data", "starts", "ends")]
+        arrays = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names}
+        faqs = FAQStore.load(os.path.join(path, FAQ_STORE_DIR), mmap=True)
+    except Exception as e:
+        logging.error(f"Ignoring unreadable index snapshot {path}: {e}")
+        return None
+
+    offsets = arrays["exact_offsets"]
+    exact_keys = arrays["exact_keys"].tolist()
+    meta["exact_match_keys"] = [tuple(exact_keys[offsets[i]:offsets[i + 1]]) for i in range(len(offsets) - 1)]
+    meta["question_vectors"] = csr_matrix(
+        (arrays["tfidf_data"], arrays["tfidf_indices"], arrays["tfidf_indptr"]),
+        shape=tuple(meta["tfidf_shape"]),
+        copy=False,
+    )
+    meta["vocabulary"] = SortedStringMap(StringTable(*(arrays[f"{VOCABULARY_PREFIX}_{part}"]
+                                                       for part in ("data", "starts", "ends"))),
+                                         arrays[f"{VOCABULARY_PREFIX}_values"])
+    meta["idf"] = arrays["idf"]
+    meta["tfidf_columns"] = arrays["tfidf_columns"]
+    meta["question_embeddings"] = arrays["embeddings"]
+    meta["embedding_scales"] = arrays["embedding_scales"] if meta["embedding_dtype"] == "int8" else None
+    meta["ids"] = arrays["ids"]
+    meta["faqs"] = faqs
+    meta["processed_questions"] = None
+    if meta.get("has_processed_questions"):
+        meta["processed_questions"] = StringTable(*(arrays[f"{PROCESSED_PREFIX}_{part}"]
+                                                    for part in ("data", "starts", "ends")))
+
+    logging.info(f"Loaded index snapshot from {path}")
+    return meta
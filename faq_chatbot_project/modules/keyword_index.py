@@ -0,0 +1,93 @@
+import heapq
+import sys
+from collections import defaultdict
+
+
+class KeywordIndex:
+    """
+    Inverted index (token → FAQ ids) used as a keyword fallback for low-confidence queries.
+
+    A FAQ's score is the share of its distinct tokens that also occur in the query,
+    the same overlap ratio the experimental `keyword_search` computed by scanning
+    every question. Here only the postings of the query tokens are visited.
+    """
+
+    def __init__(self, processed_questions=None):
+        """
+        Parameters:
+        - processed_questions (iterable, optional): (faq_id, text) pairs, where text is the
+          `TextProcessor.preprocess_text` output of the question.
+        """
+        self.postings = defaultdict(set)  # token → ids of FAQs containing it
+        self.token_counts = {}  # id → number of distinct tokens of the FAQ
+        self.tokens = {}  # id → distinct tokens (needed to remove a FAQ)
+
+        for faq_id, text in processed_questions or ():
+            self.add(faq_id, text)
+
+    def add(self, faq_id, processed_question):
+        """
+        Indexes a FAQ (replaces the entry if the id is already indexed).
+
+        Parameters:
+        - faq_id (int): FAQ id.
+        - processed_question (str): Preprocessed question text.
+        """
+        self.remove(faq_id)
+        tokens = frozenset(processed_question.split())
+        if not tokens:
+            return
+        for token in tokens:
+            self.postings[token].add(faq_id)
+        self.tokens[faq_id] = tokens
+        self.token_counts[faq_id] = len(tokens)
+
+    def remove(self, faq_id):
+        """
+        Removes a FAQ from the index (no-op if it is not indexed).
+
+        Parameters:
+        - faq_id (int): FAQ id.
+        """
+        for token in self.tokens.pop(faq_id, ()):
+            ids = self.postings[token]
+            ids.discard(faq_id)
+            if not ids:
+                del self.postings[token]
+        self.token_counts.pop(faq_id, None)
+
+    @property
+    def nbytes(self):
+        """
+        Approximate memory held by the index (containers and token strings, via `sys.getsizeof`).
+        """
+        total = sys.getsizeof(self.postings) + sys.getsizeof(self.tokens) + sys.getsizeof(self.token_counts)
+        for token, ids in self.postings.items():
+            total += sys.getsizeof(token) + sys.getsizeof(ids)
+        total += sum(sys.getsizeof(tokens) for tokens in self.tokens.values())
+        return total
+
+    def search(self, processed_query, k=3):
+        """
+        Finds the FAQs sharing the most tokens with the query.
+
+        Parameters:
+        - processed_query (str): Preprocessed query text.
+        - k (int): Maximum number of results.
+
+        Returns:
+        - results (list): Up to k (faq_id, overlap ratio) tuples, best first
+          (ties go to the lower id).
+        """
+        overlaps = defaultdict(int)
+        for token in set(processed_query.split()):
+            for faq_id in self.postings.get(token, ()):
+                overlaps[faq_id] += 1
+
+        # ✅ Partial selection with a heap instead of sorting every candidate
+        best = heapq.nlargest(
+            k,
+            overlaps.items(),
+            key=lambda item: (item[1] / self.token_counts[item[0]], -item[0]),
+        )
+        return [(faq_id, count / self.token_counts[faq_id]) for faq_id, count in best]
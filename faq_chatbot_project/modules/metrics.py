@@ -0,0 +1,315 @@
+import bisect
+import threading
+import time
+
+# Latency buckets in seconds (upper bounds, Prometheus style)
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+# Index reload buckets in seconds (reloads refit the whole index)
+RELOAD_BUCKETS = (0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+CONFIDENCE_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+
+
+class Counter:
+    """
+    Monotonic, thread-safe counter.
+    """
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+
+class Histogram:
+    """
+    Thread-safe histogram with fixed bucket upper bounds (plus an implicit +Inf bucket).
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        """
+        Parameters:
+        - buckets (tuple): Sorted bucket upper bounds.
+        """
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # ✅ Per bucket, not cumulative
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        position = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[position] += 1
+            self.sum += value
+            self.count += 1
+
+    def quantile(self, q):
+        """
+        Estimates a quantile as the upper bound of the bucket holding it.
+
+        Parameters:
+        - q (float): Quantile between 0 and 1.
+
+        Returns:
+        - value (float): Bucket upper bound (inf beyond the last bucket), None if empty.
+        """
+        with self._lock:
+            counts, total = list(self.counts), self.count
+        if not total:
+            return None
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            seen += count
+            if seen >= q * total:
+                return bound
+        return float("inf")
+
+
+class _StageTimer:
+    __slots__ = ("metrics", "stage", "start")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe_stage(self.stage, time.perf_counter() - self.start)
+        return False
+
+
+class Metrics:
+    """
+    In-process latency histograms and counters for the query path.
+
+    Stages are timed with `with metrics.stage("name"):`. Every measurement goes into a
+    per-stage histogram and to the registered hooks (e.g. to forward it to a tracing or
+    StatsD client). `export_prometheus` renders everything in the Prometheus text format.
+    """
+
+    enabled = True
+
+    def __init__(self, latency_buckets=LATENCY_BUCKETS, confidence_buckets=CONFIDENCE_BUCKETS):
+        """
+        Parameters:
+        - latency_buckets (tuple): Histogram bucket upper bounds in seconds.
+        - confidence_buckets (tuple): Bucket upper bounds of the response confidence histogram.
+        """
+        self.latency_buckets = tuple(latency_buckets)
+        self.stages = {}  # ✅ Stage name → Histogram, created on first use
+        self.request_seconds = Histogram(self.latency_buckets)
+        self.confidence = Histogram(confidence_buckets)
+        self.requests = Counter()
+        self.low_confidence = Counter()
+        self.cache_hits = Counter()
+        self.empty_queries = Counter()
+        self.errors = Counter()
+        self.reload_seconds = Histogram(RELOAD_BUCKETS)
+        self.reload_failures = Counter()
+        self.index_version = 0
+        self._hooks = []
+        self._lock = threading.Lock()
+
+    def add_hook(self, hook):
+        """
+        Registers a callable called as `hook(stage, seconds)` for every timed stage.
+        """
+        self._hooks.append(hook)
+
+    def stage(self, name):
+        """
+        Returns a context manager timing the enclosed block as stage `name`.
+        """
+        return _StageTimer(self, name)
+
+    def observe_stage(self, name, seconds):
+        """
+        Records one duration of a stage.
+        """
+        histogram = self.stages.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.stages.setdefault(name, Histogram(self.latency_buckets))
+        histogram.observe(seconds)
+        for hook in self._hooks:
+            hook(name, seconds)
+
+    def record_response(self, seconds, confidence, low_confidence, cached=False):
+        """
+        Records one answered query.
+
+        Parameters:
+        - seconds (float): End-to-end time of the query (None inside a batch).
+        - confidence (float): Confidence of the response.
+        - low_confidence (bool): True if no FAQ answer was returned.
+        - cached (bool): True if the response came from the response cache.
+        """
+        self.requests.inc()
+        if seconds is not None:
+            self.request_seconds.observe(seconds)
+        self.confidence.observe(confidence)
+        if low_confidence:
+            self.low_confidence.inc()
+        if cached:
+            self.cache_hits.inc()
+
+    def record_reload(self, seconds, index_version, failed=False):
+        """
+        Records one reload of the FAQ index.
+
+        Parameters:
+        - seconds (float): Time taken to build (and swap in) the new index version.
+        - index_version (int): Index version serving queries afterwards.
+        - failed (bool): True if the reload failed and the previous version kept serving.
+        """
+        self.reload_seconds.observe(seconds)
+        self.index_version = index_version
+        if failed:
+            self.reload_failures.inc()
+
+    def summary(self):
+        """
+        Returns:
+        - summary (dict): Counters, the low-confidence rate and approximate p50 / p99
+          per stage (bucket upper bounds, in seconds).
+        """
+        requests = self.requests.value
+        return {
+            "requests": requests,
+            "low_confidence": self.low_confidence.value,
+            "low_confidence_rate": self.low_confidence.value / requests if requests else 0.0,
+            "cache_hits": self.cache_hits.value,
+            "empty_queries": self.empty_queries.value,
+            "errors": self.errors.value,
+            "reloads": self.reload_seconds.count,
+            "reload_failures": self.reload_failures.value,
+            "stages": {
+                name: {"count": histogram.count, "sum_seconds": histogram.sum,
+                       "p50_seconds": histogram.quantile(0.5), "p99_seconds": histogram.quantile(0.99)}
+                for name, histogram in sorted(self.stages.items())
+            },
+        }
+
+    def export_prometheus(self, prefix="faq"):
+        """
+        Renders all metrics in the Prometheus text exposition format (version 0.0.4).
+
+        Parameters:
+        - prefix (str): Metric name prefix.
+
+        Returns:
+        - text (str): The exposition text.
+        """
+        lines = []
+
+        def histogram_lines(name, histogram, labels=""):
+            with histogram._lock:
+                counts, total, count = list(histogram.counts), histogram.sum, histogram.count
+            cumulative = 0
+            separator = "," if labels else ""
+            for bound, bucket_count in zip(histogram.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{{{labels}{separator}le="{le}"}} {cumulative}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {total!r}")
+            lines.append(f"{name}_count{suffix} {count}")
+
+        name = f"{prefix}_stage_duration_seconds"
+        lines += [f"# HELP {name} Time spent in each stage of the query path.", f"# TYPE {name} histogram"]
+        for stage, histogram in sorted(self.stages.items()):
+            histogram_lines(name, histogram, f'stage="{stage}"')
+
+        name = f"{prefix}_request_duration_seconds"
+        lines += [f"# HELP {name} End-to-end time of generate_response.", f"# TYPE {name} histogram"]
+        histogram_lines(name, self.request_seconds)
+
+        name = f"{prefix}_response_confidence"
+        lines += [f"# HELP {name} Confidence of the returned responses.", f"# TYPE {name} histogram"]
+        histogram_lines(name, self.confidence)
+
+        name = f"{prefix}_reload_duration_seconds"
+        lines += [f"# HELP {name} Time taken to rebuild and swap in the FAQ index.", f"# TYPE {name} histogram"]
+        histogram_lines(name, self.reload_seconds)
+
+        counters = [
+            ("requests_total", self.requests, "Queries answered."),
+            ("low_confidence_total", self.low_confidence, "Queries answered without an FAQ match."),
+            ("cache_hits_total", self.cache_hits, "Queries answered from the response cache."),
+            ("empty_queries_total", self.empty_queries, "Empty queries."),
+            ("errors_total", self.errors, "Queries that failed with an error."),
+            ("reload_failures_total", self.reload_failures, "FAQ index reloads that failed."),
+        ]
+        for suffix, counter, help_text in counters:
+            name = f"{prefix}_{suffix}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter", f"{name} {counter.value}"]
+
+        requests = self.requests.value
+        name = f"{prefix}_low_confidence_ratio"
+        lines += [f"# HELP {name} Share of queries answered without an FAQ match.", f"# TYPE {name} gauge",
+                  f"{name} {self.low_confidence.value / requests if requests else 0.0!r}"]
+
+        name = f"{prefix}_index_version"
+        lines += [f"# HELP {name} FAQ index version serving queries (1 at startup, +1 per reload).",
+                  f"# TYPE {name} gauge", f"{name} {self.index_version}"]
+        return "\n".join(lines) + "\n"
+
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class _NullCounter:
+    __slots__ = ()
+    value = 0
+
+    def inc(self, amount=1):
+        pass
+
+
+class NullMetrics:
+    """
+    Disabled metrics: same interface as `Metrics`, every call is a no-op.
+    """
+
+    enabled = False
+    empty_queries = errors = _NullCounter()
+
+    def add_hook(self, hook):
+        pass
+
+    def stage(self, name):
+        return _NULL_TIMER
+
+    def observe_stage(self, name, seconds):
+        pass
+
+    def record_response(self, seconds, confidence, low_confidence, cached=False):
+        pass
+
+    def record_reload(self, seconds, index_version, failed=False):
+        pass
+
+    def summary(self):
+        return {}
+
+    def export_prometheus(self, prefix="faq"):
+        return ""
+
+
+NULL_METRICS = NullMetrics()
@@ -1,7 +1,186 @@
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+import logging
+import sys
+import threading
+import time
+from collections import namedtuple
 import numpy as np
-import spacy
+from spacy.attrs import NORM
+
+from modules.ann_index import IVFIndex
+from modules.embedding_matrix import EmbeddingMatrix
+from modules.faq_store import SortedStringMap, StringTable
+from modules.hashed_tfidf import HashedTfidfVectorizer
+from modules.index_buffers import GrowableArray, GrowableCSR
+from modules.metrics import NULL_METRICS
+from modules.nlp_loader import DEFAULT_SPACY_MODEL, load_nlp, load_ner
+from modules.parallel_build import build_index_parallel, can_fork
+from modules.query_analysis import QueryAnalysis
+from modules.vector_table import load_vector_table
+
+# One ranked result of `FAQModel.find_top_k`: the fused score and the two scores it was fused from
+Match = namedtuple("Match", ["faq_id", "score", "tfidf_score", "spacy_score"])
+
+
+class FAQIndex:
+    """
+    Search structures for one fitted version of the FAQ question set:
+    the TF-IDF vectorizer, the question matrices, a tombstone mask and the
+    FAQ id of every row.
+
+    Rows can be appended or tombstoned in amortized O(1); new rows use the
+    existing vocabulary and IDF weights until the next compaction re-fits them.
+    """
+
+    def __init__(self, questions, vectorizer, question_vectors, question_embeddings, question_keys,
+                 ids=None, ann_config=None, embedding_dtype="float32"):
+        """
+        Parameters:
+        - questions (StringTable or iterable): Question text per row. A StringTable is
+          shared copy-on-write instead of copied.
+        - vectorizer (TfidfVectorizer): Fitted vectorizer.
+        - question_vectors (scipy.sparse.csr_matrix): L2-normalized TF-IDF rows.
+        - question_embeddings (np.ndarray or EmbeddingMatrix): L2-normalized Spacy vectors, one
+          row per question. An EmbeddingMatrix is used as it is (already in its storage type).
+        - question_keys (list): Token sequence per row (see `FAQModel._embed_texts`).
+        - ids (np.ndarray, optional): FAQ id per row (default: the row number). Ids are unique.
+        - ann_config (dict, optional): `IVFIndex` arguments; when given, the embeddings are
+          also indexed for approximate search.
+        - embedding_dtype (str, optional): Storage type of float `question_embeddings`
+          ("float32", "float16" or "int8", see `EmbeddingMatrix`).
+        """
+        self.questions = questions.share() if isinstance(questions, StringTable) else StringTable.from_strings(questions)
+        self.question_keys = list(question_keys)
+        self.vectorizer = vectorizer
+        self.tfidf = GrowableCSR(question_vectors.tocsr())
+        if not isinstance(question_embeddings, EmbeddingMatrix):
+            question_embeddings = EmbeddingMatrix.from_vectors(question_embeddings, embedding_dtype)
+        self.embeddings = question_embeddings
+        self.active = GrowableArray(np.ones(len(self.questions), dtype=bool))
+        self.n_live = len(self.questions)
+        self.n_changed = 0  # ✅ Rows added or removed since the vectorizer was fitted
+
+        # ✅ Row → FAQ id, and FAQ id → row (-1 for ids without a live row)
+        n_rows = len(self.questions)
+        ids = np.arange(n_rows, dtype=np.int64) if ids is None else np.asarray(ids, dtype=np.int64)
+        self.ids = GrowableArray(ids)
+        rows_by_id = np.full(int(ids.max()) + 1 if n_rows else 0, -1, dtype=np.int64)
+        rows_by_id[ids] = np.arange(n_rows)
+        self.rows_by_id = GrowableArray(rows_by_id)
+
+        # ✅ Token-sequence → rows lookup, mirrors the exact-match shortcut of Doc.similarity
+        self.exact_match_rows = {}
+        for row, key in enumerate(self.question_keys):
+            self.exact_match_rows.setdefault(key, []).append(row)
+
+        self.ann = IVFIndex(**ann_config).fit(self.embeddings) if ann_config is not None else None
+
+    def row_of(self, faq_id):
+        """
+        Returns:
+        - row (int): Live row of a FAQ id, None if the id has none.
+        """
+        if not 0 <= faq_id < self.rows_by_id.size:
+            return None
+        row = int(self.rows_by_id.view()[faq_id])
+        return row if row >= 0 else None
+
+    def append(self, question, embedding, key, faq_id):
+        """
+        Appends one question row.
+        
+        Parameters:
+        - question (str): Question text.
+        - embedding (np.ndarray): Its normalized Spacy vector.
+        - key (tuple): Its token sequence.
+        - faq_id (int): Its FAQ id (must not have a live row).
+        """
+        row = len(self.questions)
+        self.tfidf.append(self.vectorizer.transform([question]))
+        self.embeddings.append(embedding[np.newaxis])
+        if self.ann is not None:
+            self.ann.add([row])
+        self.questions.append(question)
+        self.question_keys.append(key)
+        self.exact_match_rows.setdefault(key, []).append(row)
+        self.ids.append(np.array([faq_id], dtype=np.int64))
+        if faq_id >= self.rows_by_id.size:
+            self.rows_by_id.append(np.full(faq_id + 1 - self.rows_by_id.size, -1, dtype=np.int64))
+        self.rows_by_id[faq_id] = row
+        self.active.append(np.ones(1, dtype=bool))  # ✅ Published last: makes the row searchable
+        self.n_live += 1
+        self.n_changed += 1
+
+    def remove(self, faq_id):
+        """
+        Tombstones the row of a FAQ id (it is dropped for good at the next compaction).
+        
+        Parameters:
+        - faq_id (int): FAQ id.
+        
+        Returns:
+        - removed (bool): False if the id has no row in the index.
+        """
+        row = self.row_of(faq_id)
+        if row is None:
+            return False
+        self.rows_by_id[faq_id] = -1
+        self.active[row] = False
+        self.n_live -= 1
+        self.n_changed += 1
+        return True
+
+    def replace(self, question, embedding, key, faq_id):
+        """
+        Replaces the question of a FAQ id: the new row is appended (and published) before
+        the old one is tombstoned, so concurrent searches never miss the id.
+        
+        Parameters:
+        - question (str): New question text.
+        - embedding (np.ndarray): Its normalized Spacy vector.
+        - key (tuple): Its token sequence.
+        - faq_id (int): FAQ id (added if it has no live row).
+        """
+        old_row = self.row_of(faq_id)
+        self.append(question, embedding, key, faq_id)
+        if old_row is not None:
+            self.active[old_row] = False
+            self.n_live -= 1
+            self.n_changed += 1
+
+    def mask_removed(self, scores):
+        """
+        Sets the scores of tombstoned rows to -inf (in place).
+        
+        Parameters:
+        - scores (np.ndarray): Matrix of shape (queries, rows).
+        """
+        active = self.active.view()
+        n_rows = min(len(active), scores.shape[1])
+        scores[:, n_rows:] = -np.inf  # ✅ Rows appended concurrently but not yet published
+        if self.n_live < len(active):
+            scores[:, :n_rows][:, ~active[:n_rows]] = -np.inf
+
+    @property
+    def nbytes(self):
+        """
+        Approximate memory held by this index version: the arrays exactly, the Python
+        containers (token keys, TF-IDF vocabulary) estimated with `sys.getsizeof`.
+        """
+        total = self.tfidf.nbytes + self.embeddings.nbytes + self.active.nbytes + self.ids.nbytes
+        total += self.rows_by_id.nbytes + self.questions.nbytes
+        total += sys.getsizeof(self.question_keys) + sys.getsizeof(self.exact_match_rows)
+        for key, rows in self.exact_match_rows.items():
+            total += sys.getsizeof(key) + sum(map(sys.getsizeof, key)) + sys.getsizeof(rows)
+        vocabulary = getattr(self.vectorizer, "vocabulary_", None) or {}
+        if isinstance(vocabulary, SortedStringMap):
+            total += vocabulary.nbytes
+        else:
+            total += sys.getsizeof(vocabulary) + sum(sys.getsizeof(term) for term in vocabulary)
+        if self.ann is not None:
+            total += self.ann.nbytes
+        return total
+
 
 class FAQModel:
     """
@@ -11,24 +190,368 @@ class FAQModel:
     3. Combines both methods for better accuracy
     """
 
-    def __init__(self, questions):
+    def __init__(self, questions, ids=None, snapshot=None, auto_compact_ratio=0.25, ann_index=None, metrics=None,
+                 tfidf_weight=0.4, spacy_weight=0.6, embedding_dtype="float32", vector_table=None,
+                 hashing_features=None, build_workers=1):
         """
         Initializes the FAQModel with FAQ questions.
         
         Parameters:
-        - questions (list): List of FAQ questions to be matched.
+        - questions (list or StringTable): List of FAQ questions to be matched. Duplicates
+          are kept: each question is its own row, so every FAQ keeps its own id.
+        - ids (np.ndarray, optional): FAQ id per question (default: its position). Matches
+          are reported by these ids.
+        - snapshot (dict, optional): Index loaded by `index_snapshot.load_snapshot`.
+          When given (and built with the same Spacy model) the TF-IDF and embedding
+          matrices are taken from it instead of being fitted again.
+        - auto_compact_ratio (float, optional): Start a background compaction once the
+          questions added or removed since the last fit exceed this fraction of the
+          live questions. None disables automatic compaction.
+        - ann_index (IVFIndex, optional): Unfitted approximate nearest-neighbour index for the
+          Spacy similarity path (for very large corpora). Its n_lists / n_probe knobs trade
+          recall for latency; the model fits a copy on every index version. The TF-IDF path
+          stays exact.
+        - metrics (Metrics, optional): Collects the time spent in the TF-IDF, Spacy and
+          fusion stages of `find_top_k_many` (disabled by default).
+        - tfidf_weight (float, optional): Weight of the TF-IDF cosine similarity in the fused score.
+        - spacy_weight (float, optional): Weight of the Spacy vector similarity in the fused score.
+        - embedding_dtype (str, optional): Storage of the question embeddings: "float32" (exact),
+          "float16" (half the memory) or "int8" (a quarter, with a scale per row). Quantized
+          embeddings are scored as they are, converted block by block (see `EmbeddingMatrix`).
+        - vector_table (str, optional): Directory of a table built by `vector_table.build_vector_table`.
+          Its memory-mapped vectors replace the Spacy model's, which is then not loaded (NER
+          still loads the model's entity recognizer on first use, if it is installed).
+        - hashing_features (int, optional): Use a hashed n-gram space of this many buckets
+          (`HashedTfidfVectorizer`, e.g. 2**28) instead of a fitted TF-IDF vocabulary.
+        - build_workers (int, optional): Processes used to build the index (1 = in this process).
+          Questions are split into shards that are embedded in parallel; with
+          `hashing_features`, the TF-IDF counts are computed per shard as well and merged
+          with corpus-wide IDF weights. Needs fork (Linux / macOS), else the build is serial.
         """
+        if tfidf_weight < 0 or spacy_weight < 0 or tfidf_weight + spacy_weight <= 0:
+            raise ValueError("Fusion weights must be non-negative and not both zero")
+        self.tfidf_weight = tfidf_weight
+        self.spacy_weight = spacy_weight
+        self.embedding_dtype = embedding_dtype
+        self.hashing_features = hashing_features
+        self.build_workers = build_workers
+        self.startup_timings = {}
+        self.metrics = metrics if metrics is not None else NULL_METRICS
+        self.auto_compact_ratio = auto_compact_ratio
+        self.ann_config = ann_index.config() if ann_index is not None else None
+        self._lock = threading.Lock()  # ✅ Serializes index mutations
+        self._compaction_lock = threading.Lock()
+        self._compaction_log = None  # ✅ Mutations made while a compaction is running
+        self.version = 0  # ✅ Bumped whenever match results may change (used for caching)
+
         # ✅ Load Spacy's large model for better word vector similarity
-        self.nlp = spacy.load('en_core_web_lg')  # Better accuracy than 'en_core_web_md'
-        self.questions = list(set(questions))  # ✅ Remove duplicates from the FAQ list
+        #    (vectors only: parser, NER etc. are skipped, NER is loaded on first use)
+        start = time.perf_counter()
+        self.spacy_model = DEFAULT_SPACY_MODEL  # Better accuracy than 'en_core_web_md'
+        self._ner_unavailable = False  # ✅ Set once NER failed to load, so it is reported once
+        if vector_table is not None:
+            self.nlp = load_vector_table(vector_table)  # ✅ Just the words the FAQs need, memory-mapped
+        else:
+            self.nlp = load_nlp(self.spacy_model)
+        self.startup_timings["spacy_load"] = time.perf_counter() - start
+
+        if snapshot is not None and (snapshot["nlp"] != self.nlp_signature()
+                                     or snapshot["embedding_dtype"] != embedding_dtype
+                                     or snapshot.get("hashing_features") != hashing_features):
+            snapshot = None  # ✅ Snapshot was built with other word vectors, storage or TF-IDF space, rebuild it
+
+        start = time.perf_counter()
+        self.from_snapshot = snapshot is not None
+        if self.from_snapshot:
+            self.index = self._load_index(snapshot)
+            self.startup_timings["snapshot_load"] = time.perf_counter() - start
+        else:
+            self.index = self._build_index(questions, ids=ids)
+        self._next_id = self.index.rows_by_id.size  # ✅ Highest FAQ id + 1
+
+    # ✅ Read-only views of the current index version
+    @property
+    def questions(self):
+        """Question text per row (tombstoned rows stay until the next compaction)."""
+        return self.index.questions
+
+    @property
+    def ids(self):
+        """FAQ id per row."""
+        return self.index.ids.view()
+
+    @property
+    def vectorizer(self):
+        return self.index.vectorizer
 
-        print("Processing Questions:", self.questions)  # Debugging assistance
+    @property
+    def question_vectors(self):
+        return self.index.tfidf.matrix()
+
+    @property
+    def question_embeddings(self):
+        """float32 question embeddings (a converted copy when they are stored quantized)."""
+        return self.index.embeddings.rows()
+
+    @property
+    def exact_match_rows(self):
+        return self.index.exact_match_rows
+
+    @property
+    def nbytes(self):
+        """Approximate memory of the current index version (the shared Spacy pipeline is not counted)."""
+        return self.index.nbytes
+
+    def _build_index(self, questions, embeddings=None, question_keys=None, ids=None):
+        """
+        Fits the TF-IDF vectorizer and embeds all FAQ questions.
+        
+        Parameters:
+        - questions (list or StringTable): List of FAQ questions to be matched.
+        - embeddings (np.ndarray or EmbeddingMatrix, optional): Already computed normalized
+          vectors of `questions`.
+        - question_keys (list, optional): Token sequences matching `embeddings`.
+        - ids (np.ndarray, optional): FAQ id per question (default: its position).
         
-        # ✅ TF-IDF Vectorizer with bigrams & trigrams (improves phrase matching)
-        self.vectorizer = TfidfVectorizer(ngram_range=(1,3), stop_words='english')
+        Returns:
+        - index (FAQIndex): The fitted index.
+        """
+        if embeddings is None:
+            logging.info(f"Processing {len(questions)} questions")
+
+        vectorizer = self._new_vectorizer()
+
+        # ✅ Large corpora: shards are embedded (and hashed TF-IDF counted) in worker processes
+        if embeddings is None and self.build_workers > 1 and len(questions) > 1 and can_fork():
+            start = time.perf_counter()
+            question_vectors, embeddings, question_keys = build_index_parallel(self, questions, vectorizer,
+                                                                                self.build_workers)
+            self.startup_timings["parallel_index_build"] = time.perf_counter() - start
+            return FAQIndex(questions, vectorizer, question_vectors, embeddings, question_keys,
+                            ids=ids, ann_config=self.ann_config, embedding_dtype=self.embedding_dtype)
 
         # ✅ Convert FAQ questions into TF-IDF vectors
-        self.question_vectors = self.vectorizer.fit_transform(self.questions)
+        start = time.perf_counter()
+        question_vectors = vectorizer.fit_transform(questions)
+        self.startup_timings.setdefault("tfidf_fit", time.perf_counter() - start)  # ✅ First fit only, not compactions
+
+        # ✅ Precompute normalized Spacy question vectors once (one row per question)
+        if embeddings is None:
+            start = time.perf_counter()
+            embeddings, question_keys = self._embed_texts(questions)
+            self.startup_timings["embed_questions"] = time.perf_counter() - start
+
+        return FAQIndex(questions, vectorizer, question_vectors, embeddings, question_keys,
+                        ids=ids, ann_config=self.ann_config, embedding_dtype=self.embedding_dtype)
+
+    def _new_vectorizer(self):
+        """
+        Returns an unfitted TF-IDF vectorizer: bigrams & trigrams (improve phrase matching),
+        over a fitted vocabulary or, with `hashing_features`, a hashed n-gram space.
+        """
+        if self.hashing_features:
+            return HashedTfidfVectorizer(n_features=self.hashing_features, ngram_range=(1,3), stop_words='english')
+        return TfidfVectorizer(ngram_range=(1,3), stop_words='english')
+
+    def _load_index(self, snapshot):
+        """
+        Restores the fitted vectorizer and the question matrices from a snapshot.
+        
+        Parameters:
+        - snapshot (dict): Index loaded by `index_snapshot.load_snapshot`.
+        
+        Returns:
+        - index (FAQIndex): The restored index.
+        """
+        # ✅ Rebuild the fitted vectorizer from its vocabulary and IDF weights (no refit)
+        vectorizer = self._new_vectorizer()
+        if self.hashing_features:
+            vectorizer.columns_ = np.asarray(snapshot["tfidf_columns"])
+        else:
+            vectorizer.vocabulary_ = snapshot["vocabulary"]  # ✅ Memory-mapped, looked up by binary search
+        vectorizer.idf_ = np.asarray(snapshot["idf"])
+
+        # ✅ Memory-mapped matrices are used as they are (copied only on the first append)
+        # ✅ Rows of a freshly built index are the FAQ ids: share the store's question table
+        questions, ids = snapshot["faqs"].questions, np.asarray(snapshot["ids"])
+        if not np.array_equal(ids, np.arange(len(questions))):
+            questions = [questions[faq_id] for faq_id in ids]
+        embeddings = EmbeddingMatrix(snapshot["question_embeddings"], snapshot["embedding_scales"])
+        return FAQIndex(questions, vectorizer, snapshot["question_vectors"],
+                        embeddings, snapshot["exact_match_keys"],
+                        ids=snapshot["ids"], ann_config=self.ann_config)
+
+    def add_question(self, question, faq_id=None):
+        """
+        Adds a question to the index without re-fitting (amortized O(1)).
+        Terms unseen at the last fit are ignored by TF-IDF until the next compaction.
+        
+        Parameters:
+        - question (str): Question text.
+        - faq_id (int, optional): Its FAQ id (default: one past the highest id seen so far,
+          so removed ids are not reused).
+        
+        Returns:
+        - faq_id (int): The id the question matches under.
+        """
+        embeddings, keys = self._embed_texts([question])
+        with self._lock:
+            if faq_id is None:
+                faq_id = self._next_id
+            elif self.index.row_of(faq_id) is not None:
+                raise ValueError(f"FAQ id {faq_id} is already in the index")
+            self.index.append(question, embeddings[0], keys[0], faq_id)
+            self._next_id = max(self._next_id, faq_id + 1)
+            self.version += 1
+            if self._compaction_log is not None:
+                self._compaction_log.append(("add", question, embeddings[0], keys[0], faq_id))
+        self._maybe_compact()
+        return faq_id
+
+    def remove_question(self, faq_id):
+        """
+        Tombstones the question of a FAQ id; it stops matching immediately.
+        
+        Parameters:
+        - faq_id (int): FAQ id.
+        
+        Returns:
+        - removed (bool): False if the id is not in the index.
+        """
+        with self._lock:
+            removed = self.index.remove(faq_id)
+            if removed:
+                self.version += 1
+            if removed and self._compaction_log is not None:
+                self._compaction_log.append(("remove", faq_id))
+        if removed:
+            self._maybe_compact()
+        return removed
+
+    def update_question(self, faq_id, new_question):
+        """
+        Replaces the question of a FAQ id (appends a new row, then tombstones the old one,
+        under one lock). Adds the question if the id has no live row.
+        
+        Parameters:
+        - faq_id (int): FAQ id.
+        - new_question (str): New question text.
+        """
+        embeddings, keys = self._embed_texts([new_question])
+        with self._lock:
+            self.index.replace(new_question, embeddings[0], keys[0], faq_id)
+            self._next_id = max(self._next_id, faq_id + 1)
+            self.version += 1
+            if self._compaction_log is not None:
+                self._compaction_log.append(("replace", new_question, embeddings[0], keys[0], faq_id))
+        self._maybe_compact()
+
+    def needs_compaction(self):
+        """
+        Returns:
+        - needed (bool): True if enough questions changed since the last fit to re-fit.
+        """
+        index = self.index
+        return (self.auto_compact_ratio is not None
+                and index.n_changed > self.auto_compact_ratio * max(index.n_live, 1))
+
+    def _maybe_compact(self):
+        """Starts a background compaction when `needs_compaction` says so."""
+        if self.needs_compaction() and not self._compaction_lock.locked():
+            threading.Thread(target=self.compact, name="faq-index-compaction", daemon=True).start()
+
+    def compact(self):
+        """
+        Re-fits the TF-IDF vocabulary and IDF weights over the live questions and drops
+        tombstoned rows. Embeddings are reused, not recomputed.
+
+        The new index is built while the current one keeps serving queries and accepting
+        changes; changes made meanwhile are replayed on the new index before it is swapped in.
+        """
+        with self._compaction_lock:
+            with self._lock:
+                index = self.index
+                live_rows = np.flatnonzero(index.active.view())
+                questions = [index.questions[row] for row in live_rows]
+                question_keys = [index.question_keys[row] for row in live_rows]
+                embeddings = index.embeddings.take(live_rows)  # ✅ Kept in their storage type
+                ids = index.ids.view()[live_rows]
+                self._compaction_log = []
+
+            try:
+                new_index = self._build_index(questions, embeddings, question_keys, ids)
+            except Exception:
+                with self._lock:
+                    self._compaction_log = None
+                raise
+
+            with self._lock:
+                for operation in self._compaction_log:
+                    if operation[0] == "add":
+                        new_index.append(*operation[1:])
+                    elif operation[0] == "replace":
+                        new_index.replace(*operation[1:])
+                    else:
+                        new_index.remove(operation[1])
+                self._compaction_log = None
+                new_index.n_changed = 0
+                self.index = new_index  # ✅ Atomic swap: queries use either the old or the new index
+                self.version += 1
+
+    def nlp_signature(self):
+        """
+        Identifies the loaded Spacy model and its word vectors (used to validate snapshots).
+        
+        Returns:
+        - signature (str): "<lang>_<name>-<version>-<vector width>", e.g. "en_core_web_lg-3.7.1-300".
+        """
+        meta = self.nlp.meta
+        return f"{meta.get('lang', '')}_{meta.get('name', '')}-{meta.get('version', '')}-{self.nlp.vocab.vectors_length}"
+
+    def _embed_texts(self, texts):
+        """
+        Converts texts into L2-normalized Spacy document vectors.
+
+        Only the tokenizer is run: a document vector is the mean of the static word
+        vectors of its tokens, so the other pipeline components do not change it.
+        
+        Parameters:
+        - texts (list): Texts to embed.
+        
+        Returns:
+        - embeddings (np.ndarray): float32 matrix of shape (len(texts), vector width).
+          Texts without any known word vector get an all-zero row.
+        - keys (list): Token sequence of each text (the attribute the vectors are keyed by).
+        """
+        return self._embed_docs(self.nlp.tokenizer.pipe(texts), len(texts))
+
+    def _embed_queries(self, queries):
+        """
+        `_embed_texts` for queries: a QueryAnalysis contributes its already built `vector_doc`.
+        """
+        docs = (query.vector_doc if isinstance(query, QueryAnalysis) else self.nlp.tokenizer(query)
+                for query in queries)
+        return self._embed_docs(docs, len(queries))
+
+    @staticmethod
+    def _query_texts(queries):
+        """Preprocessed text per query (queries are strings or QueryAnalysis objects)."""
+        return [query.processed if isinstance(query, QueryAnalysis) else query for query in queries]
+
+    def _embed_docs(self, docs, n_docs):
+        """
+        Embeds tokenized Docs (see `_embed_texts`).
+        """
+        use_norm = getattr(self.nlp.vocab.vectors, "attr", None) == NORM
+        embeddings = np.zeros((n_docs, self.nlp.vocab.vectors_length), dtype=np.float32)
+        keys = []
+
+        for i, doc in enumerate(docs):
+            keys.append(tuple(token.norm if use_norm else token.orth for token in doc))
+            if doc.vector_norm:
+                embeddings[i] = doc.vector / doc.vector_norm
+
+        return embeddings, keys
 
     def find_best_match(self, query):
         """
@@ -38,20 +561,153 @@ class FAQModel:
         - query (str): User's input question.
         
         Returns:
-        - best_match (str): The most relevant FAQ question.
-        - confidence (float): Similarity score (0 to 1, higher is better).
+        - faq_id (int): Id of the most relevant FAQ (None if the index is empty).
+        - confidence (float): Its fused similarity score (0 to 1, higher is better).
+        """
+        return self.find_best_matches([query])[0]
+
+    def find_best_matches(self, queries, batch_size=256):
         """
-        # ✅ Get similarity scores from both methods
-        tfidf_match, tfidf_conf = self.find_best_match_tfidf(query)
-        spacy_match, spacy_conf = self.find_best_match_spacy(query)
+        Finds the best matching FAQ for many queries at once (the top result of `find_top_k_many`).
+        
+        Parameters:
+        - queries (list): User input questions.
+        - batch_size (int): Queries scored per matrix product (bounds the score matrix size).
+        
+        Returns:
+        - matches (list): One (faq_id, confidence) tuple per query.
+          faq_id is None if the index holds no questions.
+        """
+        return [(top[0].faq_id, top[0].score) if top else (None, 0.0)
+                for top in self.find_top_k_many(queries, k=1, batch_size=batch_size)]
+
+    def find_top_k(self, query, k=5):
+        """
+        Ranks the FAQs for a query by their fused TF-IDF + Spacy score.
+        
+        Parameters:
+        - query (str or QueryAnalysis): User's input question (preprocessed text, or its analysis).
+        - k (int): Number of results.
+        
+        Returns:
+        - matches (list): Up to k `Match` tuples (faq_id, score, tfidf_score, spacy_score), best first.
+        """
+        return self.find_top_k_many([query], k)[0]
+
+    def find_top_k_many(self, queries, k=5, batch_size=256):
+        """
+        Ranks the FAQs for many queries at once.
+
+        Per batch, the TF-IDF and Spacy score matrices are computed once, fused as
+        `tfidf_weight * tfidf + spacy_weight * spacy` in one vectorized operation, and the
+        k best rows per query are selected with `argpartition` (no full sort). Per query
+        the result equals `find_top_k`.
+        
+        Parameters:
+        - queries (list): User input questions (preprocessed strings or QueryAnalysis objects).
+        - k (int): Number of results per query.
+        - batch_size (int): Queries scored per matrix product (bounds the score matrix size).
+        
+        Returns:
+        - matches (list): One list of up to k `Match` tuples per query, best first.
+          The lists are empty if the index holds no questions.
+        """
+        index = self.index  # ✅ Score the whole call against one index version
+        if index.n_live == 0 or k < 1:
+            return [[] for _ in queries]
+
+        matches = []
+
+        for start in range(0, len(queries), batch_size):
+            batch = queries[start:start + batch_size]
+            # ✅ Rows published before scoring; a concurrent `append` may have added TF-IDF or
+            #    embedding rows past it, so both matrices are cut to the same width
+            n_rows = index.active.size
 
-        # ✅ Hybrid approach: Adjusted weight (Spacy now has more influence)
-        final_conf = (0.4 * tfidf_conf) + (0.6 * spacy_conf)
+            # ✅ Score matrices of both methods, computed once
+            with self.metrics.stage("tfidf"):
+                tfidf_scores = self.tfidf_scores(batch, index)[:, :n_rows]
+            with self.metrics.stage("spacy"):
+                if index.ann is None:
+                    spacy_scores = self.spacy_scores(batch, index)[:, :n_rows]
+                else:
+                    spacy_scores = self._ann_spacy_scores(batch, index, tfidf_scores, k)
 
-        # ✅ Select the match with the **higher confidence score**
-        best_match = tfidf_match if tfidf_conf > spacy_conf else spacy_match
+            with self.metrics.stage("fusion"):
+                matches.extend(self._fuse_top_k(tfidf_scores, spacy_scores, index, k))
 
-        return best_match, final_conf
+        return matches
+
+    def _fuse_top_k(self, tfidf_scores, spacy_scores, index, k):
+        """
+        Fuses two score matrices and selects the k best rows per query.
+        
+        Parameters:
+        - tfidf_scores (np.ndarray): TF-IDF scores, shape (queries, rows).
+        - spacy_scores (np.ndarray): Spacy scores, same shape (-inf for rows not scored).
+        - index (FAQIndex): Index version the scores belong to.
+        - k (int): Number of results per query.
+        
+        Returns:
+        - matches (list): One list of up to k `Match` tuples per query, best first.
+        """
+        with np.errstate(invalid="ignore"):
+            fused = self.tfidf_weight * tfidf_scores + self.spacy_weight * spacy_scores
+        index.mask_removed(fused)  # ✅ Also clears 0 * -inf (NaN) when a weight is zero
+
+        k = min(k, fused.shape[1])
+        top = np.argpartition(-fused, k - 1, axis=1)[:, :k]
+        top_scores = np.take_along_axis(fused, top, axis=1)
+        order = np.lexsort((top, -top_scores), axis=1)  # ✅ Best first, ties go to the lower row
+        top = np.take_along_axis(top, order, axis=1)
+
+        ids = index.ids.view()
+        matches = []
+        for i, rows in enumerate(top):
+            matches.append([
+                Match(int(ids[row]), float(fused[i, row]), float(tfidf_scores[i, row]), float(spacy_scores[i, row]))
+                for row in rows if fused[i, row] > -np.inf
+            ])
+        return matches
+
+    def _ann_spacy_scores(self, queries, index, tfidf_scores, k):
+        """
+        Spacy scores for the rows worth fusing when the ANN index is used: the ANN
+        candidates, the TF-IDF top k and exact token-sequence matches. Other rows score
+        -inf, so the full embedding product is never computed.
+        
+        Parameters:
+        - queries (list): User input questions.
+        - index (FAQIndex): Index version to score against.
+        - tfidf_scores (np.ndarray): TF-IDF scores of the queries, one column per published row.
+        - k (int): Number of results per query.
+        
+        Returns:
+        - scores (np.ndarray): Matrix of the same shape as `tfidf_scores`.
+        """
+        query_embeddings, query_keys = self._embed_queries(queries)
+        n_rows = tfidf_scores.shape[1]
+        active = index.active.view()
+        ann_rows, _ = index.ann.search(query_embeddings, k=k,
+                                       active=active[:n_rows] if index.n_live < len(active) else None)
+
+        k_tfidf = min(k, tfidf_scores.shape[1])
+        tfidf_rows = np.argpartition(-tfidf_scores, k_tfidf - 1, axis=1)[:, :k_tfidf]
+
+        scores = np.full(tfidf_scores.shape, -np.inf, dtype=np.float32)
+        for i, key in enumerate(query_keys):
+            rows = np.union1d(ann_rows[i][ann_rows[i] >= 0], tfidf_rows[i])
+            rows = rows[rows < n_rows]
+            row_scores = index.embeddings.rows(rows) @ query_embeddings[i].astype(np.float64)
+            scores[i, rows] = np.clip(row_scores, -1.0, 1.0).astype(np.float32)  # ✅ As `EmbeddingMatrix.scores`
+
+            # ✅ Identical token sequences always score 1.0 (same as Doc.similarity)
+            for row in index.exact_match_rows.get(key, ()):
+                if row < scores.shape[1]:
+                    scores[i, row] = 1.0
+
+        index.mask_removed(scores)
+        return scores
 
     def find_best_match_tfidf(self, query):
         """
@@ -61,14 +717,18 @@ class FAQModel:
         - query (str): User's input question.
         
         Returns:
-        - best_match (str): Closest matching FAQ.
-        - confidence (float): Similarity score (higher means better match).
+        - faq_id (int): Id of the closest matching FAQ, None if the index holds no live question.
+        - confidence (float): Similarity score (higher means better match, 0.0 without a match).
         """
-        query_vector = self.vectorizer.transform([query])
-        similarities = cosine_similarity(query_vector, self.question_vectors).flatten()
+        index = self.index
+        if index.n_live == 0:
+            return None, 0.0
+        similarities = self.tfidf_scores([query], index)[0]
         max_index = np.argmax(similarities)
+        if similarities[max_index] == -np.inf:  # ✅ Every row tombstoned meanwhile
+            return None, 0.0
 
-        return self.questions[max_index], similarities[max_index]
+        return int(index.ids.view()[max_index]), float(similarities[max_index])
 
     def find_best_match_spacy(self, query):
         """
@@ -78,26 +738,122 @@ class FAQModel:
         - query (str): User's input question.
         
         Returns:
-        - best_match (str): Closest matching FAQ.
-        - confidence (float): Similarity score (higher means better match).
+        - faq_id (int): Id of the closest matching FAQ, None if the index holds no live question.
+        - confidence (float): Similarity score (higher means better match, 0.0 without a match).
         """
-        query_doc = self.nlp(query)
-        scores = [query_doc.similarity(self.nlp(q)) for q in self.questions]
-        max_index = np.argmax(scores)
+        index = self.index
+        if index.n_live == 0:
+            return None, 0.0
+        best_idx, best_conf = self._best_spacy_matches([query], index)
+        if best_idx[0] < 0:
+            return None, 0.0
 
-        return self.questions[max_index], scores[max_index]
+        return int(index.ids.view()[best_idx[0]]), float(best_conf[0])
+
+    def _best_spacy_matches(self, queries, index):
+        """
+        Finds the best Spacy similarity match per query, exactly or through the ANN index.
+        
+        Parameters:
+        - queries (list): User input questions.
+        - index (FAQIndex): Index version to score against.
+        
+        Returns:
+        - best_idx (np.ndarray): Best row per query, -1 if no live row was found.
+        - best_conf (np.ndarray): Its similarity score (0.0 for -1).
+        """
+        if index.ann is None:
+            scores = self.spacy_scores(queries, index)
+            best_idx = np.argmax(scores, axis=1) if scores.shape[1] else np.full(len(queries), -1)
+            best_conf = scores[np.arange(len(queries)), best_idx] if scores.shape[1] else np.zeros(len(queries))
+            missing = best_conf == -np.inf  # ✅ Every row tombstoned
+            best_idx[missing], best_conf[missing] = -1, 0.0
+            return best_idx, best_conf
+
+        query_embeddings, query_keys = self._embed_queries(queries)
+        active = index.active.view()
+        ids, scores = index.ann.search(query_embeddings, k=1, active=active if index.n_live < len(active) else None)
+        best_idx, best_conf = ids[:, 0], scores[:, 0]
+
+        # ✅ Identical token sequences always score 1.0 (same as Doc.similarity)
+        for i, key in enumerate(query_keys):
+            for row in index.exact_match_rows.get(key, ()):
+                if row < len(active) and active[row]:
+                    best_idx[i], best_conf[i] = row, 1.0
+                    break
+
+        best_conf[best_idx < 0] = 0.0  # ✅ No live candidate in the probed lists
+        return best_idx, best_conf
+
+    def tfidf_scores(self, queries, index=None):
+        """
+        Computes TF-IDF cosine similarities between queries and all FAQ questions.
+        
+        Parameters:
+        - queries (list): User input questions.
+        - index (FAQIndex, optional): Index version to score against (default: current).
+        
+        Returns:
+        - scores (np.ndarray): Matrix of shape (len(queries), number of rows).
+          Removed questions score -inf.
+        """
+        index = index or self.index
+        query_vectors = index.vectorizer.transform(self._query_texts(queries))
+
+        # ✅ TfidfVectorizer rows are already L2-normalized, so cosine similarity is a plain
+        #    sparse product. Multiplying from the question side avoids copying the (possibly
+        #    memory-mapped) question matrix, which `cosine_similarity` would re-normalize.
+        scores = (index.tfidf.matrix() @ query_vectors.T).T.toarray()
+        index.mask_removed(scores)
+        return scores
+
+    def spacy_scores(self, queries, index=None):
+        """
+        Computes Spacy word vector similarities between queries and all FAQ questions.
+        
+        Parameters:
+        - queries (list): User input questions.
+        - index (FAQIndex, optional): Index version to score against (default: current).
+        
+        Returns:
+        - scores (np.ndarray): Matrix of shape (len(queries), number of rows).
+          Removed questions score -inf.
+        """
+        index = index or self.index
+        query_embeddings, query_keys = self._embed_queries(queries)
+
+        # ✅ Cosine similarity of every query against every question, one block of rows at a time.
+        #    Accumulating in float64 and rounding back keeps a query's scores identical
+        #    whether it is scored alone or inside a batch (BLAS sums in a different order).
+        scores = index.embeddings.scores(query_embeddings)
+
+        # ✅ Identical token sequences always score 1.0 (same as Doc.similarity)
+        for i, key in enumerate(query_keys):
+            for row in index.exact_match_rows.get(key, ()):
+                if row < scores.shape[1]:
+                    scores[i, row] = 1.0
+
+        index.mask_removed(scores)
+        return scores
 
     def extract_entities(self, query):
         """
         Extracts named entities (like dates, amounts, locations) from the query using Spacy.
         
         Parameters:
-        - query (str): User's input question.
+        - query (str or QueryAnalysis): User's input question (an analysis is not tokenized again).
         
         Returns:
         - entities (dict): Dictionary of detected entities {EntityType: EntityText}.
         """
-        doc = self.nlp(query)
+        try:
+            ner = load_ner(self.nlp, self.spacy_model)  # ✅ Loaded on first use only
+        except OSError as e:
+            if not self._ner_unavailable:  # ✅ E.g. vector table without the model
+                self._ner_unavailable = True
+                logging.warning(f"Named entity recognition unavailable: {e}")
+            return {}
+        doc = ner(query.doc if isinstance(query, QueryAnalysis) else self.nlp.make_doc(query))
         return {ent.label_: ent.text for ent in doc.ents}
 
 if __name__ == "__main__":
@@ -119,8 +875,8 @@ if __name__ == "__main__":
 
     # ✅ Test with a **refund-related query**
     query = "How do I get a refund?"
-    best_match, confidence = model.find_best_match(query)
+    faq_id, confidence = model.find_best_match(query)
     
     print(f"\nUser Query: {query}")
-    print(f"Best Match: {best_match}")
+    print(f"Best Match: {sample_questions[faq_id]}")
     print(f"Confidence Score: {confidence:.2f}")
@@ -0,0 +1,65 @@
+import logging
+import threading
+
+import spacy
+
+# Spacy model providing the word vectors used for similarity
+DEFAULT_SPACY_MODEL = 'en_core_web_lg'
+
+# Similarity only needs the tokenizer and the static word vectors
+SIMILARITY_EXCLUDE = ["tok2vec", "tagger", "morphologizer", "parser", "senter",
+                      "attribute_ruler", "lemmatizer", "ner"]
+
+_pipelines = {}
+_ner_pipelines = {}
+_ner_errors = {}  # ✅ Models whose NER failed to load: not looked up again
+_lock = threading.Lock()
+
+
+def load_nlp(model_name=DEFAULT_SPACY_MODEL):
+    """
+    Loads a trimmed Spacy pipeline (tokenizer + word vectors only), once per process.
+
+    Parameters:
+    - model_name (str): Name or path of the installed Spacy model.
+
+    Returns:
+    - nlp (spacy.Language): Shared pipeline without trained components.
+    """
+    with _lock:
+        if model_name not in _pipelines:
+            logging.info(f"Loading Spacy model '{model_name}' (vectors only)...")
+            _pipelines[model_name] = spacy.load(model_name, exclude=SIMILARITY_EXCLUDE)
+        return _pipelines[model_name]
+
+
+def load_ner(nlp, model_name=DEFAULT_SPACY_MODEL):
+    """
+    Loads the named entity recognizer of a model on first use, sharing `nlp`'s vocab.
+
+    The vocab (and its word vectors) is not read from disk again, so this only costs
+    the NER weights.
+
+    Parameters:
+    - nlp (spacy.Language): Pipeline returned by `load_nlp` for the same model.
+    - model_name (str): Name or path of the installed Spacy model.
+
+    Returns:
+    - ner (callable): The "ner" component; call it on a Doc to set `doc.ents`.
+
+    Raises:
+    - OSError: If the model is not installed (raised again on later calls without retrying).
+    """
+    with _lock:
+        if model_name in _ner_errors:
+            raise _ner_errors[model_name]
+        if model_name not in _ner_pipelines:
+            logging.info(f"Loading NER component of Spacy model '{model_name}'...")
+            other_components = [name for name in SIMILARITY_EXCLUDE if name != "ner"]
+            try:
+                ner_nlp = spacy.load(model_name, vocab=nlp.vocab, exclude=other_components + ["vocab"])
+            except OSError as e:
+                _ner_errors[model_name] = e
+                raise
+            _ner_pipelines[model_name] = ner_nlp.get_pipe("ner")
+        return _ner_pipelines[model_name]
@@ -0,0 +1,135 @@
+import logging
+import mmap
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from modules.hashed_tfidf import HashedTfidfVectorizer
+
+# State of the running build, set before the pool forks: workers inherit it (the loaded
+# Spacy pipeline, the questions) instead of receiving it pickled
+_context = None
+_lock = threading.Lock()  # ✅ One sharded build at a time per process
+
+
+def can_fork():
+    """
+    Returns:
+    - supported (bool): True if worker processes can be forked on this platform.
+    """
+    return "fork" in multiprocessing.get_all_start_methods()
+
+
+def _shared_array(shape, dtype):
+    """
+    Returns a zeroed array in an anonymous shared mapping: rows written by forked
+    workers are visible to the parent without being sent back.
+    """
+    nbytes = max(int(np.prod(shape)) * np.dtype(dtype).itemsize, 1)
+    return np.frombuffer(mmap.mmap(-1, nbytes), dtype=dtype, count=int(np.prod(shape))).reshape(shape)
+
+
+def run_sharded(task, context, n_items, n_workers, shard_size=None):
+    """
+    Runs `task(context, start, end)` over consecutive shards of [0, n_items) in forked processes.
+
+    Parameters:
+    - task (callable): Module-level function (sent to the workers by reference).
+    - context (dict): Build state inherited by the workers through fork.
+    - n_items (int): Number of items.
+    - n_workers (int): Worker processes.
+    - shard_size (int, optional): Items per shard (default: about 4 shards per worker,
+      so a slow shard does not leave the other workers idle).
+
+    Returns:
+    - results (list): Result of each shard, in order.
+    """
+    global _context
+    shard_size = shard_size or max(1, -(-n_items // (4 * n_workers)))
+    bounds = [(start, min(start + shard_size, n_items)) for start in range(0, n_items, shard_size)]
+    with _lock:
+        _context = context
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=multiprocessing.get_context("fork")) as pool:
+                futures = [pool.submit(_run_shard, task, start, end) for start, end in bounds]
+                return [future.result() for future in futures]
+        finally:
+            _context = None
+
+
+def _run_shard(task, start, end):
+    return task(_context, start, end)
+
+
+def _index_shard(context, start, end):
+    """
+    Worker: embeds a shard of questions into the shared output and counts its hashed n-grams.
+    """
+    questions = [context["questions"][i] for i in range(start, end)]
+    embeddings, keys = context["model"]._embed_texts(questions)
+    context["embeddings"][start:end] = embeddings
+    vectorizer = context["vectorizer"]
+    counts = vectorizer.counts(questions) if isinstance(vectorizer, HashedTfidfVectorizer) else None
+    return keys, counts
+
+
+def _preprocess_shard(context, start, end):
+    """
+    Worker: preprocesses a shard of texts.
+    """
+    texts = context["texts"]
+    return context["text_processor"].preprocess_many([texts[i] for i in range(start, end)])
+
+
+def build_index_parallel(model, questions, vectorizer, n_workers):
+    """
+    Vectorizes and embeds FAQ questions in `n_workers` forked processes.
+
+    Each worker embeds its shard with the inherited Spacy pipeline, writing straight into
+    a shared matrix, and, with a `HashedTfidfVectorizer`, counts the shard's n-grams. The
+    parent merges the counts and applies the IDF weights of the whole corpus. Another
+    vectorizer is fitted in the parent, since its vocabulary needs the whole corpus.
+
+    Parameters:
+    - model (FAQModel): Model whose `_embed_texts` embeds the questions.
+    - questions (list or StringTable): Questions.
+    - vectorizer (HashedTfidfVectorizer or TfidfVectorizer): Unfitted vectorizer.
+    - n_workers (int): Worker processes.
+
+    Returns:
+    - question_vectors (scipy.sparse.csr_matrix): L2-normalized TF-IDF rows.
+    - embeddings (np.ndarray): Normalized Spacy vectors (read-only, copied on first append).
+    - keys (list): Token sequence of each question.
+    """
+    embeddings = _shared_array((len(questions), model.nlp.vocab.vectors_length), np.float32)
+    context = {"model": model, "questions": questions, "vectorizer": vectorizer, "embeddings": embeddings}
+    results = run_sharded(_index_shard, context, len(questions), n_workers)
+
+    keys = [key for shard_keys, _ in results for key in shard_keys]
+    if isinstance(vectorizer, HashedTfidfVectorizer):
+        counts = vectorizer.merge([shard_counts for _, shard_counts in results])
+        question_vectors = vectorizer.fit_counts(counts).weight(counts)
+    else:
+        question_vectors = vectorizer.fit_transform(questions)
+
+    embeddings.flags.writeable = False
+    logging.info(f"Built the index of {len(questions)} questions with {n_workers} worker processes")
+    return question_vectors, embeddings, keys
+
+
+def preprocess_parallel(text_processor, texts, n_workers):
+    """
+    `TextProcessor.preprocess_many` split across `n_workers` forked processes.
+
+    Parameters:
+    - text_processor (TextProcessor): Preprocessing to apply.
+    - texts (list or StringTable): Texts.
+    - n_workers (int): Worker processes.
+
+    Returns:
+    - processed (list): The processed texts, in input order.
+    """
+    context = {"text_processor": text_processor, "texts": texts}
+    return [text for shard in run_sharded(_preprocess_shard, context, len(texts), n_workers) for text in shard]
@@ -0,0 +1,49 @@
+from functools import cached_property
+
+from spacy.tokens import Doc
+
+
+class QueryAnalysis:
+    """
+    Everything derived from one user query, computed at most once and only when used.
+
+    - `processed`: the `TextProcessor` output (TF-IDF input and response cache key).
+    - `vector_doc`: a Spacy Doc built from the processed tokens, without running the
+      tokenizer again, for the word-vector lookup.
+    - `doc`: the raw query tokenized by Spacy (casing and punctuation kept), the input of NER.
+    - `entities`: named entities of `doc`. The NER component is only run when this
+      is read, e.g. on the low-confidence path of `FAQChatbot`.
+
+    `FAQModel` methods taking queries accept QueryAnalysis objects as well as strings.
+    """
+
+    def __init__(self, text, text_processor, model, processed=None):
+        """
+        Parameters:
+        - text (str): The raw user query.
+        - text_processor (TextProcessor): Preprocessing of the chatbot.
+        - model (FAQModel): Model whose Spacy pipeline analyzes the query.
+        - processed (str, optional): Already preprocessed text (e.g. from `preprocess_many`).
+        """
+        self.text = text
+        self.text_processor = text_processor
+        self.model = model
+        if processed is not None:
+            self.processed = processed
+
+    @cached_property
+    def processed(self):
+        return self.text_processor.preprocess_text(self.text)
+
+    @cached_property
+    def vector_doc(self):
+        # ✅ The processed text is whitespace-joined tokens: no second tokenizer pass
+        return Doc(self.model.nlp.vocab, words=self.processed.split())
+
+    @cached_property
+    def doc(self):
+        return self.model.nlp.make_doc(self.text)
+
+    @cached_property
+    def entities(self):
+        return self.model.extract_entities(self)
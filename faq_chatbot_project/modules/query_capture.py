@@ -0,0 +1,173 @@
+import json
+import logging
+import os
+import queue
+import threading
+
+from modules.metrics import Counter
+
+_STOP = object()  # Queued by `close`: the writer drains the queue and exits
+
+
+class QueryCapture:
+    """
+    Records answered queries to rotating JSON Lines files, for replay and offline analysis.
+
+    `record` only builds a small dict and puts it on a bounded queue; a background thread
+    serializes and writes the entries, so request threads never wait on file I/O. When the
+    queue is full (the disk cannot keep up) entries are dropped and counted instead.
+
+    Each line holds: "ts" (Unix time the query arrived), "query", "faq_id", "confidence",
+    "cached", "latency_ms", "stages" (milliseconds per timed stage of that request),
+    "batch_size" and "index_version".
+
+    Files rotate like `logging.handlers.RotatingFileHandler`: once `path` exceeds
+    `max_bytes` it becomes `path.1`, the previous `path.1` becomes `path.2`, and so on up
+    to `backup_count` files.
+    """
+
+    def __init__(self, path, max_bytes=64 * 1024 * 1024, backup_count=5, queue_size=10000):
+        """
+        Parameters:
+        - path (str): Capture file (JSONL). Its directory is created if needed.
+        - max_bytes (int): Size at which the file is rotated.
+        - backup_count (int): Rotated files kept (older ones are deleted).
+        - queue_size (int): Entries waiting to be written before new ones are dropped.
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.recorded = Counter()
+        self.dropped = Counter()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._local = threading.local()  # ✅ Stage timings of the request running in this thread
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+        self._writer = threading.Thread(target=self._run, name="faq-query-capture", daemon=True)
+        self._writer.start()
+
+    def begin(self):
+        """
+        Starts collecting the stage timings of a request in the calling thread.
+
+        Returns:
+        - stages (dict): Stage name → milliseconds, filled by `observe_stage`.
+        """
+        self._local.stages = stages = {}
+        return stages
+
+    def observe_stage(self, stage, seconds):
+        """
+        Metrics hook (see `Metrics.add_hook`): adds a stage duration to the current request.
+        """
+        stages = getattr(self._local, "stages", None)
+        if stages is not None:
+            stages[stage] = stages.get(stage, 0.0) + seconds * 1000
+
+    def record(self, timestamp, query, response, latency, stages, cached=False, batch_size=1, index_version=None):
+        """
+        Queues one answered query (never blocks).
+
+        Parameters:
+        - timestamp (float): Unix time the query arrived.
+        - query (str): The raw query.
+        - response (dict): The response returned for it.
+        - latency (float): Seconds taken (for a batch: the whole batch).
+        - stages (dict): Milliseconds per stage, from `begin`.
+        - cached (bool): True if answered from the response cache.
+        - batch_size (int): Queries answered together with it.
+        - index_version (int, optional): Index version that answered it.
+        """
+        entry = {
+            "ts": timestamp,
+            "query": query,
+            "faq_id": response.get("faq_id"),
+            "confidence": response.get("confidence"),
+            "cached": cached,
+            "latency_ms": latency * 1000,
+            "stages": stages,
+            "batch_size": batch_size,
+            "index_version": index_version,
+        }
+        try:
+            self._queue.put_nowait(entry)
+            self.recorded.inc()
+        except queue.Full:
+            self.dropped.inc()
+
+    def _run(self):
+        while True:
+            entry = self._queue.get()
+            batch = [entry]
+            while len(batch) < 1024:  # ✅ Write whatever else is already waiting in one go
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = any(entry is _STOP for entry in batch)
+            lines = "".join(json.dumps(entry, ensure_ascii=False) + "\n" for entry in batch if entry is not _STOP)
+            try:
+                self._file.write(lines)
+                self._file.flush()
+                if self._file.tell() >= self.max_bytes:
+                    self._rotate()
+            except OSError as e:
+                logging.error(f"Error writing query capture file {self.path}: {e}")
+            if stop:
+                self._file.close()
+                return
+
+    def _rotate(self):
+        self._file.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                if os.path.exists(f"{self.path}.{i}"):
+                    os.replace(f"{self.path}.{i}", f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def stats(self):
+        """
+        Returns:
+        - stats (dict): Entries recorded, dropped (queue full) and waiting to be written.
+        """
+        return {"recorded": self.recorded.value, "dropped": self.dropped.value, "pending": self._queue.qsize()}
+
+    def close(self, timeout=5.0):
+        """
+        Writes the entries still queued and closes the file.
+        """
+        if not self._writer.is_alive():
+            return
+        self._queue.put(_STOP)
+        self._writer.join(timeout)
+
+
+def read_capture(paths):
+    """
+    Reads captured entries from one or more capture files (e.g. "capture.jsonl.2",
+    "capture.jsonl.1", "capture.jsonl"), sorted by arrival time.
+
+    Parameters:
+    - paths (list): Capture files.
+
+    Returns:
+    - entries (list): Entry dictionaries (see `QueryCapture`). Malformed lines are skipped.
+    """
+    entries = []
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # ✅ E.g. the last line of a file that was being written
+                if isinstance(entry, dict) and "query" in entry and "ts" in entry:
+                    entries.append(entry)
+    entries.sort(key=lambda entry: entry["ts"])
+    return entries
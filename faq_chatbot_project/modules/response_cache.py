@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """
+    Thread-safe LRU cache for chatbot responses, with an optional time-to-live.
+
+    Entries are stamped with a version; a lookup with another version is a miss,
+    so bumping the version invalidates everything in O(1).
+    """
+
+    def __init__(self, maxsize=1024, ttl=None):
+        """
+        Parameters:
+        - maxsize (int): Maximum number of entries (least recently used are evicted first).
+        - ttl (float, optional): Seconds after which an entry expires. None keeps entries
+          until they are evicted or invalidated.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key → (version, expiry time, value)
+        self._lock = threading.Lock()
+
+    def get(self, key, version=None):
+        """
+        Looks up a cached value and marks it as recently used.
+
+        Parameters:
+        - key (hashable): Cache key.
+        - version (hashable, optional): Version the value must have been stored with.
+
+        Returns:
+        - value: The cached value, or None on a miss.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version or (entry[1] is not None and entry[1] < time.monotonic()):
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[2]
+
+    def put(self, key, value, version=None):
+        """
+        Stores a value, evicting the least recently used entry when full.
+
+        Parameters:
+        - key (hashable): Cache key.
+        - value: Value to cache.
+        - version (hashable, optional): Version of the data the value was computed from.
+        """
+        if self.maxsize <= 0:
+            return
+        expiry = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (version, expiry, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Drops all entries (hit/miss counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """
+        Returns:
+        - stats (dict): hits, misses, hit_rate, size and maxsize.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+            }
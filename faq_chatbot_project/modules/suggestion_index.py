@@ -0,0 +1,419 @@
+import bisect
+import heapq
+import logging
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from itertools import islice
+
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"\w+")
+PRECOMPUTED_PREFIX_LENGTH = 3  # ✅ Short prefixes match many terms: their completions are precomputed
+PRECOMPUTED_TOP = 20  # Completions stored per precomputed prefix (larger n falls back to a merge)
+MERGE_MAX_TERMS = 32  # Prefix ranges up to this many terms are merged lazily, larger ones with np.unique
+DENSE_FRACTION = 16  # Terms in at least 1/16 of the FAQs also get a rank bitset
+DENSE_MIN_FAQS = 4096  # No bitsets below this corpus size (posting lists are short anyway)
+FIRST_CHUNK = 64  # Candidates checked in the first vectorized step (each next step is 4x larger)
+
+
+def normalize(text):
+    """
+    Splits text into lowercase word tokens (punctuation dropped, stop words kept:
+    "how do i" must complete to "How do I ...").
+
+    Parameters:
+    - text (str): Question or typed prefix.
+
+    Returns:
+    - tokens (list): Lowercase tokens.
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def _array_chunks(array):
+    """Yields consecutive slices of an array, growing 4x each time."""
+    position, size = 0, FIRST_CHUNK
+    while position < len(array):
+        yield array[position:position + size]
+        position += size
+        size *= 4
+
+
+def _iterator_chunks(iterator):
+    """Yields int64 arrays drawn from an iterator of ranks, growing 4x each time."""
+    size = FIRST_CHUNK
+    while True:
+        chunk = np.fromiter(islice(iterator, size), dtype=np.int64)
+        if not len(chunk):
+            return
+        yield chunk
+        size *= 4
+
+
+def _chunks(candidates):
+    return _array_chunks(candidates) if isinstance(candidates, np.ndarray) else _iterator_chunks(iter(candidates))
+
+
+class _PrefixTable:
+    """
+    Immutable sorted-array prefix index over the question tokens.
+
+    - `terms`: sorted distinct tokens; a prefix matches a contiguous range of them.
+    - `postings` / `offsets`: per term, the popularity ranks of the questions holding it,
+      ascending (most popular first). Terms are laid out in sorted order, so the postings
+      of a whole prefix range are one contiguous slice.
+    - `bitsets` / `dense_rows`: for frequent terms, the same ranks as a bitset, so common
+      words ("how", "do", "i") are intersected with a word-wise AND or a bit test.
+    - `keys`: `faq_id * n_terms + term_id` of every (FAQ, term) pair, sorted, so whether a
+      batch of candidates holds a word with the typed prefix is one `np.searchsorted`.
+    - `order`: FAQ id per rank.
+    """
+
+    def __init__(self, terms, faq_terms, faq_offsets, popularity):
+        self.terms = terms
+        self.faq_terms = faq_terms
+        self.faq_offsets = faq_offsets
+        n_faqs = len(faq_offsets) - 1
+        terms_per_faq = np.diff(faq_offsets)
+        self.n_terms = max(len(terms), 1)
+        self.keys = np.repeat(np.arange(n_faqs, dtype=np.int64), terms_per_faq) * self.n_terms + faq_terms
+
+        # ✅ Rank: most popular first, ties by FAQ id (file order)
+        self.order = np.lexsort((np.arange(n_faqs), -popularity[:n_faqs]))
+        rank = np.empty(n_faqs, dtype=np.int64)
+        rank[self.order] = np.arange(n_faqs)
+        self.ranked = self.order[terms_per_faq[self.order] > 0]  # ✅ Completions for an empty prefix
+
+        entry_ranks = np.repeat(rank, terms_per_faq)
+        sort = np.lexsort((entry_ranks, faq_terms))
+        self.postings = entry_ranks[sort]
+        self.offsets = np.searchsorted(faq_terms[sort], np.arange(len(terms) + 1))
+
+        counts = np.diff(self.offsets)
+        dense = np.flatnonzero(counts >= n_faqs / DENSE_FRACTION) if n_faqs >= DENSE_MIN_FAQS else np.empty(0, int)
+        self.dense_rows = np.full(len(terms), -1, dtype=np.int64)
+        self.dense_rows[dense] = np.arange(len(dense))
+        n_words = (n_faqs + 63) // 64
+        self.bitsets = np.zeros((len(dense), n_words), dtype=np.uint64)
+        for row, term in enumerate(dense):
+            bits = np.zeros(n_words * 64, dtype=bool)
+            bits[self.term_postings(term)] = True
+            self.bitsets[row] = np.packbits(bits, bitorder="little").view(np.uint64)
+
+        self.prefix_tops = self._precompute_prefix_tops()
+
+    @classmethod
+    def build(cls, questions, active, popularity):
+        """
+        Tokenizes the live questions and builds the table.
+
+        Parameters:
+        - questions (iterable): Question text per FAQ id.
+        - active (np.ndarray): Live flag per FAQ id.
+        - popularity (np.ndarray): Popularity per FAQ id (at least as long as `questions`).
+        """
+        term_ids = {}
+        per_faq = []
+        for faq_id, question in enumerate(questions):
+            if faq_id < len(active) and not active[faq_id]:
+                per_faq.append(())
+                continue
+            per_faq.append({term_ids.setdefault(token, len(term_ids)) for token in normalize(question)})
+
+        # ✅ Renumber the terms in sorted order (prefix ranges become contiguous)
+        terms = sorted(term_ids)
+        remap = np.empty(len(terms), dtype=np.int64)
+        for new_id, term in enumerate(terms):
+            remap[term_ids[term]] = new_id
+
+        faq_offsets = np.zeros(len(per_faq) + 1, dtype=np.int64)
+        faq_offsets[1:] = np.cumsum([len(ids) for ids in per_faq])
+        faq_terms = remap[np.fromiter((term for ids in per_faq for term in ids), dtype=np.int64,
+                                      count=int(faq_offsets[-1]))]
+        entry_faqs = np.repeat(np.arange(len(per_faq)), np.diff(faq_offsets))
+        faq_terms = faq_terms[np.lexsort((faq_terms, entry_faqs))]  # ✅ Sorted within each FAQ
+        return cls(terms, faq_terms, faq_offsets, popularity)
+
+    def reranked(self, popularity):
+        """Returns the same table ranked by new popularity counts (no re-tokenization)."""
+        return _PrefixTable(self.terms, self.faq_terms, self.faq_offsets, popularity)
+
+    def _precompute_prefix_tops(self):
+        tops = {}
+        for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+            lo = 0
+            while lo < len(self.terms):
+                if len(self.terms[lo]) < length:
+                    lo += 1
+                    continue
+                prefix = self.terms[lo][:length]
+                hi = self.prefix_range(prefix)[1]
+                if hi - lo > 1:  # ✅ A single term is already one sorted list
+                    tops[prefix] = np.unique(self.postings[self.offsets[lo]:self.offsets[hi]])[:PRECOMPUTED_TOP]
+                lo = hi
+        return tops
+
+    @property
+    def nbytes(self):
+        """Approximate memory of the table (arrays exactly, term strings via `sys.getsizeof`)."""
+        arrays = (self.faq_terms, self.faq_offsets, self.keys, self.order, self.ranked, self.postings,
+                  self.offsets, self.dense_rows, self.bitsets)
+        total = sum(array.nbytes for array in arrays) + sum(top.nbytes for top in self.prefix_tops.values())
+        return total + sys.getsizeof(self.terms) + sum(map(sys.getsizeof, self.terms))
+
+    def prefix_range(self, prefix):
+        """Range [lo, hi) of the terms starting with `prefix`."""
+        lo = bisect.bisect_left(self.terms, prefix)
+        hi = bisect.bisect_left(self.terms, prefix + "\U0010ffff", lo)
+        return lo, hi
+
+    def term_id(self, token):
+        i = bisect.bisect_left(self.terms, token)
+        return i if i < len(self.terms) and self.terms[i] == token else None
+
+    def term_postings(self, term):
+        return self.postings[self.offsets[term]:self.offsets[term + 1]]
+
+    def postings_size(self, lo, hi):
+        """Number of postings of the terms in [lo, hi) (an upper bound of their FAQs)."""
+        return int(self.offsets[hi] - self.offsets[lo])
+
+    def prefix_ranks(self, prefix, lo, hi, n=None):
+        """
+        Ranks of the FAQs holding a term in [lo, hi) (the terms starting with `prefix`),
+        ascending and distinct, as an array or a lazy iterator.
+
+        When `n` is given, a precomputed list holding at least the n best may be
+        returned instead of all of them.
+        """
+        if hi - lo == 1:
+            return self.term_postings(lo)
+        top = self.prefix_tops.get(prefix) if n is not None else None
+        if top is not None and (n <= len(top) or len(top) < PRECOMPUTED_TOP):
+            return top
+        if hi - lo <= MERGE_MAX_TERMS:
+            return self._merge(lo, hi)
+        return np.unique(self.postings[self.offsets[lo]:self.offsets[hi]])
+
+    def _merge(self, lo, hi):
+        last = None
+        for rank in heapq.merge(*(self.term_postings(term) for term in range(lo, hi))):
+            if rank != last:
+                last = rank
+                yield rank
+
+    def bitset_ranks(self, rows):
+        """Yields, in growing chunks, the ranks set in all the given bitset rows."""
+        words = np.bitwise_and.reduce(self.bitsets[rows], axis=0)
+        for chunk in _array_chunks(np.flatnonzero(words)):
+            bits = np.unpackbits(words[chunk].view(np.uint8), bitorder="little").reshape(len(chunk), 64)
+            word_index, bit = np.nonzero(bits)
+            yield chunk[word_index] * 64 + bit
+
+    def in_bitset(self, row, ranks):
+        """Membership mask of `ranks` in the bitset of a dense term."""
+        words = self.bitsets[row][ranks >> 6]
+        return ((words >> (ranks & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+    def has_prefix(self, faq_ids, lo, hi):
+        """
+        Returns:
+        - mask (np.ndarray): Per FAQ id, True if it holds a term in [lo, hi).
+        """
+        base = faq_ids.astype(np.int64) * self.n_terms
+        return np.searchsorted(self.keys, base + lo) < np.searchsorted(self.keys, base + hi)
+
+
+class SuggestionIndex:
+    """
+    Typeahead over the FAQ questions: completes what the user has typed so far to
+    the most popular matching questions.
+
+    Every complete word typed must occur in the question, and the word being typed
+    must start one of its words, in any position ("refu" → "How do I request a refund?").
+    A lookup is a few binary searches over a sorted term array, then a walk over
+    popularity-ordered postings that stops after n hits. Popularity (answers served
+    per FAQ) is folded in by a background re-ranking; new or edited questions by a
+    background rebuild. Removed FAQs are skipped at once.
+    """
+
+    def __init__(self, faqs, popularity=None, refresh_interval=30.0):
+        """
+        Parameters:
+        - faqs (FAQStore): The FAQs (removed FAQs are never suggested).
+        - popularity (dict, optional): Initial popularity per FAQ id, e.g. from logs.
+        - refresh_interval (float): Minimum seconds between two re-rankings by popularity.
+        """
+        self.faqs = faqs
+        self.refresh_interval = refresh_interval
+        self.popularity = np.zeros(len(faqs), dtype=np.int64)
+        for faq_id, count in (popularity or {}).items():
+            if 0 <= faq_id < len(self.popularity):
+                self.popularity[faq_id] = count
+        self._hits = Counter()  # ✅ Answers served since the last refresh
+        self._hits_lock = threading.Lock()
+        self._questions_changed = False
+        self._refresh_lock = threading.Lock()
+        self._last_refresh = time.monotonic()
+
+        self._table = self._build_table()
+
+    def record(self, faq_id):
+        """
+        Counts one answer served for a FAQ (used for the popularity ranking).
+        """
+        with self._hits_lock:
+            self._hits[faq_id] += 1
+
+    @property
+    def nbytes(self):
+        """Approximate memory held by the index."""
+        return self._table.nbytes + self.popularity.nbytes
+
+    def counts(self):
+        """
+        Returns:
+        - counts (dict): Popularity per FAQ id, including hits not yet folded in (nonzero only).
+        """
+        popularity = self.popularity
+        counts = Counter({int(faq_id): int(popularity[faq_id]) for faq_id in np.flatnonzero(popularity)})
+        with self._hits_lock:
+            counts.update(self._hits)
+        return dict(counts)
+
+    def questions_changed(self):
+        """
+        Schedules a rebuild after FAQs were added or edited (removals apply immediately).
+        """
+        self._questions_changed = True
+        self._start_refresh()
+
+    def suggest(self, text, n=5):
+        """
+        Completes a partially typed question.
+
+        Parameters:
+        - text (str): What the user typed so far. A trailing space or punctuation means
+          the last word is complete; otherwise it is matched as a prefix.
+        - n (int): Maximum number of completions.
+
+        Returns:
+        - faq_ids (list): Up to n FAQ ids, most popular first.
+        """
+        if self._hits and time.monotonic() - self._last_refresh >= self.refresh_interval:
+            self._start_refresh()
+        if n < 1:
+            return []
+
+        table = self._table  # ✅ One table version per call (refreshes swap it atomically)
+        tokens = normalize(text)
+        partial = tokens.pop() if tokens and TOKEN_PATTERN.match(text[-1:]) else None  # ✅ Word still being typed
+
+        required = []
+        for token in dict.fromkeys(tokens):
+            term = table.term_id(token)
+            if term is None:
+                return []
+            required.append(term)
+
+        prefix_range = table.prefix_range(partial) if partial is not None else None
+        if prefix_range is not None and prefix_range[0] == prefix_range[1]:
+            return []
+
+        if not required and prefix_range is None:
+            return self._collect(table, _array_chunks(table.ranked), n, by_rank=False)
+        if not required:
+            candidates = table.prefix_ranks(partial, *prefix_range, n)
+            results = self._collect(table, _chunks(candidates), n)
+            if len(results) < n and candidates is table.prefix_tops.get(partial):
+                # ✅ The precomputed list ran short once removed FAQs were skipped
+                results = self._collect(table, _chunks(table.prefix_ranks(partial, *prefix_range)), n)
+            return results
+
+        # ✅ Walk the most selective list in rank order and test the other words against
+        #    it: bit tests for frequent words, binary searches for rare ones
+        required.sort(key=lambda term: table.postings_size(term, term + 1))
+        dense = [table.dense_rows[term] for term in required if table.dense_rows[term] >= 0]
+        sparse = [term for term in required if table.dense_rows[term] < 0]
+
+        if prefix_range is not None and table.postings_size(*prefix_range) < table.postings_size(required[0], required[0] + 1):
+            chunks = _chunks(table.prefix_ranks(partial, *prefix_range))
+            prefix_range = None
+        elif sparse:
+            chunks = _array_chunks(table.term_postings(sparse.pop(0)))
+        else:
+            chunks = table.bitset_ranks(dense)
+            dense = []
+        postings_lists = [table.term_postings(term) for term in sparse]
+        return self._collect(table, chunks, n, dense, postings_lists, prefix_range)
+
+    def _collect(self, table, chunks, n, dense_rows=(), postings_lists=(), prefix_range=None, by_rank=True):
+        """
+        Returns the first n live FAQs among the candidate chunks (ranks ascending, or FAQ
+        ids if not `by_rank`) that are set in all `dense_rows` bitsets, occur in all
+        `postings_lists` and hold a term in `prefix_range`.
+        """
+        active = self.faqs.active.view()
+        results = []
+        for chunk in chunks:
+            for row in dense_rows:
+                chunk = chunk[table.in_bitset(row, chunk)]
+            for postings in postings_lists:
+                positions = np.minimum(np.searchsorted(postings, chunk), len(postings) - 1)
+                chunk = chunk[postings[positions] == chunk]
+            faq_ids = table.order[chunk] if by_rank else chunk
+            keep = active[faq_ids]
+            if prefix_range is not None:
+                keep &= table.has_prefix(faq_ids, *prefix_range)
+            results.extend(faq_ids[keep][:n - len(results)].tolist())
+            if len(results) == n:
+                break
+        return results
+
+    def _build_table(self):
+        """
+        Tokenizes the FAQs published so far and ranks them by popularity. The FAQ count
+        is read once, and sizes the popularity array: FAQs added meanwhile wait for the
+        next rebuild.
+        """
+        active = self.faqs.active.view()  # ✅ FAQStore.add appends the question first
+        n_faqs = len(active)
+        if n_faqs > len(self.popularity):
+            self._add_hits({}, n_faqs)
+        return _PrefixTable.build(islice(self.faqs.questions, n_faqs), active, self.popularity)
+
+    def _add_hits(self, hits, n_faqs):
+        """Folds hit counts into `popularity`, grown to at least `n_faqs` entries (new array)."""
+        popularity = np.zeros(max(n_faqs, len(self.popularity)), dtype=np.int64)
+        popularity[:len(self.popularity)] = self.popularity
+        for faq_id, count in hits.items():
+            if 0 <= faq_id < len(popularity):
+                popularity[faq_id] += count
+        self.popularity = popularity  # ✅ Swapped whole: `counts` never sees a partial update
+
+    def _start_refresh(self):
+        if not self._refresh_lock.locked():
+            threading.Thread(target=self.refresh, name="faq-suggestion-refresh", daemon=True).start()
+
+    def refresh(self):
+        """
+        Folds the recorded hits into the popularity ranking and, if questions changed,
+        re-tokenizes them. The new table is swapped in atomically.
+        """
+        with self._refresh_lock:
+            with self._hits_lock:  # ✅ Hits move into `popularity` in one step for `counts`
+                hits, self._hits = self._hits, Counter()
+                self._add_hits(hits, len(self.popularity))
+            rebuild, self._questions_changed = self._questions_changed, False
+
+            start = time.perf_counter()
+            if rebuild:
+                self._table = self._build_table()
+            else:
+                self._table = self._table.reranked(self.popularity)
+            self._last_refresh = time.monotonic()
+            logging.info(f"Refreshed typeahead index ({'rebuild' if rebuild else 'rerank'}) "
+                         f"in {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from modules.chatbot import FAQChatbot
+from modules.exception import FAQException
+from modules.text_processor import TextProcessor
+
+
+class UnknownTenant(FAQException):
+    """
+    Raised when a tenant id has not been registered.
+    """
+
+
+class TenantRegistry:
+    """
+    Serves many FAQ corpora (tenants, e.g. storefronts) from one process.
+
+    Each tenant is a `FAQChatbot` with its own FAQ file, TF-IDF index, embedding matrix,
+    threshold and cache. All of them share the process-wide Spacy pipeline and word
+    vectors (`nlp_loader.load_nlp`) and one `TextProcessor` per preprocessing setup, so a
+    tenant only costs its own index. Tenants are loaded on first use and, when the estimated memory of the
+    loaded tenants exceeds the budget, the least recently used ones are unloaded (and
+    loaded again on their next query).
+    """
+
+    def __init__(self, memory_budget=None, text_processor=None, **chatbot_defaults):
+        """
+        Parameters:
+        - memory_budget (int, optional): Bytes the loaded tenants may use together, as
+          estimated by `FAQChatbot.memory_usage` (no limit by default). The tenant being
+          used is never unloaded, even if it alone exceeds the budget.
+        - text_processor (TextProcessor, optional): Shared by all tenants. By default one is
+          created on first use per (fast_preprocessing, download_nltk_data) pair of the tenants.
+        - chatbot_defaults: `FAQChatbot` arguments applied to every tenant, e.g. fast_preprocessing.
+        """
+        self.memory_budget = memory_budget
+        self.chatbot_defaults = chatbot_defaults
+        self._text_processor = text_processor
+        self._text_processors = {}  # ✅ (fast_preprocessing, download_nltk_data) → shared TextProcessor
+        self._text_processor_lock = threading.Lock()
+        self._configs = {}
+        self._load_locks = {}  # ✅ One lock per tenant: concurrent first queries load it once
+        self._loaded = OrderedDict()  # ✅ Tenant id → FAQChatbot, least recently used first
+        self._memory = {}  # ✅ Tenant id → estimated bytes (measured when loaded)
+        self._lock = threading.Lock()
+        self.loads = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_config(cls, path, **chatbot_defaults):
+        """
+        Builds a registry from a JSON file:
+
+            {"memory_budget_mb": 4096,
+             "tenants": {"shop-a": {"faq_file": "data/a.json", "confidence_threshold": 0.5}, ...}}
+
+        Relative FAQ file, snapshot and vector table paths are resolved against the config file's directory.
+
+        Parameters:
+        - path (str): Config file.
+        - chatbot_defaults: `FAQChatbot` arguments applied to every tenant.
+
+        Returns:
+        - registry (TenantRegistry): The registry (no tenant loaded yet).
+        """
+        try:
+            with open(path, "r", encoding="utf-8") as file:
+                config = json.load(file)
+        except (OSError, ValueError) as e:
+            raise FAQException(f"Failed to read tenant config: {path}", cause=e)
+
+        budget_mb = config.get("memory_budget_mb")
+        registry = cls(memory_budget=int(budget_mb * 1024 * 1024) if budget_mb else None, **chatbot_defaults)
+        base = os.path.dirname(os.path.abspath(path))
+        for tenant_id, settings in config.get("tenants", {}).items():
+            settings = dict(settings)
+            for key in ("faq_file", "snapshot_dir", "vector_table"):
+                if settings.get(key):
+                    settings[key] = os.path.join(base, settings[key])
+            registry.register(tenant_id, **settings)
+        return registry
+
+    def register(self, tenant_id, faq_file, **chatbot_kwargs):
+        """
+        Registers a tenant (it is loaded on its first query).
+
+        Parameters:
+        - tenant_id (str): Tenant id.
+        - faq_file (str): The tenant's FAQ file.
+        - chatbot_kwargs: `FAQChatbot` arguments for this tenant (override the defaults),
+          e.g. confidence_threshold or snapshot_dir.
+        """
+        with self._lock:
+            self._configs[tenant_id] = dict(self.chatbot_defaults, faq_file=faq_file, **chatbot_kwargs)
+            self._load_locks.setdefault(tenant_id, threading.Lock())
+        logging.info(f"Registered tenant '{tenant_id}' ({faq_file})")
+
+    @property
+    def tenants(self):
+        """Registered tenant ids."""
+        return list(self._configs)
+
+    def __contains__(self, tenant_id):
+        return tenant_id in self._configs
+
+    def get(self, tenant_id):
+        """
+        Returns the chatbot of a tenant, loading it first if needed.
+
+        Parameters:
+        - tenant_id (str): Tenant id.
+
+        Returns:
+        - chatbot (FAQChatbot): The tenant's chatbot.
+        """
+        with self._lock:
+            chatbot = self._loaded.get(tenant_id)
+            if chatbot is not None:
+                self._loaded.move_to_end(tenant_id)
+                return chatbot
+            if tenant_id not in self._configs:
+                raise UnknownTenant(f"Unknown tenant: {tenant_id}")
+            load_lock = self._load_locks[tenant_id]
+
+        with load_lock:
+            with self._lock:
+                chatbot = self._loaded.get(tenant_id)  # ✅ Loaded by a concurrent query meanwhile
+                if chatbot is not None:
+                    self._loaded.move_to_end(tenant_id)
+                    return chatbot
+                config = self._configs[tenant_id]
+            return self._load(tenant_id, config)
+
+    def _load(self, tenant_id, config):
+        start = time.perf_counter()
+        chatbot = FAQChatbot(text_processor=self._text_processor_for(config), **config)
+        memory = chatbot.memory_usage()["total"]
+
+        with self._lock:
+            self._loaded[tenant_id] = chatbot
+            self._memory[tenant_id] = memory
+            self.loads += 1
+            evicted = self._evict_over_budget()
+
+        for evicted_id, evicted_chatbot in evicted:
+            evicted_chatbot.stop_watching()  # ✅ Queries still holding it finish normally
+            logging.info(f"Unloaded tenant '{evicted_id}' (memory budget)")
+        logging.info(f"Loaded tenant '{tenant_id}' in {time.perf_counter() - start:.2f} s "
+                     f"({memory / 1024 / 1024:.1f} MB)")
+        return chatbot
+
+    def _text_processor_for(self, config):
+        """
+        Returns the `TextProcessor` of a tenant: the one given to the registry, else the one
+        shared by the tenants with the same fast_preprocessing / download_nltk_data settings.
+        """
+        if self._text_processor is not None:
+            return self._text_processor
+        key = (bool(config.get("fast_preprocessing", False)), bool(config.get("download_nltk_data", False)))
+        with self._text_processor_lock:
+            if key not in self._text_processors:
+                self._text_processors[key] = TextProcessor(fast=key[0], download_missing=key[1])
+            return self._text_processors[key]
+
+    def _evict_over_budget(self):
+        """
+        Unloads least recently used tenants until the loaded ones fit the budget
+        (the most recently used one always stays). Call with `_lock` held.
+        """
+        evicted = []
+        if self.memory_budget is None:
+            return evicted
+        while len(self._loaded) > 1 and sum(self._memory.values()) > self.memory_budget:
+            tenant_id, chatbot = self._loaded.popitem(last=False)
+            del self._memory[tenant_id]
+            self.evictions += 1
+            evicted.append((tenant_id, chatbot))
+        return evicted
+
+    def unload(self, tenant_id):
+        """
+        Unloads a tenant (it stays registered and is loaded again on its next query).
+        """
+        with self._lock:
+            chatbot = self._loaded.pop(tenant_id, None)
+            self._memory.pop(tenant_id, None)
+        if chatbot is not None:
+            chatbot.stop_watching()
+
+    def generate_response(self, tenant_id, query):
+        """
+        Answers a query from a tenant's FAQs (see `FAQChatbot.generate_response`).
+        """
+        return self.get(tenant_id).generate_response(query)
+
+    def generate_responses(self, tenant_id, queries):
+        """
+        Answers a batch of queries from a tenant's FAQs (see `FAQChatbot.generate_responses`).
+        """
+        return self.get(tenant_id).generate_responses(queries)
+
+    def stats(self):
+        """
+        Returns:
+        - stats (dict): Registered and loaded tenants (most recently used last) with their
+          estimated memory, the budget, and load / eviction counts.
+        """
+        with self._lock:
+            loaded = {tenant_id: self._memory[tenant_id] for tenant_id in self._loaded}
+        return {
+            "registered": len(self._configs),
+            "loaded": loaded,
+            "memory_bytes": sum(loaded.values()),
+            "memory_budget_bytes": self.memory_budget,
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
@@ -1,12 +1,80 @@
+import functools
+import logging
+import re
 import nltk
 from nltk.tokenize import word_tokenize
 from nltk.corpus import stopwords
 from nltk.stem import WordNetLemmatizer
 
-# Ensure necessary NLP resources are downloaded
-nltk.download('punkt')  # For tokenizing words
-nltk.download('stopwords')  # For filtering common stopwords
-nltk.download('wordnet')  # For lemmatization
+# NLTK resources needed by TextProcessor: {download id: data path}
+# (NLTK >= 3.8.2 tokenizes with the pickle-free "punkt_tab" data)
+PUNKT = 'punkt_tab' if hasattr(nltk.tokenize.punkt, 'PunktTokenizer') else 'punkt'
+NLTK_RESOURCES = {
+    PUNKT: f'tokenizers/{PUNKT}',  # For tokenizing words
+    'stopwords': 'corpora/stopwords',  # For filtering common stopwords
+    'wordnet': 'corpora/wordnet',  # For lemmatization
+}
+
+
+def ensure_nltk_resources(download=False):
+    """
+    Checks that the NLTK resources are installed locally, without any network access.
+
+    Parameters:
+    download (bool): Download missing resources instead of failing
+                     (needs network access, e.g. on a first local setup).
+
+    Raises:
+    LookupError: If resources are missing and `download` is False.
+    """
+    missing = []
+    for resource, path in NLTK_RESOURCES.items():
+        try:
+            nltk.data.find(path)
+        except LookupError:
+            missing.append(resource)
+
+    if missing and download:
+        logging.info(f"Downloading NLTK resources: {', '.join(missing)}")
+        missing = [resource for resource in missing if not nltk.download(resource, quiet=True)]
+
+    if missing:
+        raise LookupError(
+            f"Missing NLTK resources: {', '.join(missing)}. "
+            f"Install them with: python -m nltk.downloader {' '.join(missing)}"
+        )
+
+
+# Fast-path tokenizer: a few precompiled regexes reproducing what survives of
+# word_tokenize's output after the isalnum filter on ordinary English text
+FAST_CONTRACTIONS = re.compile(r"\b(can)(not)\b|\b(gim)(me)\b|\b(gon)(na)\b|\b(got)(ta)\b|\b(lem)(me)\b|\b(wan)(na)(?=\s)")
+FAST_NOT = re.compile(r"(\w)n't\b")  # "don't" → "do", "can't" → "ca" ("n't" is dropped as punctuation)
+FAST_CLITIC = re.compile(r"(\w)'(?:s|m|d|re|ve|ll)\b")  # "what's" → "what" ("'s" is dropped as punctuation)
+# Currency symbols (Unicode category Sc) other than "$": word_tokenize splits off "$" but keeps
+# the others attached ("£5", "5€", "€10,000" are single tokens), which the isalnum filter then drops
+FAST_CURRENCY = "¢£¤¥֏؋߾߿৲৳৻૱௹฿៛₠₡₢₣₤₥₦₧₨₩₪₫€₭₮₯₰₱₲₳₴₵₶₷₸₹₺₻₼₽₾₿⃀꠸﷼﹩＄￠￡￥￦𑿝𑿞𑿟𑿠𞋿𞲰"
+FAST_WORD = rf"(?:\w|[{FAST_CURRENCY}])+"
+FAST_TOKEN = re.compile(rf"{FAST_WORD}(?:(?:[-./']|[:,](?=\d)){FAST_WORD})*")  # "e-mail", "1,000", "a.com", "y'all" stay one token
+
+
+def _split_contraction(match):
+    return ' '.join(part for part in match.groups() if part)
+
+
+def fast_tokens(text):
+    """
+    Tokenizes text the fast way: the lowercased tokens that word_tokenize followed by the
+    isalnum filter would keep, before stopword removal and lemmatization. Needs no NLTK data.
+
+    Parameters:
+    text (str): The input sentence or phrase.
+
+    Returns:
+    list: The alphanumeric tokens, in order.
+    """
+    text = FAST_NOT.sub(r"\1", FAST_CONTRACTIONS.sub(_split_contraction, text.lower()))
+    return [word for word in FAST_TOKEN.findall(FAST_CLITIC.sub(r"\1", text)) if word.isalnum()]
+
 
 class TextProcessor:
     """
@@ -16,16 +84,42 @@ class TextProcessor:
     - Lemmatization: Converting words to their root form (e.g., 'running' → 'run')
     """
 
-    def __init__(self):
+    def __init__(self, download_missing=False, fast=False, lemma_cache_size=100000):
         """
         Initializes the TextProcessor by loading stopwords and setting up a lemmatizer.
+
+        Parameters:
+        download_missing (bool): Download missing NLTK resources instead of raising LookupError.
+        fast (bool): Use the high-throughput path: a precompiled regex tokenizer instead of
+                     NLTK's word_tokenize, and memoized lemmas. Its output matches the default
+                     path on the shipped FAQ data and on ordinary text, currency amounts such
+                     as "£5" or "5€" included (checked by tests/test_text_processor.py).
+                     Known differences, where word_tokenize keeps a token that is then
+                     dropped as non-alphanumeric but the fast path splits it:
+                     - abbreviations with inner periods, e.g. "Mr." or "U.S."
+                     - symbols other than currency glued to a word, e.g. "a+b", "5°", "x=y"
+                     - a hyphen followed by "$", e.g. "$5-$10" keeps "5"
+        lemma_cache_size (int): Maximum number of token → lemma entries kept by the fast path.
         """
+        self.fast = fast
+        ensure_nltk_resources(download=download_missing)
+
         try:
             self.stop_words = set(stopwords.words('english'))  # Load English stopwords
             self.lemmatizer = WordNetLemmatizer()  # Initialize lemmatizer
+            self.lemmatizer.lemmatize('warmup')  # Load WordNet now instead of on the first query
+            self._lemmatize = functools.lru_cache(maxsize=lemma_cache_size)(self.lemmatizer.lemmatize)
         except Exception as e:
             print(f"Error initializing TextProcessor: {e}")  # Handle potential errors
 
+    @property
+    def mode(self):
+        """
+        Preprocessing mode, "fast" or "nltk": the two modes may tokenize some texts
+        differently, so preprocessed questions are only reused within one mode.
+        """
+        return "fast" if self.fast else "nltk"
+
     def preprocess_text(self, text):
         """
         Preprocesses the input text by:
@@ -40,6 +134,9 @@ class TextProcessor:
         Returns:
         str: The cleaned and processed text as a single string.
         """
+        if self.fast:
+            return self._preprocess_fast(text)
+
         # Convert text to lowercase and tokenize it into words
         tokens = word_tokenize(text.lower())
 
@@ -52,6 +149,36 @@ class TextProcessor:
         # Join the processed tokens back into a single string
         return ' '.join(tokens)
 
+    def preprocess_many(self, texts):
+        """
+        Preprocesses many texts (same output as calling `preprocess_text` on each).
+
+        Parameters:
+        texts (iterable): Input sentences or phrases.
+
+        Returns:
+        list: The processed texts, in input order.
+        """
+        if not self.fast:
+            return [self.preprocess_text(text) for text in texts]
+
+        # Bind everything used in the loop to locals once for the whole batch
+        stop_words, lemmatize = self.stop_words, self._lemmatize
+        contractions, nots, clitics = FAST_CONTRACTIONS.sub, FAST_NOT.sub, FAST_CLITIC.sub
+        find_tokens = FAST_TOKEN.findall
+        results = []
+        for text in texts:
+            text = clitics(r"\1", nots(r"\1", contractions(_split_contraction, text.lower())))
+            results.append(' '.join([lemmatize(word) for word in find_tokens(text)
+                                     if word.isalnum() and word not in stop_words]))
+        return results
+
+    def _preprocess_fast(self, text):
+        """
+        Fast path of `preprocess_text`: regex tokenization and memoized lemmatization.
+        """
+        return ' '.join([self._lemmatize(word) for word in fast_tokens(text) if word not in self.stop_words])
+
 # Test the module by processing sample sentences
 if __name__ == "__main__":
     text_processor = TextProcessor()
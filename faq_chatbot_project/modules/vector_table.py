@@ -0,0 +1,140 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+import spacy
+from spacy.attrs import NORM
+from spacy.vectors import Vectors
+
+from modules.data_loader import iter_faq_data
+from modules.nlp_loader import DEFAULT_SPACY_MODEL, load_nlp
+
+VECTORS_FILE = "vectors.npy"
+VOCAB_FILE = "vocab.json"
+
+_tables = {}
+_lock = threading.Lock()
+
+
+def build_vector_table(texts, out_dir, model_name=DEFAULT_SPACY_MODEL, top_n=50000):
+    """
+    Extracts the word vectors a FAQ set needs from an installed Spacy model.
+
+    The table holds the vectors of every word of `texts` (as written and lowercased)
+    plus the `top_n` most frequent words of the model (the first rows of its table: the
+    en_core_web vectors are stored most frequent first). It is written as `vectors.npy`
+    (float32, one row per word) and `vocab.json` (the words, in row order).
+
+    Parameters:
+    - texts (iterable): FAQ questions (and any other domain text).
+    - out_dir (str): Directory of the table (created if needed).
+    - model_name (str): Name or path of the installed Spacy model.
+    - top_n (int): Most frequent words of the model added besides the FAQ vocabulary.
+
+    Returns:
+    - stats (dict): "words" in the table, "faq_words" found in the texts, "faq_coverage"
+      (share of them with a vector), "source_words" of the model and "nbytes" of the vectors.
+    """
+    nlp = load_nlp(model_name)
+    vectors = nlp.vocab.vectors
+    use_norm = vectors.attr == NORM
+
+    # ✅ Vector key → row of the source table
+    rows = {}
+    for key, row in vectors.key2row.items():
+        if row < top_n:
+            rows[key] = row
+
+    faq_words = set()
+    for doc in nlp.tokenizer.pipe(text for original in texts for text in (original, original.lower())):
+        for token in doc:
+            key = token.norm if use_norm else token.orth
+            faq_words.add(key)
+            row = vectors.key2row.get(key)
+            if row is not None:
+                rows[key] = row
+
+    keys = [key for key in sorted(rows, key=lambda key: (rows[key], key)) if key in nlp.vocab.strings]
+    words = [nlp.vocab.strings[key] for key in keys]
+    data = np.ascontiguousarray(vectors.data[[rows[key] for key in keys]], dtype=np.float32) \
+        if keys else np.zeros((0, vectors.shape[1]), dtype=np.float32)
+
+    meta = nlp.meta
+    vocab = {
+        "lang": meta.get("lang", "en"),
+        "source_name": meta.get("name", ""),
+        "source_version": meta.get("version", ""),
+        "attr": "NORM" if use_norm else "ORTH",
+        "top_n": top_n,
+        "id": hashlib.sha256(data.tobytes() + "\n".join(words).encode("utf-8")).hexdigest()[:16],
+        "words": words,
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, VECTORS_FILE), data)
+    with open(os.path.join(out_dir, VOCAB_FILE), "w", encoding="utf-8") as file:
+        json.dump(vocab, file)
+
+    covered = sum(1 for key in faq_words if key in vectors.key2row)
+    logging.info(f"Wrote vector table {out_dir}: {len(words)} words, {data.nbytes / 2**20:.1f} MiB")
+    return {
+        "words": len(words),
+        "faq_words": len(faq_words),
+        "faq_coverage": covered / len(faq_words) if faq_words else 1.0,
+        "source_words": len(vectors.key2row),
+        "nbytes": data.nbytes,
+    }
+
+
+def load_vector_table(path):
+    """
+    Loads a table written by `build_vector_table` as a blank Spacy pipeline, once per process.
+
+    The pipeline has the model's tokenizer rules and the table as its word vectors, which
+    stay memory-mapped. `Doc.vector` is then the mean of the table vectors of the tokens,
+    as with the full model for every word in the table, without loading the model.
+
+    Parameters:
+    - path (str): Directory of the table.
+
+    Returns:
+    - nlp (spacy.Language): Shared pipeline (tokenizer + table vectors). Its meta name
+      identifies the table, so index snapshots built with other vectors are not reused.
+    """
+    path = os.path.abspath(path)
+    with _lock:
+        if path not in _tables:
+            logging.info(f"Loading vector table {path}...")
+            with open(os.path.join(path, VOCAB_FILE), "r", encoding="utf-8") as file:
+                vocab = json.load(file)
+            data = np.load(os.path.join(path, VECTORS_FILE), mmap_mode="r")
+
+            nlp = spacy.blank(vocab["lang"])
+            keys = [nlp.vocab.strings.add(word) for word in vocab["words"]]
+            nlp.vocab.vectors = Vectors(strings=nlp.vocab.strings, data=data, keys=keys, attr=vocab["attr"])
+            nlp.meta["name"] = f"{vocab['source_name']}-table-{vocab['id']}"
+            nlp.meta["version"] = vocab["source_version"]
+            _tables[path] = nlp
+        return _tables[path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Builds a compact word-vector table for a FAQ set")
+    parser.add_argument("--faq-file", default="data/faq_data.json", help="FAQ file whose vocabulary is kept")
+    parser.add_argument("--out", required=True, help="Output directory (vectors.npy + vocab.json)")
+    parser.add_argument("--model", default=DEFAULT_SPACY_MODEL, help="Installed Spacy model to extract from")
+    parser.add_argument("--top-n", type=int, default=50000, help="Most frequent words of the model to keep")
+    args = parser.parse_args()
+
+    stats = build_vector_table((entry["question"] for entry in iter_faq_data(args.faq_file)), args.out,
+                               model_name=args.model, top_n=args.top_n)
+    print(f"{stats['words']} words ({stats['nbytes'] / 2**20:.1f} MiB, model: {stats['source_words']} words), "
+          f"FAQ vocabulary coverage {stats['faq_coverage']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,198 @@
+import gc
+import logging
+import mmap
+import multiprocessing
+import os
+import signal
+
+import numpy as np
+
+# /proc/<pid>/smaps_rollup fields reported by `process_memory` (values are in kB there)
+SMAPS_FIELDS = {"Rss": "rss", "Pss": "pss", "Private_Clean": "private_clean", "Private_Dirty": "private_dirty"}
+
+
+def process_memory(pid=None):
+    """
+    Reads the memory use of a process from /proc/<pid>/smaps_rollup (Linux).
+
+    Parameters:
+    - pid (int, optional): Process id (default: the current process).
+
+    Returns:
+    - memory (dict): rss, pss and uss in bytes. uss (unique set size) counts only the
+      pages no other process shares, i.e. what the process really adds. None if
+      smaps_rollup is not available.
+    """
+    path = f"/proc/{pid or os.getpid()}/smaps_rollup"
+    try:
+        with open(path, "r") as file:
+            lines = file.readlines()
+    except OSError:
+        return None
+
+    values = {}
+    for line in lines:
+        name, _, rest = line.partition(":")
+        if name in SMAPS_FIELDS:
+            values[SMAPS_FIELDS[name]] = int(rest.split()[0]) * 1024
+    return {
+        "rss": values.get("rss", 0),
+        "pss": values.get("pss", 0),
+        "uss": values.get("private_clean", 0) + values.get("private_dirty", 0),
+    }
+
+
+def _to_shared_memory(array):
+    """
+    Copies an array into an anonymous shared mapping and returns a read-only view of it.
+
+    The mapping is inherited by forked processes and freed with the last array using it.
+    """
+    array = np.ascontiguousarray(array)
+    buffer = mmap.mmap(-1, max(array.nbytes, 1), flags=mmap.MAP_SHARED)
+    shared = np.frombuffer(buffer, dtype=array.dtype, count=array.size).reshape(array.shape)
+    shared[...] = array
+    shared.flags.writeable = False  # ✅ Writers get a private copy (GrowableArray / Spacy never write in place)
+    return shared
+
+
+def share_model_memory(chatbot):
+    """
+    Moves the large read-only arrays of a chatbot into shared memory.
+
+    Covers the Spacy word-vector table, the question embeddings, the TF-IDF
+    matrix buffers and the FAQ store. Processes forked afterwards map the same physical pages, and a
+    stray write can only copy a page, never corrupt the shared data.
+
+    Parameters:
+    - chatbot (FAQChatbot): Initialized chatbot (not yet serving requests).
+
+    Returns:
+    - shared_bytes (int): Bytes moved to shared memory.
+    """
+    shared_bytes = 0
+    vectors = chatbot.model.nlp.vocab.vectors
+    if vectors.data.size:
+        vectors.data = _to_shared_memory(vectors.data)
+        shared_bytes += vectors.data.nbytes
+
+    index, faqs = chatbot.model.index, chatbot.faqs
+    buffers = ((index.active, index.ids, index.rows_by_id, faqs.active)
+               + index.embeddings.buffers() + index.tfidf.buffers() + index.questions.buffers()
+               + faqs.questions.buffers() + faqs.answers.buffers())
+    shared = {}  # ✅ The index and the store share their question table: move it once
+    for buffer in buffers:
+        rows = buffer.view()
+        key = (rows.__array_interface__["data"][0], rows.nbytes, rows.dtype.str)
+        if key not in shared:
+            shared[key] = _to_shared_memory(rows)
+            shared_bytes += rows.nbytes
+        buffer.rebind(shared[key])
+
+    logging.info(f"Moved {shared_bytes / 2**20:.1f} MiB of model arrays to shared memory")
+    return shared_bytes
+
+
+def _worker_main(target, chatbot, worker_id, args):
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # ✅ The parent handles Ctrl+C and stops the workers
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    logging.info(f"Worker {worker_id} started (pid {os.getpid()}).")
+    target(chatbot, worker_id, *args)
+
+
+class PreforkPool:
+    """
+    Runs N worker processes forked from one process holding an initialized chatbot.
+
+    The parent loads the chatbot once, moves its large arrays to shared memory and
+    freezes its Python heap (`gc.freeze`), so garbage collection in the workers does
+    not touch, and thereby copy, the pages of the objects built during startup. Each
+    worker then adds only its own per-request memory on top of roughly one model copy.
+    """
+
+    def __init__(self, chatbot, n_workers=None, share_memory=True):
+        """
+        Parameters:
+        - chatbot (FAQChatbot): Initialized chatbot shared by all workers.
+        - n_workers (int, optional): Number of worker processes (default: CPU count).
+        - share_memory (bool): Move the model arrays to shared memory before forking
+          (otherwise they are only shared copy-on-write).
+        """
+        self.chatbot = chatbot
+        self.n_workers = n_workers or os.cpu_count() or 1
+        self.share_memory = share_memory
+        self.workers = []
+        self.shared_bytes = 0
+
+    def start(self, target, *args):
+        """
+        Forks the workers.
+
+        Parameters:
+        - target (callable): Worker body, called as `target(chatbot, worker_id, *args)`.
+        - *args: Extra arguments for `target` (inherited, so sockets work too).
+        """
+        if self.share_memory and not self.shared_bytes:
+            self.shared_bytes = share_model_memory(self.chatbot)
+
+        # ✅ Move everything allocated so far out of the collector's reach before forking
+        gc.collect()
+        gc.freeze()
+
+        context = multiprocessing.get_context("fork")
+        for worker_id in range(self.n_workers):
+            process = context.Process(target=_worker_main, args=(target, self.chatbot, worker_id, args),
+                                      name=f"faq-worker-{worker_id}", daemon=True)
+            process.start()
+            self.workers.append(process)
+        logging.info(f"Started {self.n_workers} workers: {[p.pid for p in self.workers]}")
+
+    def memory_report(self):
+        """
+        Returns:
+        - report (dict): `process_memory` of the parent and of each live worker (by pid),
+          plus the shared memory size in bytes.
+        """
+        return {
+            "parent": process_memory(os.getpid()),
+            "workers": {p.pid: process_memory(p.pid) for p in self.workers if p.is_alive()},
+            "shared_bytes": self.shared_bytes,
+        }
+
+    def join(self):
+        """Waits until all workers have exited."""
+        for process in self.workers:
+            process.join()
+
+    def stop(self, timeout=10):
+        """
+        Terminates the workers.
+
+        Parameters:
+        - timeout (float): Seconds to wait for each worker before killing it.
+        """
+        for process in self.workers:
+            if process.is_alive():
+                process.terminate()
+        for process in self.workers:
+            process.join(timeout)
+            if process.is_alive():
+                process.kill()
+                process.join()
+        self.workers = []
+        gc.unfreeze()
+
+
+def format_memory_report(report):
+    """
+    Formats a `PreforkPool.memory_report` as a table (MiB).
+    """
+    def row(name, memory):
+        if memory is None:
+            return f"  {name:<16}{'n/a':>10}"
+        return f"  {name:<16}" + "".join(f"{memory[key] / 2**20:>10.1f}" for key in ("rss", "pss", "uss"))
+
+    lines = [f"  {'process':<16}{'RSS':>10}{'PSS':>10}{'USS':>10}  (MiB)", row("parent", report["parent"])]
+    lines += [row(f"worker {pid}", memory) for pid, memory in report["workers"].items()]
+    lines.append(f"  shared memory: {report['shared_bytes'] / 2**20:.1f} MiB")
+    return "\n".join(lines)
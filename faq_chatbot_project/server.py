@@ -0,0 +1,284 @@
+# Serves the chatbot over HTTP (FastAPI + uvicorn) with request micro-batching
+import argparse
+import logging
+import socket
+import time
+from contextlib import asynccontextmanager
+
+import uvicorn
+from fastapi import FastAPI, HTTPException
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from modules.chatbot import FAQChatbot
+from modules.embedding_matrix import EMBEDDING_DTYPES
+from modules.loggerfile import setup_logging
+from modules.metrics import Metrics
+from modules.micro_batcher import BatcherOverloaded, MicroBatcher
+from modules.query_capture import QueryCapture
+from modules.tenant_registry import TenantRegistry, UnknownTenant
+from modules.worker_pool import PreforkPool, format_memory_report, process_memory
+
+
+class Question(BaseModel):
+    question: str
+
+
+def create_app(chatbot, max_batch_size=64, max_wait_ms=5.0, max_queue_depth=1024):
+    """
+    Builds the FastAPI app around a chatbot.
+
+    Concurrent /ask requests are grouped by a MicroBatcher and answered with one
+    `FAQChatbot.generate_responses` call per batch.
+
+    Parameters:
+    - chatbot (FAQChatbot): The initialized chatbot.
+    - max_batch_size (int): Maximum queries scored together.
+    - max_wait_ms (float): Longest time a request waits for its batch to fill.
+    - max_queue_depth (int): Waiting requests allowed before new ones get HTTP 503.
+
+    Returns:
+    - app (FastAPI): The application.
+    """
+    batcher = MicroBatcher(chatbot.generate_responses, max_batch_size=max_batch_size,
+                           max_wait_ms=max_wait_ms, max_queue_depth=max_queue_depth)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        await batcher.start()
+        logging.info("Micro-batcher started.")
+        yield
+        await batcher.stop()
+        logging.info("Micro-batcher stopped.")
+        if chatbot.capture is not None:
+            chatbot.capture.close()  # ✅ Write the queries still queued
+
+    app = FastAPI(title="FAQ Chatbot", lifespan=lifespan)
+    app.state.chatbot = chatbot
+    app.state.batcher = batcher
+
+    @app.post("/ask")
+    async def ask(body: Question):
+        try:
+            return await batcher.submit(body.question)
+        except BatcherOverloaded as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    @app.get("/suggest")
+    async def suggest(q: str = "", n: int = 5):
+        # ✅ Typeahead lookups take microseconds: answered inline, not micro-batched
+        return {"suggestions": chatbot.suggest(q, min(max(n, 0), 50))}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "batcher": batcher.stats(), "cache": chatbot.cache_stats(),
+                "index": {"version": chatbot.index_version, "last_reload": chatbot.last_reload},
+                "capture": chatbot.capture.stats() if chatbot.capture is not None else None,
+                "memory": process_memory()}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        if not chatbot.metrics.enabled:
+            raise HTTPException(status_code=404, detail="Metrics are disabled (start with --metrics)")
+        return PlainTextResponse(chatbot.metrics.export_prometheus(),
+                                 media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    return app
+
+
+def create_tenant_app(registry, max_batch_size=64, max_wait_ms=5.0, max_queue_depth=1024):
+    """
+    Builds the FastAPI app serving several tenants (FAQ corpora) from one process.
+
+    Each tenant gets its own MicroBatcher, started on its first request. Batches are scored
+    through the registry, which loads the tenant if it was never loaded or was unloaded.
+
+    Parameters:
+    - registry (TenantRegistry): The registered tenants.
+    - max_batch_size (int): Maximum queries scored together.
+    - max_wait_ms (float): Longest time a request waits for its batch to fill.
+    - max_queue_depth (int): Waiting requests per tenant allowed before new ones get HTTP 503.
+
+    Returns:
+    - app (FastAPI): The application.
+    """
+    batchers = {}
+
+    async def batcher_for(tenant_id):
+        if tenant_id not in registry:
+            raise HTTPException(status_code=404, detail=f"Unknown tenant: {tenant_id}")
+        batcher = batchers.get(tenant_id)
+        if batcher is None:
+            # ✅ Bound to the tenant id, not the chatbot: an unloaded tenant is loaded again
+            batcher = MicroBatcher(lambda queries: registry.generate_responses(tenant_id, queries),
+                                   max_batch_size=max_batch_size, max_wait_ms=max_wait_ms,
+                                   max_queue_depth=max_queue_depth)
+            batchers[tenant_id] = batcher
+            await batcher.start()
+        return batcher
+
+    @asynccontextmanager
+    async def lifespan(app):
+        yield
+        for batcher in batchers.values():
+            await batcher.stop()
+        logging.info("Micro-batchers stopped.")
+
+    app = FastAPI(title="FAQ Chatbot (multi-tenant)", lifespan=lifespan)
+    app.state.registry = registry
+
+    @app.post("/tenants/{tenant_id}/ask")
+    async def ask(tenant_id: str, body: Question):
+        batcher = await batcher_for(tenant_id)
+        try:
+            return await batcher.submit(body.question)
+        except BatcherOverloaded as e:
+            raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+
+    @app.get("/tenants/{tenant_id}/suggest")
+    async def suggest(tenant_id: str, q: str = "", n: int = 5):
+        try:
+            chatbot = await run_in_threadpool(registry.get, tenant_id)  # ✅ May load the tenant
+        except UnknownTenant as e:
+            raise HTTPException(status_code=404, detail=str(e))
+        return {"suggestions": chatbot.suggest(q, min(max(n, 0), 50))}
+
+    @app.get("/health")
+    async def health():
+        return {"status": "ok", "tenants": registry.stats(),
+                "batchers": {tenant_id: batcher.stats() for tenant_id, batcher in batchers.items()},
+                "memory": process_memory()}
+
+    @app.get("/metrics", response_class=PlainTextResponse)
+    async def metrics():
+        tenant_metrics = registry.chatbot_defaults.get("metrics")  # ✅ One instance shared by all tenants
+        if tenant_metrics is None:
+            raise HTTPException(status_code=404, detail="Metrics are disabled (start with --metrics)")
+        return PlainTextResponse(tenant_metrics.export_prometheus(),
+                                 media_type="text/plain; version=0.0.4; charset=utf-8")
+
+    return app
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="FAQ chatbot HTTP server")
+    parser.add_argument("--faq-file", default="data/faq_data.json", help="Path to the FAQ file (JSON document or .jsonl)")
+    parser.add_argument("--snapshot-dir", default=None, help="Directory for persisted index snapshots")
+    parser.add_argument("--tenants", default=None,
+                        help="JSON config of several FAQ corpora served from one process (see TenantRegistry)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--max-batch-size", type=int, default=64, help="Maximum queries scored in one pass")
+    parser.add_argument("--max-wait-ms", type=float, default=5.0,
+                        help="Longest time a request waits for its batch to fill")
+    parser.add_argument("--max-queue-depth", type=int, default=1024,
+                        help="Waiting requests allowed before new ones are rejected with HTTP 503")
+    parser.add_argument("--fast-preprocessing", action="store_true",
+                        help="Use the regex tokenizer fast path of TextProcessor")
+    parser.add_argument("--metrics", action="store_true",
+                        help="Collect per-stage latency histograms, exported at GET /metrics")
+    parser.add_argument("--embedding-dtype", choices=EMBEDDING_DTYPES, default="float32",
+                        help="Storage of the question embeddings (float16 / int8 save memory)")
+    parser.add_argument("--hashing-features", type=int, default=None,
+                        help="Hashed TF-IDF n-gram space of this many buckets (e.g. 268435456) instead of a fitted vocabulary")
+    parser.add_argument("--build-workers", type=int, default=1,
+                        help="Processes building the index (shards the corpus; pair with --hashing-features)")
+    parser.add_argument("--vector-table", default=None,
+                        help="Compact word-vector table (python -m modules.vector_table) instead of the full Spacy model")
+    parser.add_argument("--watch-interval", type=float, default=None,
+                        help="Reload the FAQ file in the background when it changes (checked every N seconds)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes forked from one loaded model (pre-fork mode when > 1)")
+    parser.add_argument("--memory-report", action="store_true",
+                        help="Print per-worker RSS / PSS / unique memory once the workers are up")
+    parser.add_argument("--capture-file", default=None,
+                        help="Record every answered query with its stage timings to this JSONL file (for replay)")
+    parser.add_argument("--capture-max-mb", type=float, default=64,
+                        help="Size at which the capture file is rotated")
+    parser.add_argument("--capture-backups", type=int, default=5, help="Rotated capture files kept")
+    return parser.parse_args()
+
+
+def serve_worker(chatbot, worker_id, sock, args):
+    """
+    Worker body of the pre-fork mode: serves the app on the socket bound by the parent.
+    """
+    if args.watch_interval:
+        chatbot.start_watching(args.watch_interval)  # ✅ Threads do not survive fork: each worker watches
+    app = create_app(chatbot, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                     max_queue_depth=args.max_queue_depth)
+    uvicorn.Server(uvicorn.Config(app)).run(sockets=[sock])
+
+
+def serve_prefork(chatbot, args):
+    """
+    Binds the listening socket once and forks `args.workers` processes accepting on it.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((args.host, args.port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    pool = PreforkPool(chatbot, n_workers=args.workers)
+    pool.start(serve_worker, sock, args)
+    print(f"Serving on http://{args.host}:{args.port} with {args.workers} workers")
+
+    try:
+        if args.memory_report:
+            time.sleep(2)  # ✅ Let the workers finish starting up before measuring
+            print(format_memory_report(pool.memory_report()))
+        pool.join()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.stop()
+        sock.close()
+
+
+def main():
+    args = parse_args()
+    setup_logging()
+
+    if args.capture_file and (args.tenants or args.workers > 1):
+        raise SystemExit("--capture-file is only supported with a single FAQ set and --workers 1")
+
+    if args.tenants:
+        if args.workers > 1:
+            raise SystemExit("--tenants does not support --workers > 1")
+        registry = TenantRegistry.from_config(args.tenants, fast_preprocessing=args.fast_preprocessing,
+                                              metrics=Metrics() if args.metrics else None,
+                                              watch_interval=args.watch_interval,
+                                              embedding_dtype=args.embedding_dtype, vector_table=args.vector_table,
+                                              hashing_features=args.hashing_features,
+                                              build_workers=args.build_workers)
+        app = create_tenant_app(registry, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                                max_queue_depth=args.max_queue_depth)
+        uvicorn.run(app, host=args.host, port=args.port)
+        return
+
+    capture = None
+    if args.capture_file:
+        capture = QueryCapture(args.capture_file, max_bytes=int(args.capture_max_mb * 1024 * 1024),
+                               backup_count=args.capture_backups)
+    chatbot = FAQChatbot(args.faq_file, snapshot_dir=args.snapshot_dir,
+                         fast_preprocessing=args.fast_preprocessing, embedding_dtype=args.embedding_dtype,
+                         vector_table=args.vector_table, hashing_features=args.hashing_features,
+                         build_workers=args.build_workers,
+                         metrics=Metrics() if args.metrics else None,
+                         watch_interval=args.watch_interval if args.workers <= 1 else None,
+                         capture=capture)
+    logging.info("Chatbot initialized.")
+
+    if args.workers > 1:
+        serve_prefork(chatbot, args)
+        return
+
+    app = create_app(chatbot, max_batch_size=args.max_batch_size, max_wait_ms=args.max_wait_ms,
+                     max_queue_depth=args.max_queue_depth)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
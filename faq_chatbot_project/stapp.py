@@ -28,10 +28,15 @@
     
     
 import streamlit as st
+from st_keyup import st_keyup  # ✅ Reruns on every keystroke (st.text_input only on Enter / focus loss)
 from modules.chatbot import FAQChatbot
 
-# Initialize the chatbot
-chatbot = FAQChatbot('data/faq_data.json')
+# Initialize the chatbot once per server process (Streamlit reruns this script on every interaction)
+@st.cache_resource
+def load_chatbot():
+    return FAQChatbot('data/faq_data.json', watch_interval=5.0)  # ✅ Edits to the FAQ file go live without a restart
+
+chatbot = load_chatbot()
 
 # Streamlit UI
 st.title("💬 FAQ Chatbot")
@@ -60,18 +65,13 @@ for category, questions in faq_categories.items():
             if st.button(q, key=q):
                 st.session_state["user_input"] = q
 
-# Dropdown for auto-suggestion
-user_input = st.selectbox(
-    "Choose a question or type your own:",
-    [""] + [q for questions in faq_categories.values() for q in questions],  # Flatten the list
-    index=0
-)
-
-# Allow users to manually type if they don't select from dropdown
-custom_input = st.text_input("Or type your question:", "")
+# Type a question; matching FAQ questions are offered as completions (most asked first)
+custom_input = st_keyup("Type your question:", value=st.session_state.get("user_input", ""), debounce=150) or ""
+completions = [s["question"] for s in chatbot.suggest(custom_input, n=8)] if custom_input.strip() else []
+user_input = st.selectbox("Suggestions:", [""] + completions, index=0) if completions else ""
 
-# Determine final input (dropdown or custom)
-final_input = custom_input if custom_input else user_input
+# Determine final input (selected completion or typed text)
+final_input = user_input if user_input else custom_input
 
 if st.button("Get Answer"):
     if final_input:
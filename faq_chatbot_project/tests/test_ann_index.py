@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from modules.ann_index import IVFIndex
+from modules.index_buffers import GrowableArray
+
+
+def clustered_rows(n, n_clusters=20, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((n_clusters, dim))
+    vectors = centers[rng.integers(n_clusters, size=n)] + 0.1 * rng.standard_normal((n, dim))
+    vectors = vectors.astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def recall_at_1(index, vectors, queries):
+    ids, _ = index.search(queries, k=1)
+    return float(np.mean(ids[:, 0] == np.argmax(queries @ vectors.T, axis=1)))
+
+
+def test_recall_on_clustered_vectors():
+    vectors, queries = np.split(clustered_rows(2200), [2000])  # ✅ Queries from the same clusters
+    assert recall_at_1(IVFIndex(n_lists=32, n_probe=32).fit(vectors), vectors, queries) == 1.0
+    assert recall_at_1(IVFIndex(n_lists=32, n_probe=4).fit(vectors), vectors, queries) >= 0.9
+
+
+@pytest.mark.parametrize("sample_size", [1, 10, 1000])
+def test_more_lists_than_sampled_vectors(sample_size):
+    vectors = clustered_rows(300)
+    index = IVFIndex(n_lists=50, n_probe=50, sample_size=sample_size).fit(vectors)
+    assert len(index.centroids) == min(50, sample_size)
+    assert recall_at_1(index, vectors, vectors[:50]) == 1.0
+
+
+def test_added_rows_are_searchable_once_active():
+    vectors = clustered_rows(500)
+    rows = GrowableArray(vectors[:400])
+    index = IVFIndex(n_lists=8, n_probe=8).fit(rows)
+    rows.append(vectors[400:])
+    index.add(range(400, 500))
+    ids, _ = index.search(vectors[450:451], k=1, active=np.ones(400, dtype=bool))  # ✅ Not yet published
+    assert 0 <= ids[0, 0] < 400
+    ids, _ = index.search(vectors[450:451], k=1, active=np.ones(500, dtype=bool))
+    assert ids[0, 0] == 450
@@ -0,0 +1,68 @@
+import io
+import json
+
+import pytest
+
+from conftest import nltk_data_available
+from modules.bulk_scoring import RESULT_FIELDS, ResultWriter, iter_queries, score_stream
+
+
+class EchoChatbot:
+    """Answers every query with FAQ id = its length (enough to check row order)."""
+
+    def generate_responses(self, queries):
+        return [{"faq_id": len(query), "suggestions": [], "confidence": 1.0, "answer": query.upper()}
+                for query in queries]
+
+
+JSONL_INPUT = "\n".join([
+    json.dumps({"query": "first", "id": "a"}),
+    "{not json",
+    json.dumps({"text": "no query key", "id": "c"}),
+    "",
+    json.dumps("second"),
+    json.dumps({"query": "third", "id": "e"}),
+]) + "\n"
+
+
+def test_unreadable_records_keep_their_row():
+    records = list(iter_queries(io.StringIO(JSONL_INPUT), "jsonl", id_column="id"))
+    assert [(record_id, text) for record_id, text, _ in records] == \
+        [("a", "first"), (2, None), ("c", None), (4, "second"), ("e", "third")]
+
+    output = io.StringIO()
+    stats = score_stream(EchoChatbot(), records, ResultWriter(output, "jsonl"), batch_size=2)
+    rows = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [row["id"] for row in rows] == ["a", 2, "c", 4, "e"]
+    assert [row["answer"] for row in rows] == ["FIRST", None, None, "SECOND", "THIRD"]
+    assert rows[1]["error"].startswith("malformed JSON") and rows[2]["error"] == "no 'query' text"
+    assert rows[0]["error"] is None and rows[0]["faq_id"] == 5
+    assert (stats["queries"], stats["skipped"], stats["answered"]) == (3, 2, 3)
+
+
+def test_csv_rows_without_text_get_an_error():
+    records = list(iter_queries(io.StringIO("id,query\nx,hello\ny\nz,bye\n"), "csv", id_column="id"))
+    output = io.StringIO()
+    score_stream(EchoChatbot(), records, ResultWriter(output, "csv"), batch_size=1)
+    lines = output.getvalue().splitlines()
+    assert lines[0] == ",".join(RESULT_FIELDS)
+    assert lines[1:] == ["x,5,5,1.0,HELLO,", "y,,,,,no 'query' value", "z,3,3,1.0,BYE,"]
+
+
+@pytest.mark.skipif(not nltk_data_available(), reason="NLTK data not installed")
+def test_worker_processes_write_rows_in_input_order(tmp_path, faq_entries, vector_table):
+    from modules.chatbot import FAQChatbot
+
+    faq_file = tmp_path / "faq.json"
+    faq_file.write_text(json.dumps(faq_entries), encoding="utf-8")
+    chatbot = FAQChatbot(str(faq_file), vector_table=vector_table)
+    records = [(i, entry["question"], None) if i % 7 else (i, None, "bad record") for i, entry in enumerate(faq_entries)]
+
+    outputs = []
+    for workers in (1, 2):
+        output = io.StringIO()
+        score_stream(chatbot, records, ResultWriter(output, "jsonl"), batch_size=16, workers=workers)
+        outputs.append([json.loads(line) for line in output.getvalue().splitlines()])
+    assert outputs[0] == outputs[1]
+    assert [row["id"] for row in outputs[1]] == list(range(len(records)))
+    assert all((row["error"] is None) == (i % 7 != 0) for i, row in enumerate(outputs[1]))
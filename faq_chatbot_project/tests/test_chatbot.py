@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+
+import pytest
+
+from conftest import nltk_data_available
+
+pytestmark = pytest.mark.skipif(not nltk_data_available(), reason="NLTK data not installed")
+
+
+@pytest.fixture
+def chatbot(faq_file, vector_table):
+    from modules.chatbot import FAQChatbot
+
+    chatbot = FAQChatbot(faq_file, vector_table=vector_table)
+    yield chatbot
+    chatbot.stop_watching()
+
+
+def test_batch_responses_equal_single_responses(chatbot, faq_entries):
+    queries = [entry["question"] for entry in faq_entries[:20]] + ["", "something else entirely", "refund?"]
+    expected = [chatbot.generate_response(query) for query in queries]
+    chatbot.response_cache.clear()
+    assert chatbot.generate_responses(queries) == expected
+    assert [response["faq_id"] for response in expected[:20]] == list(range(20))
+
+
+def _write_faqs(path, entries, tag):
+    path.write_text(json.dumps([dict(entry, answer=f"{tag}: {entry['answer']}") for entry in entries]),
+                    encoding="utf-8")
+
+
+def test_reload_swap_is_never_seen_half_done(tmp_path, faq_entries, vector_table):
+    from modules.chatbot import FAQChatbot
+    from modules.metrics import Metrics
+
+    path = tmp_path / "faq.json"
+    entries = faq_entries[:200]
+    _write_faqs(path, entries, "v1")
+    chatbot = FAQChatbot(str(path), vector_table=vector_table, cache_size=0, metrics=Metrics())
+    queries = [entry["question"] for entry in entries[:20]]
+    answers = [entry["answer"] for entry in entries[:20]]
+
+    stop = threading.Event()
+    seen = []
+
+    def ask():
+        while not stop.is_set():
+            for i, query in enumerate(queries):
+                seen.append((i, chatbot.generate_response(query)))
+
+    threads = [threading.Thread(target=ask) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    try:
+        # ✅ Reversed order: every question gets another FAQ id, so an id of one version
+        #    looked up in the other would return the wrong answer
+        _write_faqs(path, entries[::-1], "v2")
+        assert chatbot.reload()
+        time.sleep(0.2)
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    for i, response in seen:
+        assert response["matched_question"] == queries[i]
+        assert response["answer"] in (f"v1: {answers[i]}", f"v2: {answers[i]}")
+    assert {response["answer"][:2] for _, response in seen} == {"v1", "v2"}
+    assert chatbot.index_version == 2 and chatbot.last_reload["error"] is None
+    assert chatbot.metrics.reload_seconds.count == 1 and chatbot.metrics.index_version == 2
+    assert not chatbot.reload()  # ✅ Unchanged file
+
+
+def test_failed_reload_keeps_serving(tmp_path, faq_entries, vector_table):
+    from modules.chatbot import FAQChatbot
+    from modules.exception import FAQException
+
+    path = tmp_path / "faq.json"
+    _write_faqs(path, faq_entries[:50], "v1")
+    chatbot = FAQChatbot(str(path), vector_table=vector_table)
+    path.write_text("[{not json", encoding="utf-8")
+    with pytest.raises(FAQException):
+        chatbot.reload()
+    assert chatbot.index_version == 1 and chatbot.last_reload["error"]
+    assert chatbot.generate_response(faq_entries[3]["question"])["answer"] == f"v1: {faq_entries[3]['answer']}"
+
+
+def test_watcher_reloads_changed_file(tmp_path, faq_entries, vector_table):
+    from modules.chatbot import FAQChatbot
+
+    path = tmp_path / "faq.json"
+    _write_faqs(path, faq_entries[:50], "v1")
+    chatbot = FAQChatbot(str(path), vector_table=vector_table, watch_interval=0.05)
+    try:
+        _write_faqs(path, faq_entries[:60], "v2")
+        deadline = time.monotonic() + 10
+        while chatbot.index_version == 1 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert chatbot.index_version == 2
+        assert len(chatbot.questions) == 60
+    finally:
+        chatbot.stop_watching()
@@ -0,0 +1,39 @@
+import json
+
+import pytest
+
+from modules.data_loader import MAP_DECISION_ENTRIES, iter_faq_data
+
+
+def write_json(tmp_path, document):
+    path = tmp_path / "faq.json"
+    path.write_text(json.dumps(document), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("chunk_size", [4, 1 << 20])
+def test_wrapper_metadata_is_not_a_faq(tmp_path, chunk_size):
+    path = write_json(tmp_path, {"source": "helpdesk", "faqs": [{"question": "q1", "answer": "a1"}],
+                                 "exported_at": "2024-01-01", "count": 1})
+    assert list(iter_faq_data(path, chunk_size=chunk_size)) == [{"question": "q1", "answer": "a1"}]
+
+
+def test_question_answer_map(tmp_path):
+    path = write_json(tmp_path, {"q1": "a1", "q2": "a2"})
+    assert list(iter_faq_data(path)) == [{"question": "q1", "answer": "a1"}, {"question": "q2", "answer": "a2"}]
+
+
+def test_large_question_answer_map(tmp_path):
+    document = {f"q{i}": f"a{i}" for i in range(MAP_DECISION_ENTRIES + 5)}
+    path = write_json(tmp_path, document)
+    assert [entry["question"] for entry in iter_faq_data(path)] == list(document)
+
+
+def test_object_with_non_string_values_is_not_a_map(tmp_path):
+    path = write_json(tmp_path, {"q1": "a1", "count": 2})
+    assert list(iter_faq_data(path)) == []
+
+
+def test_array_of_records(tmp_path):
+    path = write_json(tmp_path, [{"question": "q1", "answer": "a1"}, {"question": "", "answer": "a2"}])
+    assert list(iter_faq_data(path)) == [{"question": "q1", "answer": "a1"}]
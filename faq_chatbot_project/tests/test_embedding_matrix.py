@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from modules.embedding_matrix import EMBEDDING_DTYPES, EmbeddingMatrix
+
+
+def unit_rows(n, dim=300, seed=0):
+    vectors = np.random.default_rng(seed).standard_normal((n, dim)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+@pytest.mark.parametrize("dtype", EMBEDDING_DTYPES)
+def test_exact_match_scores_at_most_one(dtype):
+    vectors = unit_rows(500)
+    matrix = EmbeddingMatrix.from_vectors(vectors, dtype)
+    scores = matrix.scores(vectors, block_size=128)
+    assert scores.max() <= 1.0
+    assert np.all(scores.min() >= -1.0)
+    assert np.array_equal(scores.argmax(axis=1), np.arange(len(vectors)))
+    assert np.allclose(np.diag(scores), 1.0, atol=2e-3)
+
+
+def test_int8_rows_keep_their_norm():
+    vectors = unit_rows(200)
+    vectors[3] = 0.0
+    matrix = EmbeddingMatrix.from_vectors(vectors, "int8")
+    norms = np.linalg.norm(matrix.rows().astype(np.float64), axis=1)
+    assert np.allclose(np.delete(norms, 3), 1.0, atol=1e-6)
+    assert norms[3] == 0.0
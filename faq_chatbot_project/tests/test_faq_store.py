@@ -0,0 +1,33 @@
+import tracemalloc
+
+from modules.faq_store import FAQStore, StringTableBuilder
+
+
+def test_from_entries_streams_both_columns():
+    entries = ({"question": f"question {i} ✓", "answer": f"answer {i} " * 3} for i in range(1000))
+    store = FAQStore.from_entries(entries)
+    assert len(store) == 1000 and store.n_live == 1000
+    assert store.question(7) == "question 7 ✓"
+    assert store.answer(999) == "answer 999 " * 3
+
+
+def test_from_entries_does_not_hold_answer_strings():
+    n, answer = 20000, "a" * 200
+
+    def entries():
+        for i in range(n):
+            yield {"question": f"q{i}", "answer": answer + str(i)}  # ✅ A fresh str per entry
+
+    tracemalloc.start()
+    store = FAQStore.from_entries(entries())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    # ✅ Packed bytes plus growth slack; holding the answers as `str` objects doubles the peak
+    assert peak < 1.5 * (store.answers.nbytes + store.questions.nbytes) + (1 << 20)
+
+
+def test_builder_matches_appended_strings():
+    builder = StringTableBuilder()
+    for text in ["", "é", "abc"]:
+        builder.append(text)
+    assert list(builder.finish()) == ["", "é", "abc"]
@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from benchmarks.corpus import generate_queries
+from modules.hashed_tfidf import HashedTfidfVectorizer
+from modules.model import FAQModel
+
+
+@pytest.fixture
+def questions(faq_entries):
+    return [entry["question"].lower() for entry in faq_entries]
+
+
+def test_scores_match_the_fitted_vocabulary(questions):
+    queries = generate_queries(questions, 50, seed=2) + ["no known words here", ""]
+    vocabulary = TfidfVectorizer(ngram_range=(1, 3), stop_words='english')
+    expected = (vocabulary.fit_transform(questions) @ vocabulary.transform(queries).T).toarray()
+    hashed = HashedTfidfVectorizer()
+    scores = (hashed.fit_transform(questions) @ hashed.transform(queries).T).toarray()
+    assert len(hashed.columns_) == len(vocabulary.vocabulary_)
+    assert np.allclose(scores, expected)
+
+
+def test_merged_shard_counts_equal_a_serial_fit(questions):
+    serial = HashedTfidfVectorizer(n_features=2 ** 20)
+    expected = serial.fit_transform(questions)
+    sharded = HashedTfidfVectorizer(n_features=2 ** 20)
+    counts = sharded.merge([sharded.counts(questions[start:start + 70]) for start in range(0, len(questions), 70)])
+    vectors = sharded.fit_counts(counts).weight(counts)
+    assert np.array_equal(sharded.columns_, serial.columns_)
+    assert abs(vectors - expected).max() == 0
+
+
+def test_hashed_model_agrees_with_vocabulary_model(vector_table, questions):
+    queries = [query.lower() for query in generate_queries(questions, 40, seed=3)]
+    vocabulary = FAQModel(questions, vector_table=vector_table)
+    hashed = FAQModel(questions, vector_table=vector_table, hashing_features=2 ** 28)
+    hashed_matches, vocabulary_matches = hashed.find_best_matches(queries), vocabulary.find_best_matches(queries)
+    assert [faq_id for faq_id, _ in hashed_matches] == [faq_id for faq_id, _ in vocabulary_matches]
+    assert [score for _, score in hashed_matches] == pytest.approx([score for _, score in vocabulary_matches])
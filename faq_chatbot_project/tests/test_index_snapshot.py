@@ -0,0 +1,63 @@
+import json
+import os
+
+import numpy as np
+import pytest
+
+from benchmarks.corpus import generate_queries
+from modules.faq_store import FAQStore, SortedStringMap
+from modules.index_snapshot import META_FILE, load_snapshot, save_snapshot
+from modules.model import FAQModel
+
+
+@pytest.fixture
+def saved(tmp_path, vector_table, faq_entries):
+    faqs = FAQStore.from_entries(faq_entries[:100])
+    questions = [entry["question"].lower() for entry in faq_entries[:100]]
+    model = FAQModel(questions, vector_table=vector_table)
+    save_snapshot(str(tmp_path), "hash-a", model, faqs, processed_questions=questions, preprocessing="nltk")
+    return str(tmp_path), model, questions
+
+
+def test_round_trip_gives_the_same_rankings(saved, vector_table):
+    snapshot_dir, model, questions = saved
+    snapshot = load_snapshot(snapshot_dir, "hash-a", preprocessing="nltk")
+    assert isinstance(snapshot["vocabulary"], SortedStringMap)
+    assert isinstance(snapshot["vocabulary"].values_array, np.memmap)
+    assert dict(snapshot["vocabulary"]) == model.vectorizer.vocabulary_
+    assert list(snapshot["processed_questions"]) == questions
+
+    restored = FAQModel(questions, snapshot=snapshot, vector_table=vector_table)
+    assert restored.from_snapshot
+    queries = [query.lower() for query in generate_queries(questions, 20, seed=3)]
+    assert restored.find_top_k_many(queries, k=3) == model.find_top_k_many(queries, k=3)
+
+
+def test_snapshot_survives_a_second_save(saved, vector_table, tmp_path_factory):
+    snapshot_dir, model, questions = saved
+    restored = FAQModel(questions, snapshot=load_snapshot(snapshot_dir, "hash-a", preprocessing="nltk"),
+                        vector_table=vector_table)
+    other_dir = str(tmp_path_factory.mktemp("resaved"))
+    save_snapshot(other_dir, "hash-a", restored, FAQStore.from_entries([]), preprocessing="nltk")
+    assert dict(load_snapshot(other_dir, "hash-a", preprocessing="nltk")["vocabulary"]) == model.vectorizer.vocabulary_
+
+
+def test_stale_snapshots_are_ignored(saved):
+    snapshot_dir, _, _ = saved
+    assert load_snapshot(snapshot_dir, "hash-b", preprocessing="nltk") is None
+    assert load_snapshot(snapshot_dir, "hash-a", preprocessing="fast") is None
+
+    meta_path = os.path.join(snapshot_dir, "hash-a", META_FILE)
+    with open(meta_path, encoding="utf-8") as file:
+        meta = json.load(file)
+    meta["format_version"] -= 1
+    with open(meta_path, "w", encoding="utf-8") as file:
+        json.dump(meta, file)
+    assert load_snapshot(snapshot_dir, "hash-a", preprocessing="nltk") is None
+
+
+def test_newer_data_replaces_older_snapshots(saved, faq_entries):
+    snapshot_dir, model, _ = saved
+    save_snapshot(snapshot_dir, "hash-b", model, FAQStore.from_entries(faq_entries[:100]), preprocessing="nltk")
+    assert os.listdir(snapshot_dir) == ["hash-b"]
+    assert load_snapshot(snapshot_dir, "hash-b", preprocessing="nltk") is not None
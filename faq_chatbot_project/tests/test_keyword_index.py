@@ -0,0 +1,36 @@
+from benchmarks.corpus import generate_queries
+from modules.keyword_index import KeywordIndex
+from modules.suggestion_index import normalize
+
+
+def linear_scan(questions, query, k):
+    """The overlap ranking computed by scanning every question."""
+    query_tokens = set(query.split())
+    scores = []
+    for faq_id, question in questions.items():
+        tokens = set(question.split())
+        overlap = len(tokens & query_tokens)
+        if tokens and overlap:
+            scores.append((faq_id, overlap / len(tokens)))
+    return sorted(scores, key=lambda item: (-item[1], item[0]))[:k]
+
+
+def test_search_matches_a_linear_scan(faq_entries):
+    questions = {faq_id: " ".join(normalize(entry["question"])) for faq_id, entry in enumerate(faq_entries)}
+    index = KeywordIndex(questions.items())
+    queries = [" ".join(normalize(query)) for query in generate_queries(list(questions.values()), 50, seed=6)]
+    for query in queries:
+        assert index.search(query, k=5) == linear_scan(questions, query, 5)
+    assert sum(1 for query in queries if index.search(query)) > 40
+
+
+def test_add_replace_and_remove():
+    index = KeywordIndex([(0, "track order"), (1, "refund order"), (2, "")])
+    assert index.search("order") == [(0, 0.5), (1, 0.5)]
+    index.add(0, "track parcel")
+    assert index.search("order") == [(1, 0.5)]
+    assert index.search("track parcel") == [(0, 1.0)]
+    index.remove(1)
+    index.remove(7)
+    assert index.search("order refund") == []
+    assert "order" not in index.postings
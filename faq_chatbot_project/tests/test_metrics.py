@@ -0,0 +1,85 @@
+import threading
+
+import pytest
+
+from modules.metrics import Histogram, Metrics, NULL_METRICS
+from modules.model import FAQModel
+
+
+def test_histogram_quantile_is_bucket_upper_bound():
+    histogram = Histogram((0.1, 0.5, 1.0))
+    assert histogram.quantile(0.5) is None
+    for value in (0.05, 0.05, 0.05, 0.3, 0.7, 2.0):
+        histogram.observe(value)
+    assert histogram.counts == [3, 1, 1, 1]
+    assert histogram.quantile(0.5) == 0.1
+    assert histogram.quantile(0.8) == 1.0
+    assert histogram.quantile(1.0) == float("inf")
+    assert histogram.sum == pytest.approx(3.15)
+
+
+def test_histogram_counts_concurrent_observations():
+    histogram = Histogram()
+    threads = [threading.Thread(target=lambda: [histogram.observe(0.001) for _ in range(1000)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert histogram.count == sum(histogram.counts) == 4000
+
+
+def test_stage_timer_feeds_histograms_and_hooks():
+    metrics = Metrics()
+    seen = []
+    metrics.add_hook(lambda stage, seconds: seen.append(stage))
+    with metrics.stage("tfidf"):
+        pass
+    metrics.observe_stage("tfidf", 0.002)
+    metrics.observe_stage("spacy", 0.02)
+    assert seen == ["tfidf", "tfidf", "spacy"]
+    stages = metrics.summary()["stages"]
+    assert stages["tfidf"]["count"] == 2 and stages["spacy"]["count"] == 1
+    assert stages["spacy"]["p50_seconds"] == 0.025
+
+
+def test_summary_and_prometheus_export():
+    metrics = Metrics()
+    metrics.record_response(0.003, 0.9, low_confidence=False)
+    metrics.record_response(0.004, 0.2, low_confidence=True, cached=True)
+    metrics.record_response(None, 0.8, low_confidence=False)
+    metrics.observe_stage("fusion", 0.0002)
+    metrics.record_reload(1.5, 2)
+    summary = metrics.summary()
+    assert (summary["requests"], summary["low_confidence"], summary["cache_hits"]) == (3, 1, 1)
+    assert summary["low_confidence_rate"] == pytest.approx(1 / 3)
+    assert metrics.request_seconds.count == 2  # ✅ Batched responses have no own latency
+
+    text = metrics.export_prometheus()
+    lines = text.splitlines()
+    assert 'faq_stage_duration_seconds_bucket{stage="fusion",le="0.00025"} 1' in lines
+    assert 'faq_stage_duration_seconds_bucket{stage="fusion",le="+Inf"} 1' in lines
+    assert 'faq_request_duration_seconds_bucket{le="0.005"} 2' in lines
+    assert "faq_request_duration_seconds_count 2" in lines
+    assert "faq_requests_total 3" in lines
+    assert "faq_cache_hits_total 1" in lines
+    assert "faq_index_version 2" in lines
+    for line in lines:
+        if not line.startswith("#"):
+            float(line.rsplit(" ", 1)[1])  # ✅ Every sample line ends with a number
+
+
+def test_null_metrics_record_nothing():
+    with NULL_METRICS.stage("tfidf"):
+        pass
+    NULL_METRICS.record_response(0.1, 0.5, low_confidence=True)
+    NULL_METRICS.errors.inc()
+    assert NULL_METRICS.errors.value == 0
+    assert NULL_METRICS.summary() == {} and NULL_METRICS.export_prometheus() == ""
+
+
+def test_model_times_each_stage(faq_entries, vector_table):
+    metrics = Metrics()
+    questions = [entry["question"].lower() for entry in faq_entries]
+    model = FAQModel(questions, vector_table=vector_table, auto_compact_ratio=None, metrics=metrics)
+    model.find_best_matches(questions[:5])
+    assert {"tfidf", "spacy", "fusion"} <= set(metrics.summary()["stages"])
@@ -0,0 +1,118 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from modules.exception import FAQException
+from modules.micro_batcher import BatcherOverloaded, MicroBatcher
+
+
+def test_concurrent_queries_are_scored_in_batches():
+    batch_sizes = []
+
+    def score_batch(queries):
+        batch_sizes.append(len(queries))
+        return [query.upper() for query in queries]
+
+    async def run():
+        batcher = MicroBatcher(score_batch, max_batch_size=4, max_wait_ms=50)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(f"q{i}") for i in range(10))), batcher.stats()
+        finally:
+            await batcher.stop()
+
+    results, stats = asyncio.run(run())
+    assert results == [f"Q{i}" for i in range(10)]
+    assert batch_sizes == [4, 4, 2]
+    assert stats["batches"] == 3 and stats["mean_batch_size"] == pytest.approx(10 / 3)
+
+
+def test_full_queue_rejects_new_queries():
+    release = threading.Event()
+
+    def score_batch(queries):
+        release.wait(5)
+        return queries
+
+    async def run():
+        batcher = MicroBatcher(score_batch, max_batch_size=1, max_wait_ms=0, max_queue_depth=2)
+        await batcher.start()
+        try:
+            first = asyncio.ensure_future(batcher.submit("a"))  # ✅ Taken by the collector, blocks scoring
+            while batcher.stats()["batches"] < 1:
+                await asyncio.sleep(0.001)
+            waiting = [asyncio.ensure_future(batcher.submit(query)) for query in ("b", "c")]
+            await asyncio.sleep(0)
+            with pytest.raises(BatcherOverloaded):
+                await batcher.submit("d")
+            release.set()
+            return await asyncio.gather(first, *waiting), batcher.stats()
+        finally:
+            await batcher.stop()
+
+    results, stats = asyncio.run(run())
+    assert results == ["a", "b", "c"]
+    assert stats["rejected"] == 1
+
+
+def test_scoring_errors_reach_every_query_of_the_batch():
+    def score_batch(queries):
+        raise ValueError("boom")
+
+    async def run():
+        batcher = MicroBatcher(score_batch, max_batch_size=8, max_wait_ms=20)
+        await batcher.start()
+        try:
+            return await asyncio.gather(*(batcher.submit(q) for q in "abc"), return_exceptions=True)
+        finally:
+            await batcher.stop()
+
+    assert all(isinstance(result, ValueError) for result in asyncio.run(run()))
+
+
+def test_submit_needs_a_running_batcher():
+    with pytest.raises(FAQException):
+        asyncio.run(MicroBatcher(lambda queries: queries).submit("a"))
+
+
+def test_server_answers_503_when_overloaded():
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+
+    from server import create_app
+
+    release = threading.Event()
+
+    class SlowChatbot:
+        capture = None
+
+        def generate_responses(self, queries):
+            release.wait(5)
+            return [{"answer": query} for query in queries]
+
+    app = create_app(SlowChatbot(), max_batch_size=1, max_wait_ms=0, max_queue_depth=1)
+    stats = app.state.batcher.stats
+
+    def wait_for(condition):
+        deadline = time.monotonic() + 5
+        while not condition() and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    with TestClient(app) as client:
+        responses = []
+        threads = [threading.Thread(target=lambda q=q: responses.append(client.post("/ask", json={"question": q})))
+                   for q in ("a", "b")]
+        threads[0].start()
+        wait_for(lambda: stats()["batches"] == 1)  # ✅ "a" is being scored
+        threads[1].start()
+        wait_for(lambda: stats()["queue_depth"] == 1)  # ✅ "b" waits: the queue is full
+        rejected = client.post("/ask", json={"question": "c"})
+        release.set()
+        for thread in threads:
+            thread.join()
+    assert rejected.status_code == 503
+    assert rejected.headers["Retry-After"] == "1"
+    assert sorted(response.json()["answer"] for response in responses) == ["a", "b"]
@@ -0,0 +1,137 @@
+import threading
+
+import numpy as np
+import pytest
+
+from benchmarks.corpus import generate_queries
+from modules.ann_index import IVFIndex
+from modules.model import FAQModel
+
+
+@pytest.fixture
+def questions(faq_entries):
+    return [entry["question"].lower() for entry in faq_entries]
+
+
+@pytest.mark.parametrize("ann", [False, True])
+def test_batch_ranking_matches_single_queries(vector_table, questions, ann):
+    model = FAQModel(questions, vector_table=vector_table, ann_index=IVFIndex(n_lists=8, n_probe=8) if ann else None)
+    queries = [query.lower() for query in generate_queries(questions, 20, seed=1)]
+    assert model.find_top_k_many(queries, k=3) == [model.find_top_k(query, k=3) for query in queries]
+
+
+@pytest.mark.filterwarnings("ignore:.*W008")  # ✅ Queries without known words score 0.0 in both
+def test_spacy_scores_match_doc_similarity(vector_table, questions):
+    model = FAQModel(questions[:40], vector_table=vector_table)
+    queries = [query.lower() for query in generate_queries(questions[:40], 5, seed=4)]
+    scores = model.spacy_scores(queries)
+    for query, row in zip(queries, scores):
+        doc = model.nlp(query)
+        assert np.allclose(row, [doc.similarity(model.nlp(question)) for question in questions[:40]], atol=1e-5)
+
+
+def test_batched_best_matches_equal_single_queries(vector_table, questions):
+    model = FAQModel(questions, vector_table=vector_table)
+    queries = [query.lower() for query in generate_queries(questions, 30, seed=5)] + [questions[3]]
+    assert model.find_best_matches(queries, batch_size=7) == [model.find_best_match(query) for query in queries]
+    assert model.find_best_matches(queries)[-1][0] == 3
+
+
+@pytest.mark.parametrize("ann", [False, True])
+def test_search_while_questions_are_added(vector_table, questions, ann):
+    model = FAQModel(questions[:100], vector_table=vector_table, auto_compact_ratio=None,
+                     ann_index=IVFIndex(n_lists=8, n_probe=2) if ann else None)
+    queries = [query.lower() for query in generate_queries(questions, 32, seed=2)]
+    errors = []
+    done = threading.Event()
+
+    def search():
+        try:
+            while not done.is_set():
+                for matches in model.find_top_k_many(queries, k=5, batch_size=8):
+                    assert all(match.faq_id < len(questions) for match in matches)
+        except Exception as e:
+            errors.append(e)
+
+    reader = threading.Thread(target=search)
+    reader.start()
+    try:
+        for question in questions[100:]:
+            model.add_question(question)
+    finally:
+        done.set()
+        reader.join()
+    assert not errors
+    assert model.index.n_live == len(questions)
+
+
+def test_updated_question_never_disappears(vector_table, questions):
+    model = FAQModel(questions[:50], vector_table=vector_table, auto_compact_ratio=None)
+    missing = []
+    done = threading.Event()
+
+    def watch():
+        while not done.is_set():
+            if model.index.row_of(7) is None:
+                missing.append(True)
+
+    watcher = threading.Thread(target=watch)
+    watcher.start()
+    try:
+        for question in questions[50:150]:
+            model.update_question(7, question)
+    finally:
+        done.set()
+        watcher.join()
+    assert not missing
+    assert model.index.n_live == 50
+    assert model.find_top_k(questions[149], k=1)[0].faq_id == 7
+
+
+def test_missing_ner_is_reported_once(vector_table, questions, caplog):
+    model = FAQModel(questions[:20], vector_table=vector_table)
+    with caplog.at_level("WARNING"):
+        assert model.extract_entities("refund for order 42 in paris") == {}
+        assert model.extract_entities("refund for order 43 in london") == {}
+    assert sum("Named entity recognition unavailable" in record.message for record in caplog.records) == 1
+
+
+@pytest.mark.parametrize("ann", [False, True])
+def test_best_match_without_live_questions(vector_table, questions, ann):
+    model = FAQModel(questions[:3], vector_table=vector_table, auto_compact_ratio=None,
+                     ann_index=IVFIndex(n_lists=2, n_probe=2) if ann else None)
+    assert model.find_best_match_tfidf(questions[1])[0] == 1
+    assert model.find_best_match_spacy(questions[1])[0] == 1
+    for faq_id in range(3):
+        model.remove_question(faq_id)
+    assert model.find_best_match_tfidf(questions[1]) == (None, 0.0)
+    assert model.find_best_match_spacy(questions[1]) == (None, 0.0)
+    assert model.find_best_matches([questions[1]]) == [(None, 0.0)]
+
+
+@pytest.mark.parametrize("weights", [(0.4, 0.6), (1.0, 0.0), (0.0, 1.0)])
+def test_top_k_equals_brute_force_fused_ranking(vector_table, questions, weights):
+    tfidf_weight, spacy_weight = weights
+    model = FAQModel(questions, vector_table=vector_table, tfidf_weight=tfidf_weight, spacy_weight=spacy_weight)
+    model.remove_question(5)
+    queries = [query.lower() for query in generate_queries(questions, 10, seed=6)] + [questions[5]]
+
+    tfidf, spacy = model.tfidf_scores(queries), model.spacy_scores(queries)
+    for i, matches in enumerate(model.find_top_k_many(queries, k=5)):
+        fused = [(tfidf_weight * t + spacy_weight * s, row) for row, (t, s) in enumerate(zip(tfidf[i], spacy[i]))
+                 if row != 5]
+        expected = sorted(fused, key=lambda item: (-item[0], item[1]))[:5]
+        assert [match.faq_id for match in matches] == [row for _, row in expected]
+        for match, (score, row) in zip(matches, expected):
+            assert match.score == pytest.approx(score, abs=1e-6)
+            assert (match.tfidf_score, match.spacy_score) == pytest.approx((tfidf[i, row], spacy[i, row]), abs=1e-6)
+
+
+def test_top_k_is_capped_by_live_questions(vector_table, questions):
+    model = FAQModel(questions[:4], vector_table=vector_table)
+    model.remove_question(1)
+    matches = model.find_top_k(questions[0], k=10)
+    assert sorted(match.faq_id for match in matches) == [0, 2, 3]
+    assert matches[0].faq_id == 0
+    assert [match.score for match in matches] == sorted((match.score for match in matches), reverse=True)
+    assert model.find_top_k(questions[0], k=0) == []
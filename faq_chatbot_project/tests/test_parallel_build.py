@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+
+from benchmarks.corpus import generate_queries
+from conftest import nltk_data_available
+from modules.model import FAQModel
+from modules.parallel_build import can_fork, preprocess_parallel, run_sharded
+from modules.text_processor import TextProcessor
+
+pytestmark = pytest.mark.skipif(not can_fork(), reason="Needs fork")
+
+
+@pytest.fixture
+def questions(faq_entries):
+    return [entry["question"].lower() for entry in faq_entries]
+
+
+def _shard_bounds(context, start, end):
+    return start, end, len(context["items"])
+
+
+def test_shards_cover_all_items_in_order():
+    results = run_sharded(_shard_bounds, {"items": list(range(10))}, 10, n_workers=2, shard_size=3)
+    assert results == [(0, 3, 10), (3, 6, 10), (6, 9, 10), (9, 10, 10)]
+
+
+@pytest.mark.parametrize("hashing_features", [None, 2 ** 28])
+def test_parallel_build_equals_serial_build(vector_table, questions, hashing_features):
+    serial = FAQModel(questions, vector_table=vector_table, hashing_features=hashing_features)
+    parallel = FAQModel(questions, vector_table=vector_table, hashing_features=hashing_features, build_workers=2)
+    assert "parallel_index_build" in parallel.startup_timings
+
+    assert np.array_equal(parallel.question_embeddings, serial.question_embeddings)
+    assert abs(parallel.question_vectors - serial.question_vectors).max() == 0
+    assert parallel.exact_match_rows == serial.exact_match_rows
+    queries = [query.lower() for query in generate_queries(questions, 20, seed=7)]
+    assert parallel.find_top_k_many(queries, k=3) == serial.find_top_k_many(queries, k=3)
+
+    # ✅ The shared embedding matrix is copied on the first append
+    faq_id = parallel.add_question("how do i return a parcel")
+    assert parallel.find_best_match("how do i return a parcel")[0] == faq_id
+
+
+@pytest.mark.skipif(not nltk_data_available(), reason="NLTK data not installed")
+@pytest.mark.parametrize("fast", [False, True])
+def test_parallel_preprocessing_equals_serial(faq_entries, fast):
+    text_processor = TextProcessor(fast=fast)
+    texts = [entry["question"] for entry in faq_entries]
+    assert preprocess_parallel(text_processor, texts, 3) == text_processor.preprocess_many(texts)
@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+
+import pytest
+
+from benchmarks.replay import replay
+from conftest import nltk_data_available
+from modules.metrics import Metrics
+from modules.query_capture import QueryCapture, read_capture
+
+
+def test_entries_are_written_by_the_writer_thread(tmp_path):
+    path = str(tmp_path / "capture" / "queries.jsonl")
+    capture = QueryCapture(path)
+
+    def record(thread):
+        for i in range(200):
+            capture.record(1000.0 + i + thread / 10, f"query {thread}-{i}", {"faq_id": i, "confidence": 0.5},
+                           0.002, {"tfidf": 0.1}, index_version=1)
+
+    threads = [threading.Thread(target=record, args=(thread,)) for thread in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    capture.close()
+
+    entries = read_capture([path])
+    assert capture.stats() == {"recorded": 800, "dropped": 0, "pending": 0}
+    assert len(entries) == 800
+    assert [entry["ts"] for entry in entries] == sorted(entry["ts"] for entry in entries)
+    assert entries[0] == {"ts": 1000.0, "query": "query 0-0", "faq_id": 0, "confidence": 0.5, "cached": False,
+                          "latency_ms": 2.0, "stages": {"tfidf": 0.1}, "batch_size": 1, "index_version": 1}
+
+
+def test_files_rotate_and_keep_backup_count(tmp_path):
+    path = str(tmp_path / "queries.jsonl")
+    capture = QueryCapture(path, max_bytes=2000, backup_count=2)
+    for i in range(100):
+        capture.record(float(i), f"query {i}", {"faq_id": i, "confidence": 1.0}, 0.001, {})
+        if i % 10 == 9:
+            capture.close()  # ✅ One write (and size check) per 10 entries; the next capture appends
+            capture = QueryCapture(path, max_bytes=2000, backup_count=2)
+    capture.close()
+
+    files = [path, f"{path}.1", f"{path}.2"]
+    assert all(os.path.exists(file) for file in files) and not os.path.exists(f"{path}.3")
+    assert all(os.path.getsize(file) >= 2000 for file in files[1:])  # ✅ Rotated once past max_bytes
+    queries = [entry["query"] for entry in read_capture(files[::-1])]
+    assert queries[-1] == "query 99"
+    assert queries == [f"query {i}" for i in range(100 - len(queries), 100)]  # ✅ Newest entries, no gap
+
+
+def test_stage_timings_come_from_the_metrics_hook(tmp_path):
+    path = str(tmp_path / "queries.jsonl")
+    capture = QueryCapture(path)
+    metrics = Metrics()
+    metrics.add_hook(capture.observe_stage)
+    metrics.observe_stage("tfidf", 0.5)  # ✅ Outside a request: not captured
+    stages = capture.begin()
+    metrics.observe_stage("tfidf", 0.001)
+    metrics.observe_stage("tfidf", 0.002)
+    metrics.observe_stage("spacy", 0.004)
+    capture.record(1.0, "query", {"faq_id": 3, "confidence": 0.9}, 0.01, stages)
+    capture.close()
+    assert read_capture([path])[0]["stages"] == pytest.approx({"tfidf": 3.0, "spacy": 4.0})
+
+
+def test_read_capture_skips_malformed_lines(tmp_path):
+    path = tmp_path / "queries.jsonl"
+    path.write_text(json.dumps({"ts": 2.0, "query": "b"}) + "\n[1, 2]\n" + json.dumps({"ts": 1.0, "query": "a"})
+                    + '\n{"ts": 3.0, "que', encoding="utf-8")
+    assert [entry["query"] for entry in read_capture([str(path)])] == ["a", "b"]
+
+
+def test_replay_reports_answers_and_errors():
+    entries = [{"ts": 100.0 + i / 100, "query": str(i), "faq_id": i % 3, "latency_ms": 1.0} for i in range(30)]
+
+    def ask(query):
+        if query == "7":
+            raise TimeoutError()
+        return {"faq_id": int(query) % 3 if query != "8" else None}
+
+    report = replay(entries, ask, speed=0, concurrency=4)
+    assert (report["queries"], report["answered"], report["errors"]) == (30, 29, {"TimeoutError": 1})
+    assert report["same_answer_rate"] == pytest.approx(28 / 29)
+    assert report["service"]["count"] == 29 and report["target_qps"] is None
+
+
+@pytest.mark.skipif(not nltk_data_available(), reason="NLTK data not installed")
+def test_chatbot_captures_answered_queries(tmp_path, faq_file, faq_entries, vector_table):
+    from modules.chatbot import FAQChatbot
+
+    path = str(tmp_path / "queries.jsonl")
+    capture = QueryCapture(path)
+    chatbot = FAQChatbot(faq_file, vector_table=vector_table, capture=capture)
+    chatbot.generate_response(faq_entries[4]["question"])
+    chatbot.generate_response(faq_entries[4]["question"])
+    chatbot.generate_responses([faq_entries[5]["question"], faq_entries[6]["question"]])
+    capture.close()
+
+    entries = read_capture([path])
+    assert [entry["faq_id"] for entry in entries] == [4, 4, 5, 6]
+    assert [entry["cached"] for entry in entries[:2]] == [False, True]
+    assert [entry["batch_size"] for entry in entries] == [1, 1, 2, 2]
+    assert all(entry["index_version"] == 1 for entry in entries)
+    assert {"preprocess", "match"} <= set(entries[0]["stages"])
@@ -0,0 +1,77 @@
+import threading
+
+from modules.faq_store import FAQStore
+from modules.suggestion_index import SuggestionIndex
+
+QUESTIONS = [
+    "How do I request a refund?",
+    "How do I track my order?",
+    "Can I get a refund for a gift?",
+    "What payment methods do you accept?",
+    "How do I track a refund?",
+]
+
+
+def make_index(popularity=None):
+    faqs = FAQStore.from_entries([{"question": question, "answer": "-"} for question in QUESTIONS])
+    return faqs, SuggestionIndex(faqs, popularity=popularity, refresh_interval=3600)
+
+
+def test_prefix_matches_any_word_of_the_question():
+    _, index = make_index()
+    assert index.suggest("refu") == [0, 2, 4]
+    assert index.suggest("how do i tr") == [1, 4]
+    assert index.suggest("track refund ") == [4]
+    assert index.suggest("track") == [1, 4]
+    assert index.suggest("track ") == [1, 4]
+    assert index.suggest("shipping") == []
+    assert index.suggest("refu", n=2) == [0, 2]
+
+
+def test_most_popular_first_ties_in_file_order():
+    _, index = make_index(popularity={4: 3, 2: 3, 0: 1})
+    assert index.suggest("refu") == [2, 4, 0]
+    assert index.suggest("") == [2, 4, 0, 1, 3]
+
+
+def test_refresh_folds_hits_and_new_questions():
+    faqs, index = make_index()
+    for _ in range(2):
+        index.record(4)
+    assert index.suggest("refu") == [0, 2, 4]  # ✅ Hits count from the next refresh
+    index.refresh()
+    assert index.suggest("refu") == [4, 0, 2]
+    assert index.counts() == {4: 2}
+
+    faqs.remove(0)
+    assert index.suggest("refu") == [4, 2]  # ✅ Removals apply at once
+    new_id = faqs.add("Where is my refund?", "-")
+    index.questions_changed()
+    index.refresh()
+    assert index.suggest("where") == [new_id]
+
+
+def test_hits_and_questions_added_during_refreshes():
+    faqs, index = make_index()
+    errors = []
+
+    def refresh():
+        try:
+            for _ in range(50):
+                index._questions_changed = True
+                index.refresh()
+        except Exception as e:
+            errors.append(e)
+
+    refresher = threading.Thread(target=refresh)
+    refresher.start()
+    for i in range(2000):
+        index.record(i % len(QUESTIONS))
+        if i % 20 == 0:
+            faqs.add(f"How do I track refund {i}?", "-")
+    refresher.join()
+    assert not errors
+    index.questions_changed()
+    index.refresh()
+    assert sum(index.counts().values()) == 2000
+    assert index.suggest("track refund", n=1000) == [4] + list(range(len(QUESTIONS), len(faqs)))
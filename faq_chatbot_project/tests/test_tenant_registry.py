@@ -0,0 +1,15 @@
+import pytest
+
+from conftest import nltk_data_available
+from modules.tenant_registry import TenantRegistry
+
+pytestmark = pytest.mark.skipif(not nltk_data_available(), reason="NLTK data not installed")
+
+
+def test_tenants_share_text_processor_per_preprocessing_setup():
+    registry = TenantRegistry()
+    default = registry._text_processor_for({})
+    fast = registry._text_processor_for({"fast_preprocessing": True})
+    assert default.mode == "nltk" and fast.mode == "fast"
+    assert registry._text_processor_for({"fast_preprocessing": False}) is default
+    assert registry._text_processor_for({"fast_preprocessing": True, "faq_file": "other.json"}) is fast
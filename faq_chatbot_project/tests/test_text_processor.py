@@ -0,0 +1,54 @@
+import pytest
+from nltk.tokenize import NLTKWordTokenizer, word_tokenize
+
+from benchmarks.text_processor_bench import SAMPLE_QUERIES, conformance
+from conftest import nltk_data_available
+from modules.data_loader import load_faq_data
+from modules.text_processor import FAST_CURRENCY, FAST_TOKEN, TextProcessor, fast_tokens
+
+# ✅ Reference output of `word_tokenize(text.lower())` + the isalnum filter (Punkt sentence
+#    splitting included), pinned so the fast tokenizer is checked without NLTK data
+GOLDEN_TOKENS = {
+    "I forgot my password. How do I reset it?": ["i", "forgot", "my", "password", "how", "do", "i", "reset", "it"],
+    "Don't worry! It's fine.": ["do", "worry", "it", "fine"],
+    "Can't log in... Help?": ["ca", "log", "in", "help"],
+    "What's the fee for orders over $50? Is it 5.99?": ["what", "the", "fee", "for", "orders", "over", "50", "is", "it"],
+    "Visit example.com today. Thanks!": ["visit", "today", "thanks"],
+    "The e-mail didn't arrive. I'll wait.": ["the", "did", "arrive", "i", "wait"],
+    "Gimme the cannot list. Wanna go?": ["gim", "me", "the", "can", "not", "list", "wan", "na", "go"],
+    "We ship to 3 countries. 2 more soon.": ["we", "ship", "to", "3", "countries", "2", "more", "soon"],
+    "It costs £5. Pay now!": ["it", "costs", "pay", "now"],
+    "Where's my order?! It's late (again).": ["where", "my", "order", "it", "late", "again"],
+    "You're welcome; we'd love to help: call 555-0100.": ["you", "welcome", "we", "love", "to", "help", "call"],
+    "Orders ship in 2-3 days. Returns take 10,000 hours... just kidding!":
+        ["orders", "ship", "in", "days", "returns", "take", "hours", "just", "kidding"],
+}
+
+
+@pytest.mark.parametrize("text", GOLDEN_TOKENS)
+def test_fast_tokens_match_golden_output(text):
+    assert fast_tokens(text) == GOLDEN_TOKENS[text]
+
+
+@pytest.mark.skipif(not nltk_data_available(), reason="NLTK data not installed")
+@pytest.mark.parametrize("text", GOLDEN_TOKENS)
+def test_golden_output_matches_word_tokenize(text):
+    assert [token for token in word_tokenize(text.lower()) if token.isalnum()] == GOLDEN_TOKENS[text]
+
+
+@pytest.mark.skipif(not nltk_data_available(), reason="NLTK data not installed")
+def test_fast_path_matches_nltk_on_shipped_corpus():
+    faq_data = load_faq_data()
+    texts = [entry["question"] for entry in faq_data] + [entry["answer"] for entry in faq_data] + SAMPLE_QUERIES
+    assert conformance(texts, TextProcessor(), TextProcessor(fast=True)) == []
+
+
+@pytest.mark.parametrize("symbol", FAST_CURRENCY + "$")
+def test_currency_tokens_match_word_tokenize(symbol):
+    # ✅ Tokenizer only (no NLTK data needed): single sentences without contractions
+    tokenizer = NLTKWordTokenizer()
+    for text in (f"pay {symbol}5 now", f"pay 5{symbol} now", f"a{symbol}b c", f"x {symbol} y",
+                 f"{symbol}10,000 limit", f"fee ({symbol}5)", f"{symbol}5, please", f"over {symbol}50?",
+                 f"{symbol}5/month", f"{symbol}5.99 fee"):
+        expected = [token for token in tokenizer.tokenize(text) if token.isalnum()]
+        assert [token for token in FAST_TOKEN.findall(text) if token.isalnum()] == expected, text
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+import spacy
+from spacy.vectors import Vectors
+
+from modules.vector_table import build_vector_table, load_vector_table
+
+# ✅ Source model words, most frequent first (as the en_core_web vectors are stored)
+WORDS = ["the", "to", "order", "refund", "cart", "phone", "warranty", "parcel"]
+
+
+@pytest.fixture(scope="module")
+def source_model(tmp_path_factory):
+    """A Spacy pipeline with word vectors, saved to disk like an installed model."""
+    nlp = spacy.blank("en")
+    data = np.random.default_rng(1).standard_normal((len(WORDS), 16)).astype(np.float32)
+    keys = [nlp.vocab.strings.add(word) for word in WORDS]
+    nlp.vocab.vectors = Vectors(strings=nlp.vocab.strings, data=data, keys=keys)
+    nlp.meta["name"] = "vectors_test"
+    path = tmp_path_factory.mktemp("model") / "vectors_test"
+    nlp.to_disk(path)
+    return str(path), nlp
+
+
+def test_table_keeps_faq_words_and_most_frequent(tmp_path, source_model):
+    model_path, _ = source_model
+    stats = build_vector_table(["Refund my order", "Where is my parcel?"], str(tmp_path), model_name=model_path,
+                               top_n=2)
+    nlp = load_vector_table(str(tmp_path))
+    assert [nlp.vocab.strings[key] for key in nlp.vocab.vectors.keys()] == ["the", "to", "order", "refund", "parcel"]
+    assert stats["words"] == 5 and stats["source_words"] == len(WORDS)
+    # ✅ Of the 9 distinct tokens (as written and lowercased), only "order", "refund" and "parcel" have a vector
+    assert stats["faq_words"] == 9 and stats["faq_coverage"] == pytest.approx(3 / 9)
+
+
+def test_doc_vectors_match_the_source_model(tmp_path, source_model):
+    model_path, source = source_model
+    build_vector_table(["refund the order", "phone warranty"], str(tmp_path), model_name=model_path, top_n=0)
+    nlp = load_vector_table(str(tmp_path))
+    assert load_vector_table(str(tmp_path)) is nlp  # ✅ Loaded once per process
+    assert "vectors_test-table-" in nlp.meta["name"]
+
+    for text in ("refund the order", "phone warranty", "refund my phone"):
+        assert np.allclose(nlp(text).vector, source(text).vector)
+        assert np.isclose(nlp(text).similarity(nlp("order")), source(text).similarity(source("order")))
+    assert not nlp.vocab.has_vector("cart")  # ✅ Neither a FAQ word nor in the top n
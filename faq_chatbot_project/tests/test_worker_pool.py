@@ -0,0 +1,53 @@
+import multiprocessing
+from types import SimpleNamespace
+
+import pytest
+
+from modules.faq_store import FAQStore
+from modules.model import FAQModel
+from modules.parallel_build import can_fork
+from modules.worker_pool import PreforkPool, share_model_memory
+
+pytestmark = pytest.mark.skipif(not can_fork(), reason="Needs fork")
+
+
+@pytest.fixture
+def chatbot(faq_entries, vector_table):
+    # ✅ The parts of FAQChatbot the pool shares (the model and the FAQ store)
+    questions = [entry["question"].lower() for entry in faq_entries]
+    return SimpleNamespace(model=FAQModel(questions, vector_table=vector_table, auto_compact_ratio=None),
+                           faqs=FAQStore.from_entries(faq_entries), queries=questions[:10])
+
+
+def _answer(chatbot, worker_id, results):
+    results.put((worker_id, chatbot.model.find_best_matches(chatbot.queries), chatbot.faqs.answers[3]))
+
+
+def test_workers_answer_from_shared_memory(chatbot):
+    expected = chatbot.model.find_best_matches(chatbot.queries)
+    results = multiprocessing.get_context("fork").Queue()
+    pool = PreforkPool(chatbot, n_workers=2)
+    try:
+        pool.start(_answer, results)
+        answers = sorted(results.get(timeout=30) for _ in range(2))
+        report = pool.memory_report()
+    finally:
+        pool.stop()
+    assert [worker_id for worker_id, _, _ in answers] == [0, 1]
+    assert all(matches == expected and answer == chatbot.faqs.answers[3] for _, matches, answer in answers)
+    assert report["shared_bytes"] >= chatbot.model.index.embeddings.nbytes
+    assert not chatbot.model.index.embeddings.codes.view().flags.writeable
+
+
+def test_shared_arrays_are_copied_on_write(chatbot):
+    queries = chatbot.queries
+    before = chatbot.model.find_top_k_many(queries, k=3)
+    share_model_memory(chatbot)
+    shared_embeddings = chatbot.model.index.embeddings.codes.view()
+    assert chatbot.model.find_top_k_many(queries, k=3) == before
+
+    faq_id = chatbot.model.add_question("a brand new question about parcels")
+    chatbot.model.remove_question(0)
+    assert chatbot.model.find_best_match("a brand new question about parcels")[0] == faq_id
+    assert not shared_embeddings.flags.writeable
+    assert chatbot.model.index.embeddings.codes.view().flags.writeable  # ✅ Appends went to a private copy